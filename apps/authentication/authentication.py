@@ -0,0 +1,123 @@
+#Python modules
+import copy
+from functools import partial
+from typing import Any
+
+#DRF modules
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+#Django modules
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+
+#Project modules
+from apps.authentication.usercache import user_version, users
+from apps.hotels.models import Hotel
+
+ROLE_CLAIM: str = 'role'
+STAFF_CLAIM: str = 'is_staff'
+VERSION_CLAIM: str = 'user_version'
+HOTELS_CLAIM: str = 'hotels'
+
+# Owners of more hotels get no hotels claim, keeping tokens small
+MAX_TOKEN_HOTELS: int = 50
+
+
+def add_user_claims(token: Token, user: Any) -> Token:
+    """
+    Embed the user's role, staff flag, owned hotel ids and current version in a token.
+    """
+    # Read the version first: a change committing meanwhile leaves the claims stale, never trusted
+    token[VERSION_CLAIM] = user_version(user.pk)
+    token[ROLE_CLAIM] = user.role
+    token[STAFF_CLAIM] = user.is_staff
+    hotel_ids: list[int] = list(
+        Hotel.objects.filter(owner_id=user.pk).order_by('id').values_list('id', flat=True)[:MAX_TOKEN_HOTELS + 1]
+    )
+    if len(hotel_ids) <= MAX_TOKEN_HOTELS:
+        token[HOTELS_CLAIM] = hotel_ids
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving users without a database query once warm.
+
+    Users are kept in a per-process LRU (AUTH_USER_CACHE_SIZE) and used for
+    as long as their version in the shared cache is unchanged; saving or
+    deleting a user changes it. Each request gets its own copy. With
+    AUTH_TRUST_TOKEN_CLAIMS on, a token issued at the user's current version
+    is enough by itself: the user is built from its role and staff claims and
+    carries the hotels claim as `owned_hotel_ids`; reading any other field
+    loads the rest of the row, through the same LRU.
+    """
+
+    def get_user(self, validated_token: Token) -> Any:
+        try:
+            # Tokens hold the id as a string; signals see it as the field's type
+            user_id = self.user_model._meta.get_field(api_settings.USER_ID_FIELD).to_python(
+                validated_token[api_settings.USER_ID_CLAIM]
+            )
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        version: int = user_version(user_id)
+        if getattr(settings, 'AUTH_TRUST_TOKEN_CLAIMS', False) and validated_token.get(VERSION_CLAIM) == version:
+            return self.claims_user(user_id, version, validated_token)
+
+        user = users.get(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            users.put(user_id, version, user)
+        else:
+            self.check_user(user, validated_token)
+        return copy.copy(user)
+
+    def claims_user(self, user_id: Any, version: int, validated_token: Token) -> Any:
+        """
+        User standing in for the token's subject, built from its id, role, staff flag and owned hotels.
+
+        Its other fields are deferred, as if loaded with only(): the first
+        one read loads them all (see load_unclaimed).
+        """
+        if ROLE_CLAIM not in validated_token or STAFF_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        claimed: dict[str, Any] = {
+            api_settings.USER_ID_FIELD: user_id,
+            'role': validated_token[ROLE_CLAIM],
+            'is_staff': validated_token[STAFF_CLAIM],
+            'is_active': True,
+        }
+        fields = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in claimed]
+        user = self.user_model.from_db(router.db_for_read(self.user_model), fields, [claimed[name] for name in fields])
+        user._load_unclaimed = partial(self.load_unclaimed, version)
+        if HOTELS_CLAIM in validated_token:
+            user.owned_hotel_ids = frozenset(validated_token[HOTELS_CLAIM])
+        return user
+
+    def load_unclaimed(self, version: int, user: Any) -> None:
+        """
+        Fill in the deferred fields of a claims user from the LRU, loading and caching the row on a miss.
+        """
+        row = users.get(user.pk, version)
+        if row is None:
+            row = self.user_model._default_manager.get(pk=user.pk)
+            users.put(user.pk, version, row)
+        for name in user.get_deferred_fields():
+            setattr(user, name, getattr(row, name))
+
+    def check_user(self, user: Any, validated_token: Token) -> None:
+        """
+        Checks JWTAuthentication.get_user makes on a freshly loaded user.
+        """
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
@@ -0,0 +1,24 @@
+#Django modules
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+#Project modules
+from apps.authentication.usercache import bump_user_version, users
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance: User, **kwargs) -> None:
+    """
+    Retire cached copies of the user everywhere once the change commits.
+
+    The version is bumped after commit so no process can load the old row
+    under the new version. Queryset .update() calls bypass this and must
+    call bump_user_version themselves.
+    """
+    users.discard(instance.pk)
+    transaction.on_commit(lambda pk=instance.pk: bump_user_version(pk))
@@ -0,0 +1,192 @@
+import pytest
+
+from django.test import RequestFactory
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.authentication.authentication import CachedJWTAuthentication, HOTELS_CLAIM, ROLE_CLAIM, VERSION_CLAIM
+from apps.authentication.usercache import UserCache, bump_user_version, user_version, users
+from apps.authentication.views import CustomTokenObtainPairSerializer
+from apps.hotels.models import Hotel
+
+
+def access_token(user):
+    return str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+
+
+def authenticate(token):
+    request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    return CachedJWTAuthentication().authenticate(request)[0]
+
+
+@pytest.fixture(autouse=True)
+def cold_user_cache():
+    users.clear()
+    yield
+    users.clear()
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_warm_user_needs_no_query(self, user_customer, django_assert_num_queries):
+        token = access_token(user_customer)
+        with django_assert_num_queries(1):
+            assert authenticate(token).pk == user_customer.pk
+
+        with django_assert_num_queries(0):
+            user = authenticate(token)
+
+        assert user.pk == user_customer.pk
+        assert user.email == user_customer.email
+
+    def test_each_request_gets_its_own_copy(self, user_customer):
+        token = access_token(user_customer)
+
+        first, second = authenticate(token), authenticate(token)
+
+        assert first == second
+        assert first is not second
+
+    def test_saving_user_reloads_it(self, user_customer, django_assert_num_queries, django_capture_on_commit_callbacks):
+        token = access_token(user_customer)
+        authenticate(token)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user_customer.role = 'manager'
+            user_customer.save()
+
+        with django_assert_num_queries(1):
+            assert authenticate(token).role == 'manager'
+
+    def test_version_bumped_elsewhere_reloads_user(self, user_customer, django_assert_num_queries):
+        token = access_token(user_customer)
+        authenticate(token)
+
+        bump_user_version(user_customer.pk)
+
+        with django_assert_num_queries(1):
+            authenticate(token)
+
+    def test_deactivated_user_is_rejected(self, user_customer, django_capture_on_commit_callbacks):
+        token = access_token(user_customer)
+        authenticate(token)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user_customer.is_active = False
+            user_customer.save()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_deleted_user_is_rejected(self, user_customer, django_capture_on_commit_callbacks):
+        token = access_token(user_customer)
+        authenticate(token)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user_customer.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_token_carries_role_and_version(self, user_manager):
+        token = CustomTokenObtainPairSerializer.get_token(user_manager).access_token
+
+        assert token[ROLE_CLAIM] == 'manager'
+        assert token[VERSION_CLAIM] == user_version(user_manager.pk)
+
+    def test_trusted_claims_need_no_query(self, settings, user_manager, django_assert_num_queries):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        token = access_token(user_manager)
+
+        with django_assert_num_queries(0):
+            user = authenticate(token)
+
+        assert (user.pk, user.role, user.is_staff) == (user_manager.pk, 'manager', user_manager.is_staff)
+
+    def test_trusted_user_loads_the_rest_of_its_row_once(self, settings, user_manager, django_assert_num_queries):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        token = access_token(user_manager)
+        user = authenticate(token)
+
+        with django_assert_num_queries(1):
+            assert (user.phone, user.email, user.first_name) == (str(user_manager.phone), user_manager.email, 'Sanjar')
+            assert user.date_joined == user_manager.date_joined
+
+        with django_assert_num_queries(0):
+            assert authenticate(token).email == user_manager.email
+
+    def test_trusted_profile_request(self, settings, api_client, user_customer):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token(user_customer)}')
+
+        response = api_client.get('/api/users/me/')
+
+        assert response.status_code == 200
+        assert (response.data['phone'], response.data['email'], response.data['last_name']) == (
+            str(user_customer.phone), user_customer.email, user_customer.last_name,
+        )
+
+    def test_claims_issued_before_a_change_are_not_trusted(
+        self, settings, user_manager, django_assert_num_queries, django_capture_on_commit_callbacks,
+    ):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        token = access_token(user_manager)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user_manager.role = 'customer'
+            user_manager.save()
+
+        with django_assert_num_queries(1):
+            assert authenticate(token).role == 'customer'
+
+    def test_token_lists_owned_hotels(self, user_manager, hotel):
+        hotel.owner = user_manager
+        hotel.save()
+
+        token = CustomTokenObtainPairSerializer.get_token(user_manager).access_token
+
+        assert token[HOTELS_CLAIM] == [hotel.pk]
+
+    def test_trusted_claims_carry_owned_hotels(self, settings, user_manager, hotel):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        hotel.owner = user_manager
+        hotel.save()
+
+        assert authenticate(access_token(user_manager)).owned_hotel_ids == {hotel.pk}
+
+    def test_new_hotel_retires_trusted_claims(self, settings, user_manager, django_capture_on_commit_callbacks):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        token = access_token(user_manager)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Hotel.objects.create(name='New', address='Street', owner=user_manager)
+
+        assert not hasattr(authenticate(token), 'owned_hotel_ids')
+
+    def test_api_request_with_token(self, api_client, user_customer):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token(user_customer)}')
+
+        response = api_client.get(f'/api/users/{user_customer.pk}/')
+
+        assert response.status_code == 200
+        assert response.data['email'] == user_customer.email
+
+
+class TestUserCache:
+
+    def test_least_recently_used_user_is_evicted(self):
+        cache = UserCache(max_size=2)
+        cache.put(1, 0, 'one')
+        cache.put(2, 0, 'two')
+        cache.get(1, 0)
+
+        cache.put(3, 0, 'three')
+
+        assert (cache.get(1, 0), cache.get(2, 0), cache.get(3, 0)) == ('one', None, 'three')
+
+    def test_other_version_is_a_miss(self):
+        cache = UserCache(max_size=2)
+        cache.put(1, 0, 'one')
+
+        assert cache.get(1, 1) is None
+        assert len(cache) == 0
@@ -0,0 +1,88 @@
+#Python modules
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+#Django modules
+from django.conf import settings
+from django.core.cache import cache
+
+# Each user has a version in the shared cache, changed whenever the user is
+# saved or deleted. Processes keep users they loaded next to the version they
+# were loaded under, so a change made through any process retires every copy.
+VERSION_KEY: str = 'auth:user:{}'
+
+
+def user_version(user_id: Any) -> int:
+    """
+    Current version of a user, starting unseen users at a fresh value.
+    """
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh value keeps an evicted version from lining up with users loaded before the eviction
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_user_version(user_id: Any) -> None:
+    key = VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+class UserCache:
+    """
+    Bounded, thread-safe LRU of users by id, each stored with the version it was loaded under.
+    """
+
+    def __init__(self, max_size: int | None = None) -> None:
+        self._lock = threading.Lock()
+        self._users: OrderedDict[Any, tuple[int, Any]] = OrderedDict()
+        self._max_size = max_size
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024)
+
+    def get(self, user_id: Any, version: int) -> Any | None:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user_id: Any, version: int, user: Any) -> None:
+        max_size = self.max_size
+        if max_size <= 0:
+            return
+        with self._lock:
+            self._users[user_id] = (version, user)
+            self._users.move_to_end(user_id)
+            while len(self._users) > max_size:
+                self._users.popitem(last=False)
+
+    def discard(self, user_id: Any) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+users = UserCache()
@@ -6,12 +6,14 @@ from rest_framework import generics, status
 from rest_framework.response import Response as DRFResponse
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import Token
 from rest_framework.request import Request as DRFRequest
 
 # Django modules
 from django.contrib.auth import get_user_model
 
 # Project modules
+from .authentication import add_user_claims
 from .serializers import RegisterSerializer
 
 User = get_user_model()
@@ -30,6 +32,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         attrs['username'] = attrs.get('phone')
         return super().validate(attrs)
 
+    @classmethod
+    def get_token(cls, user: User) -> Token:
+        """
+        Carry role, staff flag and user version in the tokens, see CachedJWTAuthentication.
+        """
+        return add_user_claims(super().get_token(user), user)
+
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
@@ -2,8 +2,12 @@
 
 #Django Modules
 from django.contrib import admin
+from django.db.models import ForeignKey
+from django.forms import ModelChoiceField
+from django.http import HttpRequest
 
 #Project Modules
+from apps.hotels.models import Room
 from .models import Booking
 
 
@@ -43,5 +47,16 @@ class BookingAdmin(admin.ModelAdmin):
         "room__number",
     )
 
+    list_select_related: tuple[str, ...] = (
+        "user",
+        "room__hotel",
+    )
+
     date_hierarchy: str = "check_in"
-    list_per_page: int = 50
\ No newline at end of file
+    list_per_page: int = 50
+
+    def formfield_for_foreignkey(self, db_field: ForeignKey, request: HttpRequest, **kwargs) -> ModelChoiceField:
+        # Room choices are labelled with their hotel's name
+        if db_field.name == "room":
+            kwargs["queryset"] = Room.objects.select_related("hotel")
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
\ No newline at end of file
@@ -0,0 +1,284 @@
+#Python modules
+import json
+import threading
+from bisect import bisect_left
+from datetime import date
+from typing import Iterable
+from uuid import UUID
+
+#Django modules
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_date
+
+#Project modules
+from apps.booking.models import AvailabilityChange, AvailabilityVersion, Booking
+from apps.booking import inventory, rtree
+from apps.hotels.models import Room
+
+# Changes replayed at most at once; an engine further behind reloads
+REPLAY_LIMIT: int = 1000
+# Every this many versions, writers prune entries older than AVAILABILITY_CHANGE_LOG_SIZE
+PRUNE_EVERY: int = 1000
+
+
+def _ordinal(value: date | str) -> int:
+    if isinstance(value, str):
+        value = parse_date(value)
+    return value.toordinal()
+
+
+class RoomIntervals:
+    """
+    Active stays of one room as parallel arrays sorted by check-in ordinal.
+    """
+    __slots__ = ('starts', 'ends', 'booking_ids', 'longest')
+
+    def __init__(self) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.booking_ids: list[int] = []
+        self.longest: int = 0
+
+    def add(self, booking_id: int, start: int, end: int) -> None:
+        index = bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.booking_ids.insert(index, booking_id)
+        self.longest = max(self.longest, end - start)
+
+    def remove(self, booking_id: int) -> None:
+        index = self.booking_ids.index(booking_id)
+        del self.starts[index], self.ends[index], self.booking_ids[index]
+
+    def overlaps(self, start: int, end: int, exclude_booking_id: int | None = None) -> bool:
+        # Only stays starting before `end` can overlap, and none of them can
+        # reach past `start` if they began more than `longest` nights earlier.
+        index = bisect_left(self.starts, end) - 1
+        horizon = start - self.longest
+        while index >= 0 and self.starts[index] >= horizon:
+            if self.ends[index] > start and self.booking_ids[index] != exclude_booking_id:
+                return True
+            index -= 1
+        return False
+
+
+def current_version() -> int:
+    return AvailabilityVersion.objects.values_list('version', flat=True).filter(pk=1).first() or 0
+
+
+def record_change(kind: str, object_id: int) -> None:
+    """
+    Log a booking or room write for every process's engine to replay.
+
+    Call inside the transaction making the write: bumping the version row
+    holds it until commit, so writers are numbered in commit order.
+    """
+    with transaction.atomic():
+        if not AvailabilityVersion.objects.filter(pk=1).update(version=F('version') + 1):
+            AvailabilityVersion.objects.get_or_create(pk=1)
+            AvailabilityVersion.objects.filter(pk=1).update(version=F('version') + 1)
+        version = current_version()
+        AvailabilityChange.objects.create(version=version, kind=kind, object_id=object_id)
+        if version % PRUNE_EVERY == 0:
+            AvailabilityChange.objects.filter(version__lte=version - settings.AVAILABILITY_CHANGE_LOG_SIZE).delete()
+
+
+class AvailabilityEngine:
+    """
+    Process-local interval index of active bookings, grouped per room.
+
+    Built from the Booking table on first use. Before answering, it replays
+    the AvailabilityChange entries written since, by this or any other
+    process, re-reading only the bookings and rooms they name; it reloads
+    when it is too far behind or the entries it needs were pruned.
+
+    The index is held at a (version, token) pair. A caller inside an open
+    transaction may replay its own uncommitted entry; should that roll back,
+    the next writer reuses the version under another token, and the mismatch
+    makes the engine reload. Database reads run outside the lock, which only
+    guards applying them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._version: int | None = None
+        self._token: UUID | None = None
+        self._rooms: dict[int, RoomIntervals] = {}
+        self._hotel_rooms: dict[int, set[int]] = {}
+        self._room_hotel: dict[int, int] = {}
+        self._booking_room: dict[int, int] = {}
+
+    # ----------------------------------------------
+    # Loading
+    #
+    def reload(self) -> None:
+        """
+        Rebuild the whole index from the database.
+        """
+        fresh = AvailabilityEngine()
+        fresh._load()
+        with self._lock:
+            self._rooms, self._hotel_rooms = fresh._rooms, fresh._hotel_rooms
+            self._room_hotel, self._booking_room = fresh._room_hotel, fresh._booking_room
+            self._version, self._token = fresh._version, fresh._token
+
+    def _load(self) -> None:
+        # Read the newest entry first: rows written after it are replayed again, harmlessly
+        version, token = AvailabilityChange.objects.order_by('-version').values_list('version', 'token').first() or (0, None)
+        for room_id, hotel_id in Room.objects.values_list('id', 'hotel_id').iterator(chunk_size=5000):
+            self._add_room(room_id, hotel_id)
+        stays = Booking.objects.filter(status__in=Booking.ACTIVE_STATUSES).values_list(
+            'id', 'room_id', 'check_in', 'check_out'
+        )
+        for booking_id, room_id, check_in, check_out in stays.iterator(chunk_size=5000):
+            self._add_stay(booking_id, room_id, check_in.toordinal(), check_out.toordinal())
+        self._version, self._token = version, token
+
+    def _ensure_fresh(self) -> None:
+        while True:
+            version, token = self._version, self._token
+            if version is None:
+                self.reload()
+                return
+            changes = list(
+                AvailabilityChange.objects.filter(version__gte=version).order_by('version')
+                .values_list('version', 'token', 'kind', 'object_id')[:REPLAY_LIMIT + 1]
+            )
+            if version:
+                # The entry the index was taken at must still be there, unchanged
+                if not changes or changes[0][:2] != (version, token):
+                    self.reload()
+                    return
+                changes = changes[1:]
+            if not changes:
+                return
+            if changes[0][0] != version + 1 or len(changes) >= REPLAY_LIMIT:
+                self.reload()
+                return
+            hotels, stays = self._read(changes)
+            with self._lock:
+                if (self._version, self._token) == (version, token):
+                    self._apply(changes, hotels, stays)
+                    return
+            # Another thread moved the index meanwhile; catch up from where it is now
+
+    def _read(self, changes: list[tuple[int, UUID, str, int]]) -> tuple[dict[int, int], list[tuple[int, int, date, date]]]:
+        room_ids = {object_id for _, _, kind, object_id in changes if kind == AvailabilityChange.ROOM}
+        booking_ids = {object_id for _, _, kind, object_id in changes if kind == AvailabilityChange.BOOKING}
+        hotels: dict[int, int] = dict(Room.objects.filter(id__in=room_ids).values_list('id', 'hotel_id')) if room_ids else {}
+        stays: list[tuple[int, int, date, date]] = list(
+            Booking.objects.filter(id__in=booking_ids, status__in=Booking.ACTIVE_STATUSES).values_list(
+                'id', 'room_id', 'check_in', 'check_out'
+            )
+        ) if booking_ids else []
+        return hotels, stays
+
+    def _apply(self, changes: list[tuple[int, UUID, str, int]], hotels: dict[int, int], stays: list[tuple[int, int, date, date]]) -> None:
+        for _, _, kind, object_id in changes:
+            if kind != AvailabilityChange.ROOM:
+                continue
+            if object_id in hotels:
+                self._move_room(object_id, hotels[object_id])
+            else:
+                self._drop_room(object_id)
+        for _, _, kind, object_id in changes:
+            if kind == AvailabilityChange.BOOKING:
+                self._drop_stay(object_id)
+        for booking_id, room_id, check_in, check_out in stays:
+            self._add_stay(booking_id, room_id, check_in.toordinal(), check_out.toordinal())
+        self._version, self._token = changes[-1][0], changes[-1][1]
+
+    def _add_room(self, room_id: int, hotel_id: int) -> None:
+        self._room_hotel[room_id] = hotel_id
+        self._hotel_rooms.setdefault(hotel_id, set()).add(room_id)
+        self._rooms.setdefault(room_id, RoomIntervals())
+
+    def _move_room(self, room_id: int, hotel_id: int) -> None:
+        previous = self._room_hotel.get(room_id)
+        if previous is not None:
+            self._hotel_rooms[previous].discard(room_id)
+        self._add_room(room_id, hotel_id)
+
+    def _drop_room(self, room_id: int) -> None:
+        hotel_id = self._room_hotel.pop(room_id, None)
+        if hotel_id is not None:
+            self._hotel_rooms[hotel_id].discard(room_id)
+        for booking_id in self._rooms.pop(room_id, RoomIntervals()).booking_ids:
+            self._booking_room.pop(booking_id, None)
+
+    def _add_stay(self, booking_id: int, room_id: int, start: int, end: int) -> None:
+        if end <= start:
+            return
+        self._rooms.setdefault(room_id, RoomIntervals()).add(booking_id, start, end)
+        self._booking_room[booking_id] = room_id
+
+    def _drop_stay(self, booking_id: int) -> None:
+        room_id = self._booking_room.pop(booking_id, None)
+        if room_id is not None:
+            self._rooms[room_id].remove(booking_id)
+
+    # ----------------------------------------------
+    # Queries
+    #
+    def is_free(self, room_id: int, check_in: date | str, check_out: date | str, exclude_booking_id: int | None = None) -> bool:
+        self._ensure_fresh()
+        with self._lock:
+            intervals = self._rooms.get(room_id)
+            if intervals is None:
+                return True
+            return not intervals.overlaps(_ordinal(check_in), _ordinal(check_out), exclude_booking_id)
+
+    def booked_room_ids(self, check_in: date | str, check_out: date | str, hotel_id: int | None = None) -> set[int]:
+        start, end = _ordinal(check_in), _ordinal(check_out)
+        self._ensure_fresh()
+        with self._lock:
+            room_ids: Iterable[int] = self._rooms if hotel_id is None else self._hotel_rooms.get(int(hotel_id), ())
+            return {room_id for room_id in room_ids if self._rooms[room_id].overlaps(start, end)}
+
+    def free_room_ids(self, hotel_id: int, check_in: date | str, check_out: date | str) -> set[int]:
+        start, end = _ordinal(check_in), _ordinal(check_out)
+        self._ensure_fresh()
+        with self._lock:
+            return {
+                room_id for room_id in self._hotel_rooms.get(int(hotel_id), ())
+                if not self._rooms[room_id].overlaps(start, end)
+            }
+
+
+engine = AvailabilityEngine()
+
+
+def engine_enabled() -> bool:
+    return getattr(settings, 'BOOKING_AVAILABILITY_ENGINE', False)
+
+
+def is_room_free(room_id: int, check_in: date, check_out: date, exclude_booking_id: int | None = None) -> bool:
+    """
+    Check whether a room can take a stay of [check_in, check_out).
+    """
+    if engine_enabled():
+        return engine.is_free(room_id, check_in, check_out, exclude_booking_id)
+    if rtree.is_enabled():
+        return not rtree.is_room_booked(room_id, check_in, check_out, exclude_booking_id)
+    return not inventory.is_room_booked(room_id, check_in, check_out, exclude_booking_id)
+
+
+def _id_subquery(room_ids: set[int]) -> RawSQL | list[int]:
+    # SQLite caps bound parameters per statement: the ids go in as one JSON array
+    if connection.vendor == 'sqlite':
+        return RawSQL('SELECT value FROM json_each(%s)', [json.dumps(sorted(room_ids))])
+    return sorted(room_ids)
+
+
+def booked_room_ids(check_in: date | str, check_out: date | str, hotel_id: int | str | None = None) -> list[int] | QuerySet | RawSQL:
+    """
+    Return the ids of rooms held on any night in [check_in, check_out).
+    """
+    if engine_enabled():
+        return _id_subquery(engine.booked_room_ids(check_in, check_out, hotel_id))
+    if rtree.is_enabled():
+        return rtree.booked_room_ids(check_in, check_out)
+    return inventory.booked_room_ids(check_in, check_out)
@@ -0,0 +1,31 @@
+#Project modules
+from apps.booking.models import Booking
+from apps.core.models import OutboxEvent
+from apps.core.outbox import outbox_event, publish_many
+
+AGGREGATE: str = 'booking'
+
+BOOKING_CREATED: str = 'booking.created'
+BOOKING_CONFIRMED: str = 'booking.confirmed'
+BOOKING_CANCELLED: str = 'booking.cancelled'
+
+
+def booking_event(event_type: str, booking_id: int, room_id: int, check_in, check_out, total_price: int) -> OutboxEvent:
+    """
+    Build an outbox event describing a booking's stay.
+    """
+    return outbox_event(event_type, AGGREGATE, booking_id, {
+        'booking_id': booking_id,
+        'room_id': room_id,
+        'check_in': check_in,
+        'check_out': check_out,
+        'total_price': total_price,
+    })
+
+
+def publish_booking(event_type: str, booking: Booking) -> None:
+    """
+    Write an event for the booking in the current transaction.
+    """
+    room_id, check_in, check_out, _ = booking.stay_key()
+    publish_many([booking_event(event_type, booking.pk, room_id, check_in, check_out, booking.total_price)])
@@ -0,0 +1,53 @@
+#Python modules
+from datetime import date
+from typing import Any, Iterator
+
+#Django modules
+from django.db.models import F, QuerySet
+
+#Project modules
+from apps.booking.models import Booking
+
+BOOKING_EXPORT_FIELDS: list[str] = [
+    'id', 'user_id', 'room_id', 'room_number', 'hotel_id', 'hotel_name',
+    'check_in', 'check_out', 'total_price', 'status', 'payment_id',
+]
+
+
+def booking_export_rows(
+    status: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    hotel_id: int | None = None,
+    chunk_size: int = 2000,
+) -> Iterator[dict[str, Any]]:
+    """
+    Iterate bookings as flat dicts, reading the table in chunks.
+
+    Filters match my-bookings: status, check-in date range (inclusive) and hotel.
+    """
+    return booking_export_queryset(status, date_from, date_to, hotel_id).iterator(chunk_size=chunk_size)
+
+
+def booking_export_queryset(
+    status: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    hotel_id: int | None = None,
+) -> QuerySet:
+    bookings = Booking.objects.order_by('id')
+    if status:
+        bookings = bookings.filter(status=status)
+    if date_from:
+        bookings = bookings.filter(check_in__gte=date_from)
+    if date_to:
+        bookings = bookings.filter(check_in__lte=date_to)
+    if hotel_id:
+        bookings = bookings.filter(room__hotel_id=hotel_id)
+
+    return bookings.values(
+        'id', 'user_id', 'room_id', 'check_in', 'check_out', 'total_price', 'status', 'payment_id',
+        room_number=F('room__number'),
+        hotel_id=F('room__hotel_id'),
+        hotel_name=F('room__hotel__name'),
+    )
@@ -0,0 +1,51 @@
+#Python modules
+from datetime import timedelta
+
+#Django modules
+from django.db.models import QuerySet
+from django.utils import timezone
+
+#Project modules
+from apps.booking.models import Booking, RoomNight
+from apps.booking.exports import booking_export_queryset
+from apps.booking.inventory import held_nights
+from apps.booking.queries import available_rooms, own_bookings, paid_bookings
+from apps.booking.serializers import BookingValuesSerializer
+from apps.core.pagination import NewestFirstPagination
+from apps.core.queryplans import hot_query
+from apps.hotels.serializers import RoomValuesSerializer
+
+SAMPLE_ID: int = 1
+
+
+@hot_query('booking.list_own')
+def list_own() -> QuerySet:
+    return NewestFirstPagination.first_page(BookingValuesSerializer.values(own_bookings(SAMPLE_ID), 'id'))
+
+
+@hot_query('booking.my_bookings_by_status')
+def my_bookings_by_status() -> QuerySet:
+    bookings: QuerySet[Booking] = own_bookings(SAMPLE_ID, Booking.CONFIRMED)
+    return NewestFirstPagination.first_page(BookingValuesSerializer.values(bookings, 'id'))
+
+
+@hot_query('booking.overlap')
+def overlap() -> QuerySet[RoomNight]:
+    today = timezone.now().date()
+    return held_nights(SAMPLE_ID, today, today + timedelta(days=3), exclude_booking_id=SAMPLE_ID)
+
+
+@hot_query('booking.available_rooms_in_hotel')
+def available_rooms_in_hotel() -> QuerySet:
+    today = timezone.now().date()
+    return RoomValuesSerializer.values(available_rooms(today, today + timedelta(days=3), SAMPLE_ID))
+
+
+@hot_query('booking.export_active_from')
+def export_active_from() -> QuerySet:
+    return booking_export_queryset(status=Booking.CONFIRMED, date_from=timezone.now().date())
+
+
+@hot_query('booking.by_payment')
+def by_payment() -> QuerySet[Booking]:
+    return paid_bookings([SAMPLE_ID])
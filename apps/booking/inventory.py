@@ -0,0 +1,129 @@
+#Python modules
+from dataclasses import dataclass, field
+from datetime import date
+
+#Django modules
+from django.db import transaction
+from django.db.models import QuerySet
+
+#Project modules
+from apps.booking.models import Booking, RoomNight
+
+
+@dataclass
+class InventoryDrift:
+    """
+    Difference between the nights a booking should hold and the stored ones.
+    """
+    booking_id: int
+    missing: list[date] = field(default_factory=list)
+    unexpected: list[date] = field(default_factory=list)
+
+
+def sync_booking_nights(booking: Booking) -> None:
+    """
+    Make the stored room nights match the current state of a booking.
+    """
+    RoomNight.objects.filter(booking_id=booking.pk).delete()
+    if booking.is_active:
+        RoomNight.objects.bulk_create(
+            RoomNight(room_id=booking.room_id, booking_id=booking.pk, night=night)
+            for night in booking.stay_nights()
+        )
+
+
+def booked_room_ids(check_in: date | str, check_out: date | str) -> QuerySet:
+    """
+    Return a subquery of room ids held on any night in [check_in, check_out).
+    """
+    return RoomNight.objects.filter(night__gte=check_in, night__lt=check_out).values('room_id')
+
+
+def held_nights(room_id: int, check_in: date, check_out: date, exclude_booking_id: int | None = None) -> QuerySet[RoomNight]:
+    """
+    Nights of [check_in, check_out) already held for the room, other than by `exclude_booking_id`.
+    """
+    nights: QuerySet[RoomNight] = RoomNight.objects.filter(room_id=room_id, night__gte=check_in, night__lt=check_out)
+    if exclude_booking_id is not None:
+        nights = nights.exclude(booking_id=exclude_booking_id)
+    return nights
+
+
+def is_room_booked(room_id: int, check_in: date, check_out: date, exclude_booking_id: int | None = None) -> bool:
+    """
+    Check whether any night of [check_in, check_out) is already held for the room.
+    """
+    return held_nights(room_id, check_in, check_out, exclude_booking_id).exists()
+
+
+def _active_bookings() -> QuerySet[Booking]:
+    return Booking.objects.filter(status__in=Booking.ACTIVE_STATUSES).only(
+        'id', 'room_id', 'check_in', 'check_out', 'status'
+    ).order_by('id')
+
+
+def rebuild_inventory(batch_size: int = 2000) -> int:
+    """
+    Recreate the whole room-night table from active bookings.
+
+    Where legacy bookings overlap, the first one written keeps the night and
+    the rest show up in find_inventory_drift. Returns the number of nights
+    attempted.
+    """
+    written: int = 0
+    with transaction.atomic():
+        RoomNight.objects.all().delete()
+        batch: list[RoomNight] = []
+        for booking in _active_bookings().iterator(chunk_size=batch_size):
+            batch.extend(
+                RoomNight(room_id=booking.room_id, booking_id=booking.pk, night=night)
+                for night in booking.stay_nights()
+            )
+            if len(batch) >= batch_size:
+                RoomNight.objects.bulk_create(batch, ignore_conflicts=True)
+                written += len(batch)
+                batch = []
+        RoomNight.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+    return written
+
+
+def find_inventory_drift(batch_size: int = 1000) -> list[InventoryDrift]:
+    """
+    Compare stored room nights against the Booking table.
+
+    Reports bookings whose nights are missing or differ, and nights left
+    behind by bookings that are no longer active.
+    """
+    drifts: list[InventoryDrift] = []
+
+    def compare(bookings: list[Booking]) -> None:
+        stored: dict[int, set[date]] = {booking.pk: set() for booking in bookings}
+        rows = RoomNight.objects.filter(booking_id__in=stored.keys()).values_list('booking_id', 'room_id', 'night')
+        rooms: dict[int, int] = {booking.pk: booking.room_id for booking in bookings}
+        for booking_id, room_id, night in rows:
+            # A night filed under the wrong room is as bad as a missing one
+            if room_id == rooms[booking_id]:
+                stored[booking_id].add(night)
+        for booking in bookings:
+            expected: set[date] = set(booking.stay_nights())
+            missing = sorted(expected - stored[booking.pk])
+            unexpected = sorted(stored[booking.pk] - expected)
+            if missing or unexpected:
+                drifts.append(InventoryDrift(booking.pk, missing, unexpected))
+
+    batch: list[Booking] = []
+    for booking in _active_bookings().iterator(chunk_size=batch_size):
+        batch.append(booking)
+        if len(batch) >= batch_size:
+            compare(batch)
+            batch = []
+    compare(batch)
+
+    stale = RoomNight.objects.exclude(booking__status__in=Booking.ACTIVE_STATUSES).values_list('booking_id', 'night')
+    leftovers: dict[int, list[date]] = {}
+    for booking_id, night in stale.order_by('booking_id', 'night'):
+        leftovers.setdefault(booking_id, []).append(night)
+    drifts.extend(InventoryDrift(booking_id, unexpected=nights) for booking_id, nights in leftovers.items())
+
+    return drifts
@@ -0,0 +1,109 @@
+#Python modules
+import sqlite3
+import time
+from typing import Any
+from datetime import date, timedelta
+from random import Random
+
+#Django modules
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark booking overlap queries on the plain booking table against "
+        "the R*Tree index. Runs on a throwaway in-memory SQLite database."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--bookings', type=int, default=1_000_000)
+        parser.add_argument('--rooms', type=int, default=5_000)
+        parser.add_argument('--queries', type=int, default=2_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def __populate(self, db: sqlite3.Connection, bookings: int, rooms: int, rng: Random) -> None:
+        # The booking_booking columns these queries read, with the indexes the
+        # real table has over them: the room_id FK index and the Booking.Meta
+        # composites for overlap checks and for active bookings by date
+        db.execute(
+            "CREATE TABLE booking_booking (id INTEGER PRIMARY KEY, room_id INTEGER NOT NULL, "
+            "check_in DATE NOT NULL, check_out DATE NOT NULL, status VARCHAR(20) NOT NULL)"
+        )
+        db.execute("CREATE INDEX booking_booking_room_id ON booking_booking (room_id)")
+        db.execute(
+            "CREATE INDEX booking_room_status_dates_idx ON booking_booking (room_id, status, check_in, check_out)"
+        )
+        db.execute("CREATE INDEX booking_status_check_in_idx ON booking_booking (status, check_in)")
+        db.execute("CREATE VIRTUAL TABLE booking_stay_rtree USING rtree_i32(id, room_lo, room_hi, first_night, last_night)")
+
+        start = date(2024, 1, 1).toordinal()
+        statuses = ('pending', 'confirmed', 'cancelled', 'completed')
+        rows: list[tuple] = []
+        boxes: list[tuple] = []
+        for booking_id in range(1, bookings + 1):
+            room_id = rng.randint(1, rooms)
+            check_in = start + rng.randint(0, 3 * 365)
+            check_out = check_in + rng.randint(1, 10)
+            status = rng.choice(statuses)
+            rows.append((booking_id, room_id, date.fromordinal(check_in).isoformat(), date.fromordinal(check_out).isoformat(), status))
+            if status in ('pending', 'confirmed'):
+                boxes.append((booking_id, room_id, room_id, check_in, check_out - 1))
+            if len(rows) >= 50_000:
+                db.executemany("INSERT INTO booking_booking VALUES (?, ?, ?, ?, ?)", rows)
+                db.executemany("INSERT INTO booking_stay_rtree VALUES (?, ?, ?, ?, ?)", boxes)
+                rows, boxes = [], []
+        db.executemany("INSERT INTO booking_booking VALUES (?, ?, ?, ?, ?)", rows)
+        db.executemany("INSERT INTO booking_stay_rtree VALUES (?, ?, ?, ?, ?)", boxes)
+        db.commit()
+
+    def __time(self, db: sqlite3.Connection, sql: str, params: list[tuple]) -> float:
+        started = time.perf_counter()
+        for args in params:
+            db.execute(sql, args).fetchall()
+        return (time.perf_counter() - started) / len(params) * 1_000_000
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        rng = Random(kwargs['seed'])
+        db = sqlite3.connect(':memory:')
+
+        started = time.perf_counter()
+        self.__populate(db, kwargs['bookings'], kwargs['rooms'], rng)
+        self.stdout.write(f"Loaded {kwargs['bookings']} bookings in {time.perf_counter() - started:.1f}s.")
+
+        ranges: list[tuple[date, date]] = []
+        for _ in range(kwargs['queries']):
+            check_in = date(2024, 1, 1) + timedelta(days=rng.randint(0, 3 * 365))
+            ranges.append((check_in, check_in + timedelta(days=rng.randint(1, 7))))
+        room_ids = [rng.randint(1, kwargs['rooms']) for _ in ranges]
+        searches = ranges[:max(1, kwargs['queries'] // 20)]
+
+        plain_room = self.__time(
+            db,
+            "SELECT 1 FROM booking_booking WHERE room_id = ? AND check_out > ? AND check_in < ? "
+            "AND status IN ('confirmed', 'pending') LIMIT 1",
+            [(room_id, ci.isoformat(), co.isoformat()) for room_id, (ci, co) in zip(room_ids, ranges)],
+        )
+        rtree_room = self.__time(
+            db,
+            "SELECT 1 FROM booking_stay_rtree WHERE room_lo <= ? AND room_hi >= ? "
+            "AND first_night <= ? AND last_night >= ? LIMIT 1",
+            [(room_id, room_id, co.toordinal() - 1, ci.toordinal()) for room_id, (ci, co) in zip(room_ids, ranges)],
+        )
+        plain_search = self.__time(
+            db,
+            "SELECT room_id FROM booking_booking WHERE check_out > ? AND check_in < ? "
+            "AND status IN ('confirmed', 'pending')",
+            [(ci.isoformat(), co.isoformat()) for ci, co in searches],
+        )
+        rtree_search = self.__time(
+            db,
+            "SELECT room_lo FROM booking_stay_rtree WHERE first_night <= ? AND last_night >= ?",
+            [(co.toordinal() - 1, ci.toordinal()) for ci, co in searches],
+        )
+
+        self.stdout.write(f"{'query':<28}{'plain (us)':>14}{'r*tree (us)':>14}{'speedup':>10}")
+        for label, plain, indexed in (
+            ("room overlap check", plain_room, rtree_room),
+            ("booked rooms for range", plain_search, rtree_search),
+        ):
+            self.stdout.write(f"{label:<28}{plain:>14.1f}{indexed:>14.1f}{plain / indexed:>9.1f}x")
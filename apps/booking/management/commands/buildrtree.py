@@ -0,0 +1,30 @@
+#Python modules
+from typing import Any
+from datetime import datetime
+
+#Django modules
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+#Project modules
+from apps.booking import rtree
+
+
+class Command(BaseCommand):
+    help = (
+        "Refill the SQLite R*Tree index over active booking stays. Migrations create it; "
+        "set BOOKING_RTREE to route overlap checks through it."
+    )
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        if connection.vendor != 'sqlite':
+            raise CommandError("The R*Tree index is only available on SQLite.")
+        if not rtree.is_present():
+            raise CommandError(f"{rtree.TABLE_NAME} does not exist; run migrate (SQLite needs the R*Tree module).")
+
+        start_time = datetime.now()
+        written: int = rtree.rebuild_rtree()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} active stays in {rtree.TABLE_NAME}."))
+        self.stdout.write(
+            f"The whole process took {(datetime.now() - start_time).total_seconds()} seconds."
+        )
@@ -0,0 +1,31 @@
+#Python modules
+from typing import Any
+
+#Django modules
+from django.core.management.base import BaseCommand, CommandError
+
+#Project modules
+from apps.booking.inventory import InventoryDrift, find_inventory_drift
+
+
+class Command(BaseCommand):
+    help = "Check the room-night inventory against the Booking table."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        drifts: list[InventoryDrift] = find_inventory_drift(batch_size=kwargs['batch_size'])
+        if not drifts:
+            self.stdout.write(self.style.SUCCESS("Room-night inventory is consistent."))
+            return
+
+        for drift in drifts:
+            self.stdout.write(
+                f"Booking {drift.booking_id}: "
+                f"missing {[str(night) for night in drift.missing]}, "
+                f"unexpected {[str(night) for night in drift.unexpected]}"
+            )
+        raise CommandError(
+            f"{len(drifts)} bookings out of sync. Run 'manage.py rebuildinventory' to repair."
+        )
@@ -0,0 +1,9 @@
+#Project modules
+from apps.booking.exports import BOOKING_EXPORT_FIELDS, booking_export_rows
+from apps.core.export import BaseExportCommand
+
+
+class Command(BaseExportCommand):
+    help = "Stream bookings as NDJSON or CSV."
+    fields = BOOKING_EXPORT_FIELDS
+    rows = booking_export_rows
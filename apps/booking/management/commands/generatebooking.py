@@ -11,6 +11,7 @@ from django.db import connection
 
 #Project modules
 from apps.booking.models import Booking
+from apps.booking.pricing import Stay, quote_stays
 from apps.users.models import User
 from apps.hotels.models import Hotel, Room
 
@@ -45,7 +46,6 @@ class Command(BaseCommand):
             room = choice(all_rooms)
             check_in = timezone.now().date() + timedelta(days=randint(0, 10))
             check_out = check_in + timedelta(days=randint(1, 5))
-            total_price = (check_out - check_in).days * room.price_per_night
 
             created_booking.append(
                 Booking(
@@ -53,11 +53,16 @@ class Command(BaseCommand):
                     room=room,
                     check_in=check_in,
                     check_out=check_out,
-                    total_price=total_price,
                     status="Confirmed",
                 )
             )
 
+        # Price every generated stay in one batch, rate overrides included
+        stays: list[Stay] = [Stay(booking.room_id, booking.check_in, booking.check_out) for booking in created_booking]
+        quotes: dict[Stay, int] = quote_stays(stays, {room.pk: room.price_per_night for room in all_rooms})
+        for booking, stay in zip(created_booking, stays):
+            booking.total_price = quotes[stay]
+
         Booking.objects.bulk_create(created_booking)
         booking_after = Booking.objects.count()
 
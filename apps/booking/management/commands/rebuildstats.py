@@ -0,0 +1,31 @@
+#Python modules
+from typing import Any
+from datetime import datetime
+
+#Django modules
+from django.core.management.base import BaseCommand
+
+#Project modules
+from apps.core.models import Job
+from apps.booking.stats import rebuild_stats
+from apps.booking.tasks import rebuild_stats_task
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily hotel stats (rooms sold, revenue) from sold bookings."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--enqueue', action='store_true', help="Queue a job for the workers (runworkers) instead of running now.")
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        if kwargs['enqueue']:
+            job: Job = rebuild_stats_task.enqueue(batch_size=kwargs['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk} ({job.task})."))
+            return
+        start_time = datetime.now()
+        written: int = rebuild_stats(batch_size=kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} hotel days."))
+        self.stdout.write(
+            f"The whole process took {(datetime.now() - start_time).total_seconds()} seconds."
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:53
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_room_nights(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    RoomNight = apps.get_model('booking', 'RoomNight')
+    nights = []
+    for booking in Booking.objects.filter(status__in=['pending', 'confirmed']).iterator():
+        for offset in range((booking.check_out - booking.check_in).days):
+            nights.append(RoomNight(room_id=booking.room_id, booking_id=booking.id, night=booking.check_in + timedelta(days=offset)))
+    RoomNight.objects.bulk_create(nights, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_booking_payment'),
+        ('hotels', '0004_alter_hotel_rating_alter_room_price_per_night_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='booking.booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='hotels.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['night', 'room'], name='booking_night_room_idx'), models.Index(fields=['room', 'night'], name='booking_room_night_idx')],
+            },
+        ),
+        migrations.RunPython(fill_room_nights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_roomnight'),
+        ('hotels', '0005_hot_path_indexes'),
+        ('payment', '0003_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'status', 'check_in', 'check_out'], name='booking_room_status_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'status'], name='booking_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'check_in'], name='booking_status_check_in_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:00
+
+from django.core.management.base import CommandError
+from django.db import migrations, models
+from django.db.models import Count
+
+# Clashes listed in the error; the rest are only counted
+SHOWN_CLASHES = 20
+
+
+def refuse_double_booked_nights(apps, schema_editor):
+    # Legacy rows may hold the same room night twice. Which stay keeps it is
+    # for an operator to decide, so the migration stops and names them
+    RoomNight = apps.get_model('booking', 'RoomNight')
+    clashes = list(
+        RoomNight.objects.values('room_id', 'night').annotate(holders=Count('id')).filter(holders__gt=1)
+        .order_by('room_id', 'night').values_list('room_id', 'night')
+    )
+    if not clashes:
+        return
+    lines = []
+    for room_id, night in clashes[:SHOWN_CLASHES]:
+        booking_ids = sorted(RoomNight.objects.filter(room_id=room_id, night=night).values_list('booking_id', flat=True))
+        lines.append(f"  room {room_id} on {night}: bookings {', '.join(map(str, booking_ids))}")
+    if len(clashes) > SHOWN_CLASHES:
+        lines.append(f"  ... and {len(clashes) - SHOWN_CLASHES} more")
+    raise CommandError(
+        f"{len(clashes)} room nights are held by more than one booking:\n" + "\n".join(lines) + "\n"
+        "Cancel or move all but one booking of each, run 'manage.py checkinventory' "
+        "to confirm the inventory matches, then migrate again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_hot_path_indexes'),
+        ('hotels', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(refuse_double_booked_nights, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='roomnight',
+            name='booking_room_night_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='roomnight',
+            constraint=models.UniqueConstraint(fields=('room', 'night'), name='booking_unique_room_night'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_unique_room_night'),
+        ('hotels', '0006_room_rate_override'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('rooms_sold', models.IntegerField(default=0)),
+                ('revenue', models.IntegerField(default=0)),
+                ('room_count', models.IntegerField(default=0)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='hotels.hotel')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hotel', 'date'), name='booking_unique_hotel_day')],
+            },
+        ),
+    ]
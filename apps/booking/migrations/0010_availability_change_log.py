@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    apps.get_model('booking', 'AvailabilityVersion').objects.create(pk=1, version=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_hotel_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(unique=True)),
+                ('kind', models.CharField(choices=[('booking', 'Booking'), ('room', 'Room')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AvailabilityVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
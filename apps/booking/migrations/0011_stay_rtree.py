@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+TABLE_NAME = 'booking_stay_rtree'
+
+
+def create_stay_rtree(apps, schema_editor):
+    # R*Tree virtual tables are SQLite only, and need SQLite built with the module
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Booking = apps.get_model('booking', 'Booking')
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_NAME} "
+                "USING rtree_i32(id, room_lo, room_hi, first_night, last_night)"
+            )
+        except OperationalError:
+            return
+        rows = [
+            (booking_id, room_id, room_id, check_in.toordinal(), check_out.toordinal() - 1)
+            for booking_id, room_id, check_in, check_out in Booking.objects.filter(
+                status__in=['pending', 'confirmed'],
+            ).values_list('id', 'room_id', 'check_in', 'check_out').iterator()
+            if check_out > check_in
+        ]
+        cursor.executemany(f"INSERT INTO {TABLE_NAME} VALUES (%s, %s, %s, %s, %s)", rows)
+
+
+def drop_stay_rtree(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_availability_change_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_stay_rtree, drop_stay_rtree),
+    ]
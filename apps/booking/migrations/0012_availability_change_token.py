@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:31
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_stay_rtree'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availabilitychange',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
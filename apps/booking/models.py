@@ -1,12 +1,14 @@
 #Python Modules
+import uuid
+from datetime import date, timedelta
 
 #Django Modules
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 #Project Modules
 from apps.users.models import User
-from apps.hotels.models import Room
+from apps.hotels.models import Hotel, Room
 
 
 class Booking(models.Model):
@@ -25,6 +27,11 @@ class Booking(models.Model):
         (COMPLETED, 'Completed'),
     ]
     
+    # Statuses that hold the room, i.e. that occupy room-night inventory
+    ACTIVE_STATUSES = (PENDING, CONFIRMED)
+    # Statuses counted as sold in the daily hotel stats
+    SOLD_STATUSES = (CONFIRMED, COMPLETED)
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE,related_name='bookings')
     room = models.ForeignKey(Room, on_delete=models.CASCADE,related_name='bookings')
     check_in = models.DateField(default=timezone.now)
@@ -44,5 +51,165 @@ class Booking(models.Model):
         related_name='bookings'
     )
 
+    class Meta:
+        indexes = [
+            # Overlap checks: one room, active statuses, date window
+            models.Index(fields=['room', 'status', 'check_in', 'check_out'], name='booking_room_status_dates_idx'),
+            # List / my-bookings: a user's bookings, optionally by status
+            models.Index(fields=['user', 'status'], name='booking_user_status_idx'),
+            # Engine reloads, exports and reports: active bookings by date
+            models.Index(fields=['status', 'check_in'], name='booking_status_check_in_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row held so inventory sync can skip no-op saves
+        if all(name in field_names for name in ('room_id', 'check_in', 'check_out', 'status')):
+            instance._loaded_stay = instance.stay_key()
+            if 'total_price' in field_names:
+                instance._loaded_sale = instance.sale_key()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # What was remembered at load time may no longer be what the row holds;
+        # partial reloads (deferred fields) keep it, as the row was not re-read
+        if fields is None:
+            self.__dict__.pop('_loaded_stay', None)
+            self.__dict__.pop('_loaded_sale', None)
+
+    def save(self, *args, **kwargs):
+        """
+        Save the booking and its room-night inventory in one transaction.
+        """
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE_STATUSES
+
+    def stay_key(self) -> tuple:
+        """
+        Return the fields that decide which room nights the booking occupies.
+        """
+        check_in = self._meta.get_field('check_in').to_python(self.check_in)
+        check_out = self._meta.get_field('check_out').to_python(self.check_out)
+        return (self.room_id, check_in, check_out, self.is_active)
+
+    def sale_key(self) -> tuple | None:
+        """
+        Return what the booking adds to the daily hotel stats, or None while it is not sold.
+        """
+        if self.status not in self.SOLD_STATUSES:
+            return None
+        room_id, check_in, check_out, _ = self.stay_key()
+        return (room_id, check_in, check_out, self.total_price)
+
+    def stay_nights(self) -> list[date]:
+        """
+        Return every night of the stay, from check-in up to (not including) check-out.
+        """
+        _, check_in, check_out, _ = self.stay_key()
+        return [check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)]
+
+    def __str__(self):
+        return f"Booking {self.id} by {self.user}"
+
+
+class RoomNight(models.Model):
+    """
+    One night of a room held by an active booking.
+
+    Maintained from Booking writes (see apps.booking.inventory) so availability
+    searches are an indexed lookup over nights instead of an interval scan.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='nights')
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='nights')
+    night = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['night', 'room'], name='booking_night_room_idx'),
+        ]
+        constraints = [
+            # A room night can be held by one booking only; this is what makes
+            # concurrent reservations for the same room safe.
+            models.UniqueConstraint(fields=['room', 'night'], name='booking_unique_room_night'),
+        ]
+
+    def __str__(self):
+        return f"Room {self.room_id} on {self.night}"
+
+
+class HotelDailyStats(models.Model):
+    """
+    Rooms sold and revenue of one hotel on one date, rolled up from sold bookings.
+
+    Maintained incrementally from Booking and Payment writes (see
+    apps.booking.stats), so reports read one row per day instead of
+    scanning bookings.
+    """
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    rooms_sold = models.IntegerField(default=0)
+    revenue = models.IntegerField(default=0)
+    # Rooms the hotel had that day, for RevPAR; later days follow room changes
+    room_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'date'], name='booking_unique_hotel_day'),
+        ]
+
+    @property
+    def adr(self) -> float:
+        """Average daily rate: revenue per room sold."""
+        return self.revenue / self.rooms_sold if self.rooms_sold else 0.0
+
+    @property
+    def revpar(self) -> float:
+        """Revenue per available room."""
+        return self.revenue / self.room_count if self.room_count else 0.0
+
+    def __str__(self):
+        return f"Hotel {self.hotel_id} on {self.date}"
+
+
+class AvailabilityVersion(models.Model):
+    """
+    Single-row counter numbering AvailabilityChange entries.
+
+    Writers bump it with an UPDATE inside their transaction, which holds the
+    row until commit, so versions become visible to other processes in order.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Availability version {self.version}"
+
+
+class AvailabilityChange(models.Model):
+    """
+    The booking or room written at one availability version.
+
+    Every process's availability engine replays the entries newer than the
+    version it holds, re-reading just those rows (see apps.booking.availability).
+    """
+    BOOKING = 'booking'
+    ROOM = 'room'
+
+    KIND_CHOICES = [
+        (BOOKING, 'Booking'),
+        (ROOM, 'Room'),
+    ]
+
+    version = models.PositiveBigIntegerField(unique=True)
+    # Tells this entry apart from one a rolled-back writer had at the same version
+    token = models.UUIDField(default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+
     def __str__(self):
-        return f"Booking {self.id} by {self.user}"
\ No newline at end of file
+        return f"{self.kind} {self.object_id} at {self.version}"
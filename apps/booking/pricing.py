@@ -0,0 +1,140 @@
+#Python modules
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from itertools import accumulate
+from typing import Iterable
+
+#Project modules
+from apps.hotels.models import Room, RoomRateOverride
+
+# SQLite caps bound parameters per statement; room id lists are sent in chunks
+ROOM_ID_CHUNK: int = 500
+
+
+@dataclass(frozen=True)
+class Stay:
+    """
+    One room over the nights of [check_in, check_out).
+    """
+    room_id: int
+    check_in: date
+    check_out: date
+
+
+class RoomRates:
+    """
+    Base nightly price of a room plus its overrides, as sorted date ordinals
+    with a running sum of how much each override differs from the base.
+
+    Pricing a stay is then two bisections, whatever its length.
+    """
+    __slots__ = ('base', 'days', 'prices', 'deltas')
+
+    def __init__(self, base: float, overrides: Iterable[tuple[date, float]] = ()) -> None:
+        self.base: float = base
+        rows = sorted((day.toordinal(), price) for day, price in overrides)
+        self.days: list[int] = [day for day, _ in rows]
+        self.prices: list[float] = [price for _, price in rows]
+        self.deltas: list[float] = list(accumulate((price - base for price in self.prices), initial=0.0))
+
+    def total(self, check_in: date, check_out: date) -> float:
+        start, end = check_in.toordinal(), check_out.toordinal()
+        if end <= start:
+            return 0.0
+        first, last = bisect_left(self.days, start), bisect_left(self.days, end)
+        return (end - start) * self.base + self.deltas[last] - self.deltas[first]
+
+    def nightly(self, check_in: date, check_out: date) -> list[tuple[date, float]]:
+        """
+        Price of each night of the stay, in date order.
+        """
+        start, end = check_in.toordinal(), check_out.toordinal()
+        index = bisect_left(self.days, start)
+        nights: list[tuple[date, float]] = []
+        for day in range(start, end):
+            if index < len(self.days) and self.days[index] == day:
+                nights.append((date.fromordinal(day), self.prices[index]))
+                index += 1
+            else:
+                nights.append((date.fromordinal(day), self.base))
+        return nights
+
+
+@dataclass(frozen=True)
+class StayQuote:
+    """
+    Priced stay of one room with its per-night breakdown.
+    """
+    room_id: int
+    nightly: list[tuple[date, float]]
+    total: int
+
+
+def _chunks(values: list[int], size: int) -> Iterable[list[int]]:
+    for index in range(0, len(values), size):
+        yield values[index:index + size]
+
+
+def load_rates(room_ids: Iterable[int], first: date, last: date, base_prices: dict[int, float] | None = None) -> dict[int, RoomRates]:
+    """
+    Load base prices and the overrides falling in [first, last) for many rooms.
+
+    Rooms listed in base_prices are not fetched again; unknown rooms are left out.
+    """
+    room_ids = sorted(set(room_ids))
+    prices: dict[int, float] = {room_id: base_prices[room_id] for room_id in room_ids if base_prices and room_id in base_prices}
+    overrides: dict[int, list[tuple[date, float]]] = {}
+    for chunk in _chunks(room_ids, ROOM_ID_CHUNK):
+        missing = [room_id for room_id in chunk if room_id not in prices]
+        if missing:
+            prices.update(Room.objects.filter(id__in=missing).values_list('id', 'price_per_night'))
+        rows = RoomRateOverride.objects.filter(room_id__in=chunk, date__gte=first, date__lt=last).values_list(
+            'room_id', 'date', 'price'
+        )
+        for room_id, day, price in rows:
+            overrides.setdefault(room_id, []).append((day, price))
+    return {room_id: RoomRates(base, overrides.get(room_id, ())) for room_id, base in prices.items()}
+
+
+def quote_stays(stays: Iterable[Stay], base_prices: dict[int, float] | None = None) -> dict[Stay, int]:
+    """
+    Price many stays at once: one query for base prices and one for overrides
+    per chunk of rooms, then constant work per stay.
+
+    Totals are rounded to whole currency units, like Booking.total_price.
+    Stays of unknown rooms are left out of the result.
+    """
+    stays = list(stays)
+    if not stays:
+        return {}
+    rates = load_rates(
+        (stay.room_id for stay in stays),
+        min(stay.check_in for stay in stays),
+        max(stay.check_out for stay in stays),
+        base_prices,
+    )
+    return {
+        stay: round(rates[stay.room_id].total(stay.check_in, stay.check_out))
+        for stay in stays if stay.room_id in rates
+    }
+
+
+def quote_rooms(base_prices: dict[int, float], check_in: date, check_out: date) -> list[StayQuote]:
+    """
+    Price the same stay in many rooms whose base prices are already known,
+    with a single override query per chunk of rooms.
+    """
+    rates = load_rates(base_prices, check_in, check_out, base_prices)
+    return [
+        StayQuote(room_id, rates[room_id].nightly(check_in, check_out), round(rates[room_id].total(check_in, check_out)))
+        for room_id in base_prices
+    ]
+
+
+def quote_stay(room: Room, check_in: date, check_out: date) -> int:
+    """
+    Price a single stay, reusing the base price already loaded on the room.
+    """
+    stay = Stay(room.pk, check_in, check_out)
+    return quote_stays([stay], {room.pk: room.price_per_night})[stay]
@@ -0,0 +1,46 @@
+#Python modules
+from datetime import date
+from typing import Iterable
+
+#Django modules
+from django.db.models import QuerySet
+
+#Project modules
+from apps.booking.models import Booking
+from apps.booking.availability import booked_room_ids
+from apps.hotels.models import Room
+from apps.hotels.queries import bookable_rooms
+from apps.users.models import User
+
+
+def own_bookings(user_id: int, status: str | None = None) -> QuerySet[Booking]:
+    """
+    A user's bookings, optionally with one status.
+    """
+    bookings: QuerySet[Booking] = Booking.objects.filter(user_id=user_id)
+    if status:
+        bookings = bookings.filter(status=status)
+    return bookings
+
+
+def visible_bookings(user: User) -> QuerySet[Booking]:
+    """
+    Bookings a user may list: all of them for staff, their own otherwise.
+    """
+    return Booking.objects.all() if user.is_staff else own_bookings(user.pk)
+
+
+def available_rooms(
+    check_in: date, check_out: date, hotel_id: int | str | None = None, capacity: int | str | None = None,
+) -> QuerySet[Room]:
+    """
+    Bookable rooms free on every night of [check_in, check_out), as the configured availability source sees it.
+    """
+    return bookable_rooms(hotel_id, capacity).exclude(id__in=booked_room_ids(check_in, check_out, hotel_id))
+
+
+def paid_bookings(payment_ids: Iterable[int]) -> QuerySet[Booking]:
+    """
+    Bookings attached to any of the given payments.
+    """
+    return Booking.objects.filter(payment_id__in=list(payment_ids))
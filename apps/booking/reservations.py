@@ -0,0 +1,95 @@
+#Python modules
+import threading
+import time
+from typing import Any
+
+#Django modules
+from django.db import IntegrityError, OperationalError, transaction
+
+#Project modules
+from apps.booking.models import Booking
+from apps.booking.availability import is_room_free
+from apps.booking.events import BOOKING_CREATED, publish_booking
+
+# Striped locks: bookings for one room are written one at a time within a
+# process, without keeping a lock object per room around forever.
+ROOM_LOCK_STRIPES: int = 64
+_room_locks: list[threading.Lock] = [threading.Lock() for _ in range(ROOM_LOCK_STRIPES)]
+
+# Writers in other processes can hold the database's write lock; retry that
+# many times, waiting RESERVE_RETRY_DELAY seconds, doubled after each attempt.
+RESERVE_ATTEMPTS: int = 3
+RESERVE_RETRY_DELAY: float = 0.05
+
+# SQLSTATEs of Postgres serialization failures and deadlocks
+_CONTENTION_STATES: frozenset[str] = frozenset({'40001', '40P01'})
+
+
+class RoomUnavailable(Exception):
+    """
+    Raised when a stay overlaps nights already held by another booking.
+    """
+
+
+class ReservationBusy(Exception):
+    """
+    Raised when other writers kept the database locked through every attempt.
+    """
+
+
+def room_lock(room_id: int) -> threading.Lock:
+    return _room_locks[room_id % ROOM_LOCK_STRIPES]
+
+
+def is_write_contention(exc: OperationalError) -> bool:
+    """
+    Tell whether a database error is another writer getting in the way, worth retrying.
+    """
+    cause = exc.__cause__
+    state: str | None = getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+    return state in _CONTENTION_STATES or 'locked' in str(exc).lower()
+
+
+def reserve_booking(booking: Booking) -> Booking:
+    """
+    Check availability and save the booking as one atomic operation,
+    together with a booking.created outbox event for new bookings.
+
+    Writers for the same room are serialized inside the process, and across
+    processes the unique (room, night) inventory constraint rejects whichever
+    transaction commits second. Lock contention with other processes is
+    retried RESERVE_ATTEMPTS times (once when already inside a transaction,
+    which the failure has broken), then raised as ReservationBusy.
+    """
+    # What saving changes on the instance, put back before a retry
+    fields: dict[str, Any] = dict(booking.__dict__)
+    adding, db = booking._state.adding, booking._state.db
+    in_transaction: bool = transaction.get_connection().in_atomic_block
+    for attempt in range(RESERVE_ATTEMPTS):
+        try:
+            return _reserve(booking)
+        except OperationalError as exc:
+            if not is_write_contention(exc):
+                raise
+            if in_transaction or attempt == RESERVE_ATTEMPTS - 1:
+                raise ReservationBusy(booking.room_id) from exc
+        booking.__dict__.clear()
+        booking.__dict__.update(fields)
+        booking._state.adding, booking._state.db = adding, db
+        time.sleep(RESERVE_RETRY_DELAY * 2 ** attempt)
+
+
+def _reserve(booking: Booking) -> Booking:
+    _, check_in, check_out, _ = booking.stay_key()
+    created: bool = booking._state.adding
+    with room_lock(booking.room_id):
+        try:
+            with transaction.atomic():
+                if booking.is_active and not is_room_free(booking.room_id, check_in, check_out, exclude_booking_id=booking.pk):
+                    raise RoomUnavailable(booking.room_id)
+                booking.save()
+                if created:
+                    publish_booking(BOOKING_CREATED, booking)
+        except IntegrityError as exc:
+            raise RoomUnavailable(booking.room_id) from exc
+    return booking
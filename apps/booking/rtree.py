@@ -0,0 +1,118 @@
+#Python modules
+from datetime import date
+
+#Django modules
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_date
+
+#Project modules
+from apps.booking.models import Booking
+
+# SQLite R*Tree mirror of active stays. Each booking is a 2-D box: room id
+# on one axis, ordinals of its first and last night on the other. Migration
+# booking 0011 creates and fills it on SQLite, booking writes keep it in sync
+# wherever it exists, and BOOKING_RTREE routes overlap checks through it.
+TABLE_NAME: str = 'booking_stay_rtree'
+
+
+def _ordinal(value: date | str) -> int:
+    if isinstance(value, str):
+        value = parse_date(value)
+    return value.toordinal()
+
+
+def is_present() -> bool:
+    """
+    Tell whether the R*Tree table exists in the default (SQLite) database.
+
+    Remembered per connection: the table only comes and goes with migrations.
+    """
+    present: bool | None = getattr(connection, '_booking_rtree_present', None)
+    if present is None:
+        present = connection.vendor == 'sqlite' and TABLE_NAME in connection.introspection.table_names()
+        connection._booking_rtree_present = present
+    return present
+
+
+def is_enabled() -> bool:
+    """
+    Tell whether overlap checks should be answered from the R*Tree.
+    """
+    return getattr(settings, 'BOOKING_RTREE', False) and is_present()
+
+
+def _stay_row(booking_id: int, room_id: int, check_in: date, check_out: date) -> tuple[int, int, int, int, int]:
+    return (booking_id, room_id, room_id, check_in.toordinal(), check_out.toordinal() - 1)
+
+
+def rebuild_rtree(batch_size: int = 5000) -> int:
+    """
+    Refill the table from active bookings, e.g. after restoring a database copy.
+
+    Returns the number of stays written.
+    """
+    # Only stays of at least one night have a box to store
+    stays = Booking.objects.filter(status__in=Booking.ACTIVE_STATUSES, check_out__gt=F('check_in')).values_list(
+        'id', 'room_id', 'check_in', 'check_out'
+    ).order_by('id')
+    written: int = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE_NAME}")
+        batch: list[tuple[int, int, int, int, int]] = []
+        for stay in stays.iterator(chunk_size=batch_size):
+            batch.append(_stay_row(*stay))
+            if len(batch) >= batch_size:
+                cursor.executemany(f"INSERT INTO {TABLE_NAME} VALUES (%s, %s, %s, %s, %s)", batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(f"INSERT INTO {TABLE_NAME} VALUES (%s, %s, %s, %s, %s)", batch)
+            written += len(batch)
+    return written
+
+
+def sync_booking(booking: Booking) -> None:
+    """
+    Mirror the current state of a booking into the R*Tree.
+    """
+    room_id, check_in, check_out, active = booking.stay_key()
+    with connection.cursor() as cursor:
+        if active and check_out > check_in:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {TABLE_NAME} VALUES (%s, %s, %s, %s, %s)",
+                _stay_row(booking.pk, room_id, check_in, check_out),
+            )
+        else:
+            cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE id = %s", [booking.pk])
+
+
+def discard_booking(booking_id: int) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE id = %s", [booking_id])
+
+
+def is_room_booked(room_id: int, check_in: date | str, check_out: date | str, exclude_booking_id: int | None = None) -> bool:
+    """
+    Check whether any stay of the room overlaps [check_in, check_out).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT 1 FROM {TABLE_NAME} "
+            "WHERE room_lo <= %s AND room_hi >= %s AND first_night <= %s AND last_night >= %s AND id != %s "
+            "LIMIT 1",
+            [room_id, room_id, _ordinal(check_out) - 1, _ordinal(check_in), exclude_booking_id or 0],
+        )
+        return cursor.fetchone() is not None
+
+
+def booked_room_ids(check_in: date | str, check_out: date | str) -> RawSQL:
+    """
+    Return a subquery of room ids with a stay overlapping [check_in, check_out).
+    """
+    return RawSQL(
+        f"SELECT room_lo FROM {TABLE_NAME} WHERE first_night <= %s AND last_night >= %s",
+        (_ordinal(check_out) - 1, _ordinal(check_in)),
+    )
@@ -0,0 +1,117 @@
+#Python modules
+import hashlib
+import time
+from datetime import date
+from typing import Any, Callable, Iterable
+
+#Django modules
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+#Project modules
+from apps.core.singleflight import SingleFlight
+
+# Results are stored under a key that embeds the current generation of every
+# (hotel, month) the search touches. Bumping a generation orphans exactly the
+# results that could have changed; they then expire through their TTL.
+ALL_HOTELS: str = '*'
+GLOBAL_GENERATION_KEY: str = 'avail:gen'
+
+_flight = SingleFlight()
+
+
+def _months(check_in: date, check_out: date) -> list[str]:
+    last = max(check_out.toordinal() - 1, check_in.toordinal())
+    year, month = check_in.year, check_in.month
+    end = date.fromordinal(last)
+    months: list[str] = []
+    while (year, month) <= (end.year, end.month):
+        months.append(f'{year:04d}{month:02d}')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _generation_keys(hotel: int | str, months: Iterable[str]) -> list[str]:
+    return [GLOBAL_GENERATION_KEY, f'avail:gen:{hotel}'] + [f'avail:gen:{hotel}:{month}' for month in months]
+
+
+def _generations(keys: list[str]) -> list[int]:
+    found: dict[str, int] = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    for key, value in missing.items():
+        # Start unseen generations at a fresh value so an evicted key can never
+        # line up with results cached before the eviction
+        if not cache.add(key, value, timeout=None):
+            missing[key] = cache.get(key, value)
+    return [found.get(key, missing.get(key)) for key in keys]
+
+
+def _bump(keys: Iterable[str]) -> None:
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def search_key(check_in: date, check_out: date, hotel_id: int | None, capacity: int | None) -> str:
+    hotel = hotel_id if hotel_id is not None else ALL_HOTELS
+    generations = _generations(_generation_keys(hotel, _months(check_in, check_out)))
+    raw = f'{check_in.isoformat()}|{check_out.isoformat()}|{hotel}|{capacity}|{generations}'
+    return 'avail:result:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cached_search(
+    check_in: date,
+    check_out: date,
+    hotel_id: int | None,
+    capacity: int | None,
+    compute: Callable[[], Any],
+) -> Any:
+    """
+    Return a cached availability result, computing it once on a miss.
+    """
+    timeout: int = getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 0)
+    if not timeout:
+        return compute()
+
+    key: str = search_key(check_in, check_out, hotel_id, capacity)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    def fill() -> Any:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+        return value
+
+    return _flight.do(key, fill)
+
+
+def invalidate_stay(hotel_id: int, check_in: date, check_out: date) -> None:
+    """
+    Drop cached results for the hotel (and all-hotel searches) over the stay's months.
+    """
+    months = _months(check_in, check_out)
+    keys = [f'avail:gen:{hotel}:{month}' for hotel in (hotel_id, ALL_HOTELS) for month in months]
+    _bump(keys)
+    # Bump again once committed, in case a search recomputed from pre-commit data meanwhile
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_hotel(hotel_id: int) -> None:
+    """
+    Drop every cached result that could include the hotel's rooms.
+    """
+    keys = [f'avail:gen:{hotel_id}', f'avail:gen:{ALL_HOTELS}']
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_all() -> None:
+    """
+    Drop every cached result, e.g. after a room type used across hotels changes.
+    """
+    _bump([GLOBAL_GENERATION_KEY])
+    transaction.on_commit(lambda: _bump([GLOBAL_GENERATION_KEY]))
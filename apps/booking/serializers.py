@@ -1,9 +1,13 @@
 #DRF modules
+from rest_framework.exceptions import APIException
 from rest_framework.serializers import (
     CharField, 
     ModelSerializer, 
+    Serializer,
     ValidationError, 
     IntegerField,
+    DateField,
+    ListField,
     PrimaryKeyRelatedField
 )
 
@@ -12,14 +16,28 @@ from django.utils import timezone
 
 #Project modules
 from apps.booking.models import Booking
+from apps.booking.availability import is_room_free
+from apps.booking.pricing import quote_stay
+from apps.booking.reservations import ReservationBusy, RoomUnavailable, reserve_booking
+from apps.core.fastserializers import ValuesSerializer
+from apps.core.fieldsets import SparseFieldsMixin
 
-class BookingSerializer(ModelSerializer):
+class BookingBusy(APIException):
+    """
+    Other bookings kept the database busy; the client may retry.
+    """
+    status_code = 503
+    default_detail = "Bookings are busy right now, please retry."
+    default_code = 'booking_busy'
+
+
+class BookingSerializer(SparseFieldsMixin, ModelSerializer):
     """
     Booking serializer with validation logic and related field representation.
     """
     room_number = CharField(source='room.number', read_only=True)
     hotel_name = CharField(source='room.hotel.name', read_only=True)
-    total_price = IntegerField(read_only=True)  # We do read_only, because in the default=0 model
+    total_price = IntegerField(read_only=True)  # Computed from room rates on create and re-dating
     payment = PrimaryKeyRelatedField(read_only=True) 
     
     class Meta:
@@ -27,6 +45,11 @@ class BookingSerializer(ModelSerializer):
         fields = ['id', 'user', 'room', 'room_number', 'hotel_name', 
                 'check_in', 'check_out', 'total_price', 'status', 'payment']
         read_only_fields = ['id', 'user', 'room_number', 'hotel_name', 'total_price', 'payment']
+        expandable_fields = {
+            'user': 'apps.users.serializers.UserSerializer',
+            'room': 'apps.hotels.serializers.RoomSerializer',
+            'payment': 'apps.payment.serializers.PaymentSerializer',
+        }
         
     def validate(self, attrs):
         """
@@ -46,14 +69,8 @@ class BookingSerializer(ModelSerializer):
             raise ValidationError({"check_in": "The arrival date cannot be in the past."})
         
         if room:
-            overlapping = Booking.objects.filter(
-                room=room,
-                check_out__gt=check_in,
-                check_in__lt=check_out,
-                status__in=['confirmed', 'pending']
-            ).exists()
-            
-            if overlapping:
+            current_id = self.instance.pk if self.instance else None
+            if not is_room_free(room.pk, check_in, check_out, exclude_booking_id=current_id):
                 raise ValidationError({"room": "The room is already booked for the specified dates"})
         
         return attrs
@@ -63,4 +80,61 @@ class BookingSerializer(ModelSerializer):
         Create booking with current user as owner.
         """
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        booking = Booking(**validated_data)
+        self._price(booking)
+        return self._reserve(booking)
+
+    def update(self, instance, validated_data):
+        """
+        Update booking, re-checking availability in the same transaction.
+        """
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        if validated_data.keys() & {'room', 'check_in', 'check_out'}:
+            self._price(instance)
+        return self._reserve(instance)
+
+    def _price(self, booking):
+        booking.total_price = quote_stay(booking.room, booking.check_in, booking.check_out)
+
+    def _reserve(self, booking):
+        try:
+            return reserve_booking(booking)
+        except RoomUnavailable:
+            raise ValidationError({"room": "The room is already booked for the specified dates"})
+        except ReservationBusy:
+            raise BookingBusy()
+
+
+
+class BookingValuesSerializer(ValuesSerializer):
+    """
+    Fast list output of BookingSerializer.
+    """
+    serializer_class = BookingSerializer
+
+class QuoteRequestSerializer(Serializer):
+    """
+    Stay dates plus either explicit room ids or a hotel/capacity filter.
+    """
+    MAX_ROOMS = 500
+    MAX_NIGHTS = 366
+
+    check_in = DateField()
+    check_out = DateField()
+    room_ids = ListField(child=IntegerField(min_value=1), required=False, max_length=MAX_ROOMS)
+    hotel_id = IntegerField(required=False, min_value=1)
+    capacity = IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        """
+        Validate the stay length and that some rooms are selected.
+        """
+        nights = (attrs['check_out'] - attrs['check_in']).days
+        if nights <= 0:
+            raise ValidationError({"check_out": "The departure date must be later than the arrival date."})
+        if nights > self.MAX_NIGHTS:
+            raise ValidationError({"check_out": f"A quote covers at most {self.MAX_NIGHTS} nights."})
+        if not attrs.get('room_ids') and 'hotel_id' not in attrs:
+            raise ValidationError({"room_ids": "Pass room_ids or hotel_id."})
+        return attrs
@@ -0,0 +1,161 @@
+#Python modules
+from datetime import timedelta
+
+#Django modules
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+#Project modules
+from apps.booking.models import AvailabilityChange, Booking
+from apps.booking.inventory import sync_booking_nights
+from apps.booking import rtree, search_cache, stats
+from apps.booking.availability import engine_enabled, record_change
+from apps.hotels.models import Hotel, Room, RoomRateOverride, RoomType
+
+
+def _invalidate_search(stays: list[tuple], room: Room | None = None) -> None:
+    """
+    Drop cached availability results for the hotel and months of each active stay.
+    """
+    active = [stay for stay in stays if stay and stay[3]]
+    if not active:
+        return
+    room_ids = {stay[0] for stay in active}
+    if room is not None and room_ids == {room.pk}:
+        hotels: dict[int, int] = {room.pk: room.hotel_id}
+    else:
+        hotels = dict(Room.objects.filter(id__in=room_ids).values_list('id', 'hotel_id'))
+    for room_id, check_in, check_out, _ in active:
+        if room_id in hotels:
+            search_cache.invalidate_stay(hotels[room_id], check_in, check_out)
+
+
+def _cached_room(booking: Booking) -> Room | None:
+    return booking.room if Booking.room.is_cached(booking) else None
+
+
+def _known_hotels(booking: Booking) -> dict[int, int] | None:
+    room = _cached_room(booking)
+    return {room.pk: room.hotel_id} if room is not None else None
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance: Booking, raw: bool = False, **kwargs) -> None:
+    """
+    Keep room-night inventory and the availability engine in step with
+    created, cancelled or re-dated bookings.
+
+    Deleted bookings drop their nights through the foreign key cascade.
+    """
+    if raw:
+        return
+    stay = instance.stay_key()
+    if getattr(instance, '_loaded_stay', None) == stay:
+        return
+
+    sync_booking_nights(instance)
+    _invalidate_search([getattr(instance, '_loaded_stay', None), stay], _cached_room(instance))
+    if rtree.is_present():
+        rtree.sync_booking(instance)
+    if engine_enabled():
+        record_change(AvailabilityChange.BOOKING, instance.pk)
+    instance._loaded_stay = stay
+
+
+@receiver(pre_save, sender=Booking)
+def booking_saving(sender, instance: Booking, raw: bool = False, **kwargs) -> None:
+    # Bookings loaded with deferred fields do not know what they sold
+    if raw or instance._state.adding or hasattr(instance, '_loaded_sale'):
+        return
+    row = Booking.objects.filter(pk=instance.pk).values_list(
+        'room_id', 'check_in', 'check_out', 'total_price', 'status'
+    ).first()
+    instance._loaded_sale = row[:4] if row and row[4] in Booking.SOLD_STATUSES else None
+
+
+@receiver(post_save, sender=Booking)
+def booking_sale_saved(sender, instance: Booking, created: bool = False, raw: bool = False, **kwargs) -> None:
+    """
+    Move the booking's nights and revenue in the daily hotel stats when what it sold changes.
+    """
+    if raw:
+        return
+    sale = instance.sale_key()
+    previous = None if created else getattr(instance, '_loaded_sale', None)
+    if previous != sale:
+        stats.record_sales([(previous, -1), (sale, 1)], _known_hotels(instance))
+    instance._loaded_sale = sale
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance: Booking, **kwargs) -> None:
+    _invalidate_search([instance.stay_key()], _cached_room(instance))
+    stats.record_sales([(instance.sale_key(), -1)], _known_hotels(instance))
+    if rtree.is_present():
+        rtree.discard_booking(instance.pk)
+    if engine_enabled():
+        record_change(AvailabilityChange.BOOKING, instance.pk)
+
+
+@receiver(pre_save, sender=Room)
+def room_saving(sender, instance: Room, raw: bool = False, **kwargs) -> None:
+    # Rooms loaded with the hotel deferred do not know which one they left
+    if raw or instance._state.adding or hasattr(instance, '_loaded_hotel_id'):
+        return
+    instance._loaded_hotel_id = Room.objects.filter(pk=instance.pk).values_list('hotel_id', flat=True).first()
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance: Room, created: bool = False, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_loaded_hotel_id', None)
+    search_cache.invalidate_hotel(instance.hotel_id)
+    if created:
+        stats.adjust_room_count(instance.hotel_id, 1, timezone.localdate())
+    elif previous is not None and previous != instance.hotel_id:
+        search_cache.invalidate_hotel(previous)
+        stats.adjust_room_count(previous, -1, timezone.localdate())
+        stats.adjust_room_count(instance.hotel_id, 1, timezone.localdate())
+    if engine_enabled():
+        record_change(AvailabilityChange.ROOM, instance.pk)
+    instance._loaded_hotel_id = instance.hotel_id
+
+
+@receiver(post_delete, sender=Room)
+def room_deleted(sender, instance: Room, **kwargs) -> None:
+    search_cache.invalidate_hotel(instance.hotel_id)
+    stats.adjust_room_count(instance.hotel_id, -1, timezone.localdate())
+    if engine_enabled():
+        record_change(AvailabilityChange.ROOM, instance.pk)
+
+
+@receiver(post_save, sender=Hotel)
+@receiver(post_delete, sender=Hotel)
+def hotel_changed(sender, instance: Hotel, raw: bool = False, **kwargs) -> None:
+    # Search results embed the hotel name
+    if not raw:
+        search_cache.invalidate_hotel(instance.pk)
+
+
+@receiver(post_save, sender=RoomType)
+@receiver(post_delete, sender=RoomType)
+def room_type_changed(sender, instance: RoomType, raw: bool = False, **kwargs) -> None:
+    if not raw:
+        search_cache.invalidate_all()
+
+
+@receiver(post_save, sender=RoomRateOverride)
+@receiver(post_delete, sender=RoomRateOverride)
+def rate_override_changed(sender, instance: RoomRateOverride, raw: bool = False, **kwargs) -> None:
+    # Search results carry stay totals priced from these rates; an edit may
+    # have moved the rate off the night (and room) it was loaded with
+    if raw:
+        return
+    nights = {(instance.room_id, instance.date), getattr(instance, '_loaded_night', None)} - {None}
+    hotels = dict(Room.objects.filter(pk__in={room_id for room_id, _ in nights}).values_list('id', 'hotel_id'))
+    for room_id, night in nights:
+        if room_id in hotels:
+            search_cache.invalidate_stay(hotels[room_id], night, night + timedelta(days=1))
+    instance._loaded_night = (instance.room_id, instance.date)
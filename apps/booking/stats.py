@@ -0,0 +1,191 @@
+#Python modules
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable
+
+#Django modules
+from django.db import connection, transaction
+from django.db.models import Count, F, QuerySet
+
+#Project modules
+from apps.booking.models import Booking, HotelDailyStats
+from apps.hotels.models import Room
+
+# (room_id, check_in, check_out, total_price) of a sold booking, see Booking.sale_key
+Sale = tuple[int, date, date, int]
+
+TABLE_NAME: str = HotelDailyStats._meta.db_table
+ROOM_TABLE_NAME: str = Room._meta.db_table
+
+# Hotel days per upsert statement, keeping bound parameters under SQLite's limit
+UPSERT_CHUNK: int = 150
+
+# Adds to existing days or creates them with the hotel's current room count.
+# ON CONFLICT ... DO UPDATE is understood by both SQLite and PostgreSQL.
+_UPSERT_ROW: str = f"(%s, %s, %s, %s, (SELECT COUNT(*) FROM {ROOM_TABLE_NAME} WHERE hotel_id = %s))"
+_UPSERT: str = (
+    f"INSERT INTO {TABLE_NAME} (hotel_id, date, rooms_sold, revenue, room_count) VALUES {{rows}} "
+    f"ON CONFLICT (hotel_id, date) DO UPDATE SET "
+    f"rooms_sold = {TABLE_NAME}.rooms_sold + excluded.rooms_sold, "
+    f"revenue = {TABLE_NAME}.revenue + excluded.revenue"
+)
+
+
+@dataclass
+class StatsTotals:
+    """
+    Sums of daily stats over a period, with the ratios derived from them.
+    """
+    rooms_sold: int = 0
+    revenue: int = 0
+    room_nights: int = 0
+
+    @property
+    def adr(self) -> float:
+        return self.revenue / self.rooms_sold if self.rooms_sold else 0.0
+
+    @property
+    def revpar(self) -> float:
+        return self.revenue / self.room_nights if self.room_nights else 0.0
+
+    @property
+    def occupancy(self) -> float:
+        return self.rooms_sold / self.room_nights if self.room_nights else 0.0
+
+
+def _nights(check_in: date, check_out: date, revenue: int) -> Iterable[tuple[date, int]]:
+    """
+    Spread a stay's revenue over its nights, whole units only, remainder on the first nights.
+    """
+    nights = (check_out - check_in).days
+    if nights <= 0:
+        return
+    share, extra = divmod(revenue, nights)
+    for offset in range(nights):
+        yield check_in + timedelta(days=offset), share + (1 if offset < extra else 0)
+
+
+def record_sales(changes: Iterable[tuple[Sale | None, int]], hotels: dict[int, int] | None = None) -> None:
+    """
+    Add (sign 1) or remove (sign -1) sales from the daily stats.
+
+    Changes are summed per hotel day and written with one upsert statement
+    per UPSERT_CHUNK days, so a batch of bookings costs about as much as one. `hotels` maps room ids to hotel ids the
+    caller already knows; other rooms are looked up in one query.
+    """
+    changes = [(sale, sign) for sale, sign in changes if sale is not None and sign]
+    if not changes:
+        return
+    hotels = dict(hotels or {})
+    missing = {sale[0] for sale, _ in changes} - hotels.keys()
+    if missing:
+        hotels.update(Room.objects.filter(id__in=missing).values_list('id', 'hotel_id'))
+
+    deltas: dict[tuple[int, date], list[int]] = {}
+    for (room_id, check_in, check_out, revenue), sign in changes:
+        if room_id not in hotels:
+            continue
+        for night, share in _nights(check_in, check_out, revenue):
+            delta = deltas.setdefault((hotels[room_id], night), [0, 0])
+            delta[0] += sign
+            delta[1] += sign * share
+
+    adapt = connection.ops.adapt_datefield_value
+    rows = [
+        (hotel_id, adapt(night), rooms, revenue, hotel_id)
+        for (hotel_id, night), (rooms, revenue) in sorted(deltas.items()) if rooms or revenue
+    ]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_CHUNK):
+            chunk = rows[start:start + UPSERT_CHUNK]
+            cursor.execute(
+                _UPSERT.format(rows=', '.join([_UPSERT_ROW] * len(chunk))),
+                [value for row in chunk for value in row],
+            )
+
+
+def sold_bookings(bookings: QuerySet[Booking]) -> tuple[dict[int, Sale], dict[int, int]]:
+    """
+    Load the sales of the given bookings, by booking id, and the hotels of their rooms in one query.
+    """
+    rows = list(bookings.values_list('id', 'room_id', 'room__hotel_id', 'check_in', 'check_out', 'total_price'))
+    return (
+        {booking_id: (room_id, check_in, check_out, total_price) for booking_id, room_id, _, check_in, check_out, total_price in rows},
+        {room_id: hotel_id for _, room_id, hotel_id, *_ in rows},
+    )
+
+
+def adjust_room_count(hotel_id: int, change: int, since: date) -> None:
+    """
+    Follow a room being added or removed on the stats of days from `since` on.
+    """
+    HotelDailyStats.objects.filter(hotel_id=hotel_id, date__gte=since).update(
+        room_count=F('room_count') + change
+    )
+
+
+def hotel_stats(hotel_id: int, first: date, last: date) -> tuple[list[dict], StatsTotals]:
+    """
+    Daily stats of a hotel for every date in [first, last], plus their totals.
+
+    Days nobody stayed are reported with nothing sold and the current room
+    count. Reads one stats row per day at most.
+    """
+    stored: dict[date, HotelDailyStats] = {
+        row.date: row for row in HotelDailyStats.objects.filter(hotel_id=hotel_id, date__gte=first, date__lte=last)
+    }
+    room_count: int = Room.objects.filter(hotel_id=hotel_id).count()
+
+    days: list[dict] = []
+    totals = StatsTotals()
+    for offset in range((last - first).days + 1):
+        day = first + timedelta(days=offset)
+        row = stored.get(day) or HotelDailyStats(hotel_id=hotel_id, date=day, room_count=room_count)
+        days.append({
+            'date': day,
+            'rooms_sold': row.rooms_sold,
+            'room_count': row.room_count,
+            'revenue': row.revenue,
+            'adr': round(row.adr, 2),
+            'revpar': round(row.revpar, 2),
+        })
+        totals.rooms_sold += row.rooms_sold
+        totals.revenue += row.revenue
+        totals.room_nights += row.room_count
+    return days, totals
+
+
+def rebuild_stats(batch_size: int = 2000) -> int:
+    """
+    Recompute every daily stats row from sold bookings.
+
+    Days keep the current room count of their hotel. Returns the number of rows written.
+    """
+    bookings = Booking.objects.filter(status__in=Booking.SOLD_STATUSES).values_list(
+        'room__hotel_id', 'check_in', 'check_out', 'total_price'
+    ).order_by('id')
+    totals: dict[tuple[int, date], list[int]] = {}
+    for hotel_id, check_in, check_out, total_price in bookings.iterator(chunk_size=batch_size):
+        for night, share in _nights(check_in, check_out, total_price):
+            day = totals.setdefault((hotel_id, night), [0, 0])
+            day[0] += 1
+            day[1] += share
+
+    room_counts: dict[int, int] = dict(
+        Room.objects.values('hotel_id').annotate(rooms=Count('id')).values_list('hotel_id', 'rooms')
+    )
+    with transaction.atomic():
+        HotelDailyStats.objects.all().delete()
+        HotelDailyStats.objects.bulk_create(
+            (
+                HotelDailyStats(
+                    hotel_id=hotel_id, date=night, rooms_sold=rooms, revenue=revenue,
+                    room_count=room_counts.get(hotel_id, 0),
+                )
+                for (hotel_id, night), (rooms, revenue) in sorted(totals.items())
+            ),
+            batch_size=batch_size,
+        )
+    return len(totals)
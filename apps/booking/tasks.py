@@ -0,0 +1,14 @@
+#Project modules
+from apps.booking.inventory import rebuild_inventory
+from apps.booking.stats import rebuild_stats
+from apps.core.jobs import task
+
+
+@task('booking.rebuild_stats', priority=-10, max_attempts=1)
+def rebuild_stats_task(batch_size: int = 2000) -> None:
+    rebuild_stats(batch_size=batch_size)
+
+
+@task('booking.rebuild_inventory', priority=-10, max_attempts=1)
+def rebuild_inventory_task(batch_size: int = 2000) -> None:
+    rebuild_inventory(batch_size=batch_size)
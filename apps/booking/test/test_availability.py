@@ -0,0 +1,132 @@
+import pytest
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from apps.booking.models import AvailabilityChange, Booking
+from apps.booking.availability import AvailabilityEngine, RoomIntervals, engine, is_room_free
+from apps.booking.queries import available_rooms
+from apps.hotels.models import Room
+
+
+def ordinal(day):
+    return date(2030, 1, day).toordinal()
+
+
+class TestRoomIntervals:
+
+    def test_overlap_is_half_open(self):
+        intervals = RoomIntervals()
+        intervals.add(1, ordinal(10), ordinal(12))
+
+        assert intervals.overlaps(ordinal(11), ordinal(13))
+        assert not intervals.overlaps(ordinal(12), ordinal(14))
+        assert not intervals.overlaps(ordinal(8), ordinal(10))
+
+    def test_long_stay_found_behind_short_ones(self):
+        intervals = RoomIntervals()
+        intervals.add(1, ordinal(1), ordinal(20))
+        intervals.add(2, ordinal(5), ordinal(6))
+
+        assert intervals.overlaps(ordinal(15), ordinal(16))
+        assert not intervals.overlaps(ordinal(15), ordinal(16), exclude_booking_id=1)
+
+
+@pytest.fixture
+def availability_engine(settings):
+    settings.BOOKING_AVAILABILITY_ENGINE = True
+    engine.reload()
+    return engine
+
+
+def no_reload(monkeypatch, *engines):
+    for each in engines:
+        monkeypatch.setattr(each, 'reload', lambda: pytest.fail('engine reloaded'))
+
+
+@pytest.mark.django_db
+class TestAvailabilityEngine:
+
+    def test_incremental_updates(self, user_customer, room, availability_engine, monkeypatch):
+        other = AvailabilityEngine()
+        other.reload()
+        # Writes from either process are replayed row by row, never by a reload
+        no_reload(monkeypatch, availability_engine, other)
+
+        booking = Booking.objects.create(
+            user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 12)
+        )
+        assert not availability_engine.is_free(room.id, date(2030, 1, 11), date(2030, 1, 15))
+        assert availability_engine.booked_room_ids(date(2030, 1, 11), date(2030, 1, 15), room.hotel_id) == {room.id}
+        assert not other.is_free(room.id, date(2030, 1, 11), date(2030, 1, 15))
+
+        booking.status = Booking.CANCELLED
+        booking.save()
+        assert availability_engine.is_free(room.id, date(2030, 1, 11), date(2030, 1, 15))
+        assert availability_engine.free_room_ids(room.hotel_id, date(2030, 1, 11), date(2030, 1, 15)) == {room.id}
+        assert other.is_free(room.id, date(2030, 1, 11), date(2030, 1, 15))
+
+    def test_writers_get_consecutive_versions(self, user_customer, room, availability_engine):
+        for day in (1, 5, 9):
+            Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, day), check_out=date(2030, 1, day + 2))
+
+        versions = list(AvailabilityChange.objects.order_by('version').values_list('version', flat=True))
+        assert versions == list(range(versions[0], versions[0] + 3))
+
+    def test_pruned_log_triggers_reload(self, user_customer, room, availability_engine):
+        assert availability_engine.is_free(room.id, date(2030, 1, 10), date(2030, 1, 12))
+        Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 1), check_out=date(2030, 1, 2))
+        Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 12))
+
+        AvailabilityChange.objects.order_by('version').first().delete()
+
+        assert not availability_engine.is_free(room.id, date(2030, 1, 10), date(2030, 1, 12))
+        assert not availability_engine.is_free(room.id, date(2030, 1, 1), date(2030, 1, 2))
+
+    def test_rolled_back_write_is_not_kept(self, user_customer, room, availability_engine):
+        other = Room.objects.create(number=102, price_per_night=100, hotel=room.hotel, room_type=room.room_type)
+        stay = (date(2030, 1, 10), date(2030, 1, 12))
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Booking.objects.create(user=user_customer, room=room, check_in=stay[0], check_out=stay[1])
+                assert not is_room_free(room.id, *stay)
+                raise RuntimeError('rolled back')
+        # The next writer gets the version the rolled-back one had
+        Booking.objects.create(user=user_customer, room=other, check_in=stay[0], check_out=stay[1])
+
+        assert is_room_free(room.id, *stay)
+        assert not is_room_free(other.id, *stay)
+
+    def test_booked_rooms_bind_one_parameter(self, user_customer, room, availability_engine):
+        rooms = [room] + [
+            Room.objects.create(number=number, price_per_night=100, hotel=room.hotel, room_type=room.room_type)
+            for number in range(102, 110)
+        ]
+        for each in rooms[:6]:
+            Booking.objects.create(user=user_customer, room=each, check_in=date(2030, 1, 10), check_out=date(2030, 1, 12))
+
+        free = available_rooms(date(2030, 1, 10), date(2030, 1, 12))
+
+        assert len(free.query.sql_with_params()[1]) <= 2
+        assert set(free.values_list('id', flat=True)) == {each.id for each in rooms[6:]}
+
+    def test_new_room_is_indexed(self, room, availability_engine):
+        other = Room.objects.create(number=102, price_per_night=100, hotel=room.hotel, room_type=room.room_type)
+
+        assert availability_engine.free_room_ids(room.hotel_id, date(2030, 1, 1), date(2030, 1, 2)) == {room.id, other.id}
+        assert AvailabilityEngine().free_room_ids(room.hotel_id, date(2030, 1, 1), date(2030, 1, 2)) == {room.id, other.id}
+
+    def test_create_rejects_overlap_through_engine(self, api_client, user_customer, room, availability_engine):
+        check_in = date.today() + timedelta(days=3)
+        Booking.objects.create(user=user_customer, room=room, check_in=check_in, check_out=check_in + timedelta(days=2))
+        api_client.force_authenticate(user=user_customer)
+
+        response = api_client.post("/api/bookings/", {
+            "room": room.id,
+            "check_in": check_in + timedelta(days=1),
+            "check_out": check_in + timedelta(days=3),
+        }, format='json')
+
+        assert response.status_code == 400
+        assert "room" in response.data
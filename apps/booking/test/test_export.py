@@ -0,0 +1,72 @@
+import pytest
+import json
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.booking.models import Booking
+from apps.payment.models import Payment
+
+
+@pytest.fixture
+def bookings(user_customer, room):
+    payment = Payment.objects.create(user=user_customer, amount=Decimal('20000.00'), payment_method='cash', status='completed')
+    return [
+        Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 1), check_out=date(2030, 1, 3), status='confirmed', payment=payment),
+        Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 2, 1), check_out=date(2030, 2, 2), status='pending'),
+    ]
+
+
+@pytest.mark.django_db
+class TestBookingExport:
+
+    def test_ndjson_stream(self, api_client, user_admin, bookings):
+        user_admin.is_staff = True
+        api_client.force_authenticate(user=user_admin)
+        response = api_client.get("/api/bookings/export/", {"status": "confirmed"})
+
+        assert response.status_code == 200
+        assert response.streaming
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)['id'] for line in lines] == [bookings[0].id]
+        assert json.loads(lines[0])['hotel_name'] == "Test Hotel"
+
+    def test_csv_date_filter(self, api_client, user_admin, bookings):
+        user_admin.is_staff = True
+        api_client.force_authenticate(user=user_admin)
+        response = api_client.get("/api/bookings/export/", {"output": "csv", "from": "2030-01-15"})
+
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        assert rows[0].startswith("id,user_id,room_id")
+        assert len(rows) == 2 and rows[1].startswith(f"{bookings[1].id},")
+
+    def test_customer_forbidden(self, api_client, user_customer, bookings):
+        api_client.force_authenticate(user=user_customer)
+        assert api_client.get("/api/bookings/export/").status_code == 403
+
+    def test_bad_date_rejected(self, api_client, user_admin):
+        user_admin.is_staff = True
+        api_client.force_authenticate(user=user_admin)
+        assert api_client.get("/api/bookings/export/", {"to": "soon"}).status_code == 400
+
+    def test_bad_hotel_id_rejected(self, api_client, user_admin):
+        user_admin.is_staff = True
+        api_client.force_authenticate(user=user_admin)
+
+        response = api_client.get("/api/bookings/export/", {"hotel_id": "abc"})
+
+        assert response.status_code == 400
+        assert response.data == {"hotel_id": "A valid integer is required."}
+        with pytest.raises(CommandError, match="hotel_id: A valid integer is required."):
+            call_command('exportpayments', '--hotel-id', '\u0661\u0662', stdout=StringIO())
+
+    def test_payments_by_hotel_command(self, bookings, hotel):
+        out = StringIO()
+        call_command('exportpayments', '--format', 'csv', '--hotel-id', str(hotel.id), stdout=out)
+
+        rows = out.getvalue().splitlines()
+        assert len(rows) == 2
+        assert ",20000.00,cash,completed," in rows[1]
@@ -0,0 +1,81 @@
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from apps.booking.models import Booking, RoomNight
+from apps.booking.inventory import find_inventory_drift
+
+
+def make_booking(user, room, check_in, nights, status=Booking.PENDING):
+    return Booking.objects.create(
+        user=user,
+        room=room,
+        check_in=check_in,
+        check_out=check_in + timedelta(days=nights),
+        status=status,
+    )
+
+
+@pytest.mark.django_db
+class TestRoomNightInventory:
+
+    def test_booking_creates_one_night_per_stay_day(self, user_customer, room):
+        booking = make_booking(user_customer, room, date(2030, 1, 10), 3)
+
+        nights = list(RoomNight.objects.filter(booking=booking).values_list('night', flat=True).order_by('night'))
+        assert nights == [date(2030, 1, 10), date(2030, 1, 11), date(2030, 1, 12)]
+
+    def test_cancel_releases_nights(self, user_customer, room):
+        booking = make_booking(user_customer, room, date(2030, 1, 10), 3)
+        booking.status = Booking.CANCELLED
+        booking.save()
+
+        assert not RoomNight.objects.filter(booking=booking).exists()
+
+    def test_date_change_moves_nights(self, user_customer, room):
+        booking = Booking.objects.get(pk=make_booking(user_customer, room, date(2030, 1, 10), 3).pk)
+        booking.check_in = date(2030, 2, 1)
+        booking.check_out = date(2030, 2, 3)
+        booking.save()
+
+        nights = set(RoomNight.objects.filter(booking=booking).values_list('night', flat=True))
+        assert nights == {date(2030, 2, 1), date(2030, 2, 2)}
+
+    def test_delete_cascades_nights(self, user_customer, room):
+        booking = make_booking(user_customer, room, date(2030, 1, 10), 3)
+        booking.delete()
+
+        assert RoomNight.objects.count() == 0
+
+    def test_rebuild_repairs_drift(self, user_customer, room):
+        booking = make_booking(user_customer, room, date(2030, 1, 10), 2)
+        RoomNight.objects.filter(booking=booking).delete()
+
+        assert [drift.booking_id for drift in find_inventory_drift()] == [booking.pk]
+        with pytest.raises(CommandError):
+            call_command('checkinventory', stdout=StringIO())
+
+        call_command('rebuildinventory', stdout=StringIO())
+        assert find_inventory_drift() == []
+
+
+@pytest.mark.django_db
+class TestAvailableRooms:
+
+    def test_booked_room_is_hidden(self, api_client, user_customer, room):
+        check_in = timezone.now().date() + timedelta(days=5)
+        make_booking(user_customer, room, check_in, 2)
+        api_client.force_authenticate(user=user_customer)
+
+        url = "/api/bookings/available-rooms/"
+        overlapping = api_client.get(url, {"check_in": check_in + timedelta(days=1), "check_out": check_in + timedelta(days=4)})
+        after = api_client.get(url, {"check_in": check_in + timedelta(days=2), "check_out": check_in + timedelta(days=4)})
+
+        assert overlapping.status_code == 200
+        assert overlapping.data['count'] == 0
+        assert after.data['count'] == 1
+        assert after.data['available_rooms'][0]['id'] == room.id
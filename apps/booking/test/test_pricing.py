@@ -0,0 +1,120 @@
+import pytest
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from apps.booking.models import Booking
+from apps.booking.pricing import RoomRates, Stay, quote_stay, quote_stays
+from apps.hotels.models import Room, RoomRateOverride
+
+
+class TestRoomRates:
+
+    def test_base_price_per_night(self):
+        rates = RoomRates(100.0)
+
+        assert rates.total(date(2030, 1, 1), date(2030, 1, 4)) == 300.0
+        assert rates.total(date(2030, 1, 4), date(2030, 1, 4)) == 0.0
+
+    def test_overrides_only_inside_stay(self):
+        rates = RoomRates(100.0, [(date(2030, 1, 2), 150.0), (date(2030, 1, 5), 40.0), (date(2030, 1, 9), 1.0)])
+
+        assert rates.total(date(2030, 1, 1), date(2030, 1, 6)) == 100 + 150 + 100 + 100 + 40
+        # The check-out date is not a night of the stay
+        assert rates.total(date(2030, 1, 6), date(2030, 1, 9)) == 300.0
+
+
+@pytest.mark.django_db
+class TestQuoteStays:
+
+    def test_batch_matches_single_quotes(self, room, django_assert_num_queries):
+        other = Room.objects.create(number=102, price_per_night=5000, hotel=room.hotel, room_type=room.room_type)
+        RoomRateOverride.objects.create(room=room, date=date(2030, 3, 2), price=12000)
+        stays = [
+            Stay(room.pk, date(2030, 3, 1), date(2030, 3, 4)),
+            Stay(room.pk, date(2030, 3, 3), date(2030, 3, 5)),
+            Stay(other.pk, date(2030, 3, 1), date(2030, 3, 3)),
+        ]
+
+        with django_assert_num_queries(2):
+            quotes = quote_stays(stays)
+
+        assert quotes == {stays[0]: 32000, stays[1]: 20000, stays[2]: 10000}
+        assert quote_stay(room, date(2030, 3, 1), date(2030, 3, 4)) == 32000
+
+    def test_unknown_room_left_out(self, db):
+        assert quote_stays([Stay(999, date(2030, 3, 1), date(2030, 3, 2))]) == {}
+
+
+class TestBookingPrice:
+
+    def test_api_booking_gets_total_price(self, api_client, user_customer, room):
+        check_in = timezone.now().date() + timedelta(days=10)
+        RoomRateOverride.objects.create(room=room, date=check_in + timedelta(days=1), price=25000)
+        api_client.force_authenticate(user=user_customer)
+
+        response = api_client.post('/api/bookings/', {
+            'room': room.pk,
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=2)).isoformat(),
+        }, format='json')
+
+        assert response.status_code == 201
+        assert response.data['total_price'] == 35000
+        assert Booking.objects.get(pk=response.data['id']).total_price == 35000
+
+    def test_search_results_carry_stay_total(self, api_client, user_customer, room):
+        api_client.force_authenticate(user=user_customer)
+        RoomRateOverride.objects.create(room=room, date=date(2030, 3, 10), price=0)
+
+        response = api_client.get('/api/bookings/available-rooms/', {'check_in': '2030-03-10', 'check_out': '2030-03-12'})
+
+        assert response.data['available_rooms'][0]['total_price'] == 10000
+
+
+class TestQuoteEndpoint:
+
+    @pytest.fixture
+    def quote_client(self, api_client, user_customer):
+        api_client.force_authenticate(user=user_customer)
+        return api_client
+
+    def test_breakdown_for_listed_rooms(self, quote_client, room, django_assert_max_num_queries):
+        other = Room.objects.create(number=102, price_per_night=5000, hotel=room.hotel, room_type=room.room_type)
+        RoomRateOverride.objects.create(room=room, date=date(2030, 3, 2), price=12000)
+
+        with django_assert_max_num_queries(2):
+            response = quote_client.post('/api/bookings/quote/', {
+                'check_in': '2030-03-01', 'check_out': '2030-03-03', 'room_ids': [room.pk, other.pk],
+            }, format='json')
+
+        assert response.status_code == 200
+        assert response.data['nights'] == 2
+        first, second = response.data['quotes']
+        assert first == {
+            'room_id': room.pk,
+            'nightly': [{'date': date(2030, 3, 1), 'price': 10000}, {'date': date(2030, 3, 2), 'price': 12000}],
+            'total': 22000,
+        }
+        assert second['total'] == 10000
+
+    def test_hotel_and_capacity_filter(self, quote_client, room):
+        Room.objects.create(number=103, price_per_night=5000, hotel=room.hotel, room_type=room.room_type, is_available=False)
+
+        response = quote_client.post('/api/bookings/quote/', {
+            'check_in': '2030-03-01', 'check_out': '2030-03-02', 'hotel_id': room.hotel_id, 'capacity': 2,
+        }, format='json')
+
+        assert [quote['room_id'] for quote in response.data['quotes']] == [room.pk]
+        assert quote_client.post('/api/bookings/quote/', {
+            'check_in': '2030-03-01', 'check_out': '2030-03-02', 'hotel_id': room.hotel_id, 'capacity': 3,
+        }, format='json').data['count'] == 0
+
+    def test_rejects_bad_requests(self, quote_client, room):
+        no_rooms = quote_client.post('/api/bookings/quote/', {'check_in': '2030-03-01', 'check_out': '2030-03-02'}, format='json')
+        reversed_dates = quote_client.post('/api/bookings/quote/', {
+            'check_in': '2030-03-02', 'check_out': '2030-03-01', 'room_ids': [room.pk],
+        }, format='json')
+
+        assert no_rooms.status_code == 400
+        assert reversed_dates.status_code == 400
@@ -0,0 +1,114 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from random import Random
+
+from django.db import IntegrityError, OperationalError, connection
+
+from apps.booking.models import Booking
+from apps.booking import reservations
+from apps.booking.reservations import ReservationBusy, RoomUnavailable, reserve_booking
+
+
+@pytest.mark.django_db
+class TestReserveBooking:
+
+    def test_overlap_is_rejected(self, user_customer, room):
+        reserve_booking(Booking(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 13)))
+
+        with pytest.raises(RoomUnavailable):
+            reserve_booking(Booking(user=user_customer, room=room, check_in=date(2030, 1, 12), check_out=date(2030, 1, 14)))
+        assert Booking.objects.count() == 1
+
+    def test_inventory_constraint_backs_up_the_check(self, user_customer, room):
+        Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 13))
+
+        # A save that skipped the availability check still cannot double-book
+        with pytest.raises(IntegrityError):
+            Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 11), check_out=date(2030, 1, 12))
+        assert Booking.objects.count() == 1
+
+
+@pytest.fixture
+def locked_database(monkeypatch):
+    """
+    Make the first `failures` availability checks fail as if another process held the write lock.
+    """
+    monkeypatch.setattr(reservations, 'RESERVE_RETRY_DELAY', 0)
+    is_room_free = reservations.is_room_free
+
+    def lock(failures):
+        calls = []
+
+        def check(*args, **kwargs):
+            calls.append(args)
+            if len(calls) <= failures:
+                raise OperationalError('database is locked')
+            return is_room_free(*args, **kwargs)
+
+        monkeypatch.setattr(reservations, 'is_room_free', check)
+        return calls
+    return lock
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWriteContention:
+
+    def test_locked_database_is_retried(self, user_customer, room, locked_database):
+        calls = locked_database(2)
+
+        booking = reserve_booking(Booking(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 13)))
+
+        assert len(calls) == 3
+        assert Booking.objects.get().pk == booking.pk
+        assert booking.nights.count() == 3
+
+    def test_lasting_contention_is_busy(self, user_customer, room, locked_database):
+        locked_database(reservations.RESERVE_ATTEMPTS)
+
+        with pytest.raises(ReservationBusy):
+            reserve_booking(Booking(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 13)))
+        assert not Booking.objects.exists()
+
+    def test_api_answers_503(self, api_client, user_customer, room, locked_database):
+        locked_database(reservations.RESERVE_ATTEMPTS)
+        api_client.force_authenticate(user=user_customer)
+        check_in = date.today() + timedelta(days=3)
+
+        response = api_client.post('/api/bookings/', {
+            'room': room.id, 'check_in': check_in, 'check_out': check_in + timedelta(days=2),
+        }, format='json')
+
+        assert response.status_code == 503
+        assert response.data['detail'].code == 'booking_busy'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentReservations:
+
+    ATTEMPTS = 300
+    WORKERS = 32
+
+    def test_no_overlaps_under_contention(self, user_customer, room):
+        rng = Random(7)
+        stays = []
+        for _ in range(self.ATTEMPTS):
+            check_in = date(2030, 1, 1) + timedelta(days=rng.randint(0, 60))
+            stays.append((check_in, check_in + timedelta(days=rng.randint(1, 5))))
+
+        def attempt(stay):
+            try:
+                reserve_booking(Booking(user_id=user_customer.id, room_id=room.id, check_in=stay[0], check_out=stay[1]))
+                return True
+            except RoomUnavailable:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(attempt, stays))
+
+        booked = sorted(Booking.objects.filter(room=room).values_list('check_in', 'check_out'))
+        assert len(booked) == sum(results) > 0
+        for (_, previous_out), (next_in, _) in zip(booked, booked[1:]):
+            assert previous_out <= next_in
@@ -0,0 +1,55 @@
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+
+from apps.booking import rtree
+from apps.booking.models import Booking
+from apps.booking.availability import booked_room_ids, is_room_free
+from apps.hotels.models import Room
+
+
+@pytest.fixture
+def stay_rtree(db, settings):
+    settings.BOOKING_RTREE = True
+
+
+@pytest.mark.django_db
+class TestStayRTree:
+
+    def test_writes_are_mirrored(self, stay_rtree, user_customer, room):
+        booking = Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 12))
+
+        assert rtree.is_room_booked(room.id, date(2030, 1, 11), date(2030, 1, 13))
+        assert not rtree.is_room_booked(room.id, date(2030, 1, 12), date(2030, 1, 13))
+        assert not rtree.is_room_booked(room.id, date(2030, 1, 11), date(2030, 1, 13), exclude_booking_id=booking.id)
+
+        booking.status = Booking.CANCELLED
+        booking.save()
+        assert not rtree.is_room_booked(room.id, date(2030, 1, 11), date(2030, 1, 13))
+
+    def test_overlap_checks_route_through_rtree(self, stay_rtree, user_customer, room):
+        other = Room.objects.create(number=102, price_per_night=100, hotel=room.hotel, room_type=room.room_type)
+        Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 12))
+
+        free = Room.objects.exclude(id__in=booked_room_ids(date(2030, 1, 11), date(2030, 1, 12)))
+        assert list(free.values_list('id', flat=True)) == [other.id]
+        assert not is_room_free(room.id, date(2030, 1, 9), date(2030, 1, 11))
+
+    def test_kept_in_sync_while_not_routed(self, user_customer, room):
+        Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 10), check_out=date(2030, 1, 12))
+
+        assert not rtree.is_enabled()
+        assert rtree.is_room_booked(room.id, date(2030, 1, 11), date(2030, 1, 13))
+
+    def test_build_command_refills_missing_stays(self, user_customer, room):
+        check_in = date.today() + timedelta(days=1)
+        Booking.objects.create(user=user_customer, room=room, check_in=check_in, check_out=check_in + timedelta(days=2))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {rtree.TABLE_NAME}")
+
+        call_command('buildrtree', stdout=StringIO())
+
+        assert rtree.is_room_booked(room.id, check_in, check_in + timedelta(days=1))
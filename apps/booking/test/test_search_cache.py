@@ -0,0 +1,184 @@
+import threading
+import time
+import pytest
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.booking.models import Booking
+from apps.booking.search_cache import _months
+from apps.core.singleflight import SingleFlight
+from apps.hotels.models import Hotel, Room, RoomRateOverride
+
+URL = '/api/bookings/available-rooms/'
+
+
+@pytest.fixture
+def search_client(api_client, user_customer):
+    api_client.force_authenticate(user=user_customer)
+    return api_client
+
+
+@pytest.fixture
+def other_room(db, room_type):
+    other_hotel = Hotel.objects.create(name="Other Hotel", address="Astana", rating=4, description="")
+    return Room.objects.create(number=201, price_per_night=8000, hotel=other_hotel, room_type=room_type)
+
+
+def search(client, **params):
+    response = client.get(URL, {'check_in': '2030-03-10', 'check_out': '2030-03-12', **params})
+    assert response.status_code == 200
+    return response.data
+
+
+class TestMonths:
+
+    def test_stay_spanning_months(self):
+        assert _months(date(2030, 12, 30), date(2031, 2, 1)) == ['203012', '203101']
+
+    def test_check_out_night_not_counted(self):
+        assert _months(date(2030, 3, 30), date(2030, 4, 1)) == ['203003']
+
+
+class TestAvailabilitySearchCache:
+
+    def test_repeated_search_served_from_cache(self, search_client, room, django_assert_num_queries):
+        first = search(search_client, hotel_id=room.hotel_id)
+
+        with django_assert_num_queries(0):
+            second = search(search_client, hotel_id=room.hotel_id)
+
+        assert second['available_rooms'] == first['available_rooms']
+        assert second['count'] == 1
+
+    def test_booking_invalidates_its_hotel(self, search_client, room, user_customer):
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 1
+
+        Booking.objects.create(
+            user=user_customer, room=room, check_in=date(2030, 3, 11), check_out=date(2030, 3, 13),
+            status='confirmed', total_price=20000,
+        )
+
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 0
+        assert search(search_client)['count'] == 0
+
+    def test_booking_leaves_other_hotels_cached(self, search_client, room, other_room, user_customer, django_assert_num_queries):
+        search(search_client, hotel_id=other_room.hotel_id)
+
+        Booking.objects.create(
+            user=user_customer, room=room, check_in=date(2030, 3, 11), check_out=date(2030, 3, 13),
+            status='confirmed', total_price=20000,
+        )
+
+        with django_assert_num_queries(0):
+            assert search(search_client, hotel_id=other_room.hotel_id)['count'] == 1
+
+    def test_booking_in_another_month_leaves_cache(self, search_client, room, user_customer, django_assert_num_queries):
+        search(search_client, hotel_id=room.hotel_id)
+
+        Booking.objects.create(
+            user=user_customer, room=room, check_in=date(2030, 5, 1), check_out=date(2030, 5, 3),
+            status='confirmed', total_price=20000,
+        )
+
+        with django_assert_num_queries(0):
+            search(search_client, hotel_id=room.hotel_id)
+
+    def test_cancellation_frees_room(self, search_client, room, user_customer):
+        booking = Booking.objects.create(
+            user=user_customer, room=room, check_in=date(2030, 3, 11), check_out=date(2030, 3, 13),
+            status='confirmed', total_price=20000,
+        )
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 0
+
+        booking.status = 'cancelled'
+        booking.save()
+
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 1
+
+    def test_room_change_invalidates_hotel(self, search_client, room):
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 1
+
+        room.is_available = False
+        room.save()
+
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 0
+
+    @pytest.mark.parametrize('deferred', [False, True])
+    def test_room_moved_invalidates_both_hotels(self, search_client, room, other_room, deferred):
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 1
+        assert search(search_client, hotel_id=other_room.hotel_id)['count'] == 1
+
+        moved = Room.objects.defer('hotel').get(pk=room.pk) if deferred else Room.objects.get(pk=room.pk)
+        moved.hotel_id = other_room.hotel_id
+        moved.number = 202
+        moved.save()
+
+        assert search(search_client, hotel_id=room.hotel_id)['count'] == 0
+        assert search(search_client, hotel_id=other_room.hotel_id)['count'] == 2
+
+    def test_moved_rate_override_invalidates_its_old_night(self, search_client, room, other_room):
+        RoomRateOverride.objects.create(room=room, date=date(2030, 3, 11), price=5000)
+        assert search(search_client, hotel_id=room.hotel_id)['available_rooms'][0]['total_price'] == 15000
+
+        override = RoomRateOverride.objects.get(room=room)
+        override.room = other_room
+        override.date = date(2030, 5, 1)
+        override.save()
+
+        assert search(search_client, hotel_id=room.hotel_id)['available_rooms'][0]['total_price'] == 20000
+
+    def test_disabled_by_setting(self, search_client, room, settings):
+        settings.AVAILABILITY_CACHE_TIMEOUT = 0
+        search(search_client, hotel_id=room.hotel_id)
+
+        with CaptureQueriesContext(connection) as queries:
+            search(search_client, hotel_id=room.hotel_id)
+
+        assert len(queries) > 0
+
+    def test_rejects_malformed_params(self, search_client, room):
+        assert search_client.get(URL, {'check_in': '2030-02-30', 'check_out': '2030-03-02'}).status_code == 400
+        assert search_client.get(URL, {'check_in': '2030-03-01', 'check_out': '2030-03-02', 'hotel_id': 'x'}).status_code == 400
+
+
+class TestSingleFlight:
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        results = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 42
+
+        def caller():
+            results.append(flight.do('key', compute))
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=caller) for _ in range(5)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [42] * 6
+
+    def test_error_reaches_waiters_and_key_is_released(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError('boom')
+
+        with pytest.raises(RuntimeError):
+            flight.do('key', fail)
+
+        assert flight.do('key', lambda: 'ok') == 'ok'
@@ -0,0 +1,176 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.booking.models import Booking, HotelDailyStats
+from apps.booking.stats import rebuild_stats
+from apps.hotels.models import Hotel, Room
+from apps.payment.models import Payment
+from apps.payment.processing import complete_payments
+
+
+def day_stats(hotel):
+    return {
+        row.date: (row.rooms_sold, row.revenue, row.room_count)
+        for row in HotelDailyStats.objects.filter(hotel=hotel).exclude(rooms_sold=0, revenue=0)
+    }
+
+
+def book(user, room, check_in, nights, total_price, status='confirmed', **extra):
+    return Booking.objects.create(
+        user=user, room=room, check_in=check_in, check_out=check_in + timedelta(days=nights),
+        total_price=total_price, status=status, **extra,
+    )
+
+
+@pytest.fixture
+def owner_client(api_client, user_manager, hotel):
+    hotel.owner = user_manager
+    hotel.save()
+    api_client.force_authenticate(user=user_manager)
+    return api_client
+
+
+@pytest.mark.django_db
+class TestIncrementalRollups:
+
+    def test_sold_booking_spreads_revenue_over_nights(self, user_customer, room, hotel):
+        book(user_customer, room, date(2030, 1, 1), 2, 1001)
+
+        assert day_stats(hotel) == {
+            date(2030, 1, 1): (1, 501, 1),
+            date(2030, 1, 2): (1, 500, 1),
+        }
+
+    def test_pending_bookings_are_not_sold(self, user_customer, room, hotel):
+        book(user_customer, room, date(2030, 1, 1), 2, 1000, status='pending')
+
+        assert day_stats(hotel) == {}
+
+    def test_status_and_date_changes_move_the_sale(self, user_customer, room, hotel):
+        booking = book(user_customer, room, date(2030, 1, 1), 2, 1000)
+
+        booking.check_in, booking.check_out = date(2030, 1, 2), date(2030, 1, 3)
+        booking.total_price = 700
+        booking.save()
+        assert day_stats(hotel) == {date(2030, 1, 2): (1, 700, 1)}
+
+        booking.status = 'cancelled'
+        booking.save()
+        assert day_stats(hotel) == {}
+
+    def test_deferred_and_deleted_bookings(self, user_customer, room, hotel):
+        booking = book(user_customer, room, date(2030, 1, 1), 1, 300)
+        loaded = Booking.objects.only('id', 'status').get(pk=booking.pk)
+
+        loaded.status = 'cancelled'
+        loaded.save()
+        assert day_stats(hotel) == {}
+
+        other = book(user_customer, room, date(2030, 2, 1), 1, 300)
+        other.delete()
+        assert day_stats(hotel) == {}
+
+    def test_payment_processing_confirms_into_stats(self, user_customer, room, hotel):
+        payment = Payment.objects.create(user=user_customer, amount=Decimal('1'), payment_method='cash', status='pending')
+        booking = book(user_customer, room, date(2030, 1, 1), 1, 400, status='pending', payment=payment)
+
+        complete_payments(Payment.objects.all(), [payment.pk])
+        assert day_stats(hotel) == {date(2030, 1, 1): (1, 400, 1)}
+
+        booking.refresh_from_db()
+        booking.status = 'cancelled'
+        booking.save()
+        assert day_stats(hotel) == {}
+
+    def test_rooms_added_later_count_for_future_days(self, user_customer, room, hotel):
+        today = timezone.localdate()
+        book(user_customer, room, today - timedelta(days=1), 2, 200)
+
+        Room.objects.create(number=102, price_per_night=100, hotel=hotel, room_type=room.room_type)
+
+        assert day_stats(hotel) == {
+            today - timedelta(days=1): (1, 100, 1),
+            today: (1, 100, 2),
+        }
+
+    def test_moved_room_counts_for_its_new_hotel(self, user_customer, room, hotel):
+        today = timezone.localdate()
+        other = Room.objects.create(number=102, price_per_night=100, hotel=hotel, room_type=room.room_type)
+        book(user_customer, room, today, 1, 100)
+        second_hotel = Hotel.objects.create(name="Second Hotel", address="Astana")
+        book(user_customer, Room.objects.create(number=1, price_per_night=100, hotel=second_hotel, room_type=room.room_type), today, 1, 100)
+
+        other.hotel = second_hotel
+        other.save()
+
+        assert day_stats(hotel) == {today: (1, 100, 1)}
+        assert day_stats(second_hotel) == {today: (1, 100, 2)}
+
+    def test_rebuild_matches_incremental(self, user_customer, room, hotel):
+        other = Room.objects.create(number=102, price_per_night=100, hotel=hotel, room_type=room.room_type)
+        book(user_customer, room, date(2030, 1, 1), 3, 1000)
+        book(user_customer, other, date(2030, 1, 2), 2, 999, status='completed')
+        book(user_customer, other, date(2030, 1, 5), 2, 999, status='cancelled')
+        incremental = day_stats(hotel)
+
+        assert rebuild_stats() == 3
+        assert day_stats(hotel) == incremental
+
+
+@pytest.mark.django_db
+class TestStatsEndpoint:
+
+    def test_reports_days_and_totals(self, owner_client, user_customer, room, hotel):
+        Room.objects.create(number=102, price_per_night=100, hotel=hotel, room_type=room.room_type)
+        book(user_customer, room, date(2030, 1, 1), 2, 1000)
+
+        response = owner_client.get(f'/api/hotels/{hotel.pk}/stats/', {'from': '2030-01-01', 'to': '2030-01-03'})
+
+        assert response.status_code == 200
+        assert [day['rooms_sold'] for day in response.data['days']] == [1, 1, 0]
+        assert response.data['days'][0] == {
+            'date': date(2030, 1, 1), 'rooms_sold': 1, 'room_count': 2, 'revenue': 500, 'adr': 500.0, 'revpar': 250.0,
+        }
+        assert response.data['totals'] == {
+            'rooms_sold': 2, 'revenue': 1000, 'adr': 500.0, 'revpar': 166.67, 'occupancy': 0.3333,
+        }
+
+    def test_a_year_reads_one_row_per_day(self, owner_client, user_customer, room, hotel):
+        for offset in range(0, 360, 3):
+            book(user_customer, room, date(2030, 1, 1) + timedelta(days=offset), 2, 100)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = owner_client.get(f'/api/hotels/{hotel.pk}/stats/', {'from': '2030-01-01', 'to': '2030-12-31'})
+
+        assert response.status_code == 200
+        assert len(response.data['days']) == 365
+        assert response.data['totals']['rooms_sold'] == 240
+        assert not any('booking_booking' in query['sql'] for query in queries)
+
+    def test_permissions_and_validation(self, api_client, owner_client, user_customer, hotel):
+        url = f'/api/hotels/{hotel.pk}/stats/'
+
+        assert owner_client.get(url).status_code == 200
+        assert len(owner_client.get(url).data['days']) == 30
+        assert owner_client.get(url, {'from': 'yesterday'}).status_code == 400
+        assert owner_client.get(url, {'from': '2030-01-02', 'to': '2030-01-01'}).status_code == 400
+        assert owner_client.get(url, {'from': '2028-01-01', 'to': '2030-01-01'}).status_code == 400
+
+        api_client.force_authenticate(user=user_customer)
+        assert api_client.get(url).status_code == 403
+
+    def test_non_numeric_hotel_is_not_found(self, owner_client):
+        assert owner_client.get('/api/hotels/abc/stats/').status_code == 404
+        assert owner_client.get('/api/hotels/\u0661\u0662/stats/').status_code == 404
+
+    def test_cancelling_sold_booking_within_budget(self, api_client, user_customer, room, hotel):
+        booking = book(user_customer, room, date(2030, 1, 1), 2, 1000)
+        api_client.force_authenticate(user=user_customer)
+
+        assert api_client.post(f'/api/bookings/{booking.pk}/cancel/').status_code == 200
+        assert day_stats(hotel) == {}
@@ -186,7 +186,7 @@ class BookingAPITest(APITestCase):
         response = self.client.get('/api/bookings/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # Две брони
+        self.assertEqual(len(response.data['results']), 2)  # Две брони
     
     def test_get_bookings_as_user(self):
         """2 GOOD: Пользователь видит только свои брони"""
@@ -194,8 +194,8 @@ class BookingAPITest(APITestCase):
         response = self.client.get('/api/bookings/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # Только свои
-        self.assertEqual(response.data[0]['id'], self.booking1.id)
+        self.assertEqual(len(response.data['results']), 1)  # Только свои
+        self.assertEqual(response.data['results'][0]['id'], self.booking1.id)
     
     def test_get_bookings_unauthenticated(self):
         """1 BAD: Неавторизованный доступ"""
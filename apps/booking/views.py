@@ -1,5 +1,6 @@
 # Python modules
 from typing import Any
+from datetime import date
 
 # DRF modules
 from rest_framework.viewsets import ViewSet
@@ -12,13 +13,27 @@ from drf_spectacular.utils import extend_schema
 
 # Django modules
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
 
 # Project modules
 from apps.booking.models import Booking
-from apps.booking.serializers import BookingSerializer
+from apps.booking.events import BOOKING_CANCELLED, publish_booking
+from apps.booking.queries import available_rooms, own_bookings, visible_bookings
+from apps.booking.pricing import Stay, StayQuote, quote_rooms, quote_stays
+from apps.booking.search_cache import cached_search
+from apps.booking.serializers import BookingSerializer, BookingValuesSerializer, QuoteRequestSerializer
+from apps.booking.exports import BOOKING_EXPORT_FIELDS, booking_export_rows
+from apps.core.fieldsets import FieldSet, prune_queryset
+from apps.core.pagination import NewestFirstPagination, paginated
+from apps.core.idempotency import idempotent
+from apps.core.querybudget import query_budget
+from apps.core.export import export_response
 from apps.hotels.models import Room
-from apps.hotels.serializers import RoomSerializer
+from apps.hotels.queries import bookable_rooms
+from apps.hotels.serializers import RoomValuesSerializer
 
 
 class BookingViewSet(ViewSet):
@@ -27,38 +42,38 @@ class BookingViewSet(ViewSet):
     """
     permission_classes: list[IsAuthenticated] = [IsAuthenticated]
 
-    @extend_schema(responses=BookingSerializer(many=True))
+    @extend_schema(responses=paginated(BookingSerializer))
+    @query_budget(2)
     def list(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/bookings/ - List bookings (admin sees all, users see their own)
         """
-        if request.user.is_staff:
-            bookings: QuerySet[Booking] = Booking.objects.select_related(
-                'user', 'room', 'room__hotel', 'room__room_type'
-            ).all()
-        else:
-            bookings: QuerySet[Booking] = Booking.objects.select_related(
-                'user', 'room', 'room__hotel', 'room__room_type'
-            ).filter(user=request.user)
-
-        serializer: BookingSerializer = BookingSerializer(bookings, many=True)
-        return DRFResponse(serializer.data, status=status.HTTP_200_OK)
+        bookings: QuerySet[Booking] = visible_bookings(request.user)
+        fieldset: FieldSet = FieldSet.from_request(request, BookingSerializer)
+        paginator: NewestFirstPagination = NewestFirstPagination()
+        rows: QuerySet = BookingValuesSerializer.values(bookings, 'id', fieldset=fieldset)
+        page: list[dict[str, Any]] = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(BookingValuesSerializer.serialize(page, fieldset))
 
     @extend_schema(responses=BookingSerializer)
+    @query_budget(2)
     def retrieve(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/bookings/{id}/ - Retrieve a specific booking
         """
+        fieldset: FieldSet = FieldSet.from_request(request, BookingSerializer)
         booking: Booking = get_object_or_404(
-            Booking.objects.select_related('user', 'room', 'room__hotel', 'room__room_type'), pk=pk
+            prune_queryset(Booking.objects.all(), BookingSerializer(fieldset=fieldset), 'user'), pk=pk
         )
-        if not request.user.is_staff and booking.user != request.user:
+        if not request.user.is_staff and booking.user_id != request.user.pk:
             return DRFResponse({"detail": "No permission"}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer: BookingSerializer = BookingSerializer(booking)
+        serializer: BookingSerializer = BookingSerializer(booking, fieldset=fieldset)
         return DRFResponse(serializer.data, status=status.HTTP_200_OK)
 
     @extend_schema(request=BookingSerializer, responses=BookingSerializer)
+    @idempotent
+    @query_budget(15)
     def create(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         POST /api/bookings/ - Create a new booking
@@ -70,12 +85,13 @@ class BookingViewSet(ViewSet):
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(request=BookingSerializer, responses=BookingSerializer)
+    @query_budget(15)
     def update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         PUT /api/bookings/{id}/ - Full update of booking
         """
-        booking: Booking = get_object_or_404(Booking, pk=pk)
-        if not request.user.is_staff and booking.user != request.user:
+        booking: Booking = get_object_or_404(Booking.objects.select_related('room__hotel'), pk=pk)
+        if not request.user.is_staff and booking.user_id != request.user.pk:
             return DRFResponse({"detail": "No permission"}, status=status.HTTP_403_FORBIDDEN)
 
         if booking.status in ['completed', 'cancelled']:
@@ -88,12 +104,13 @@ class BookingViewSet(ViewSet):
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(request=BookingSerializer, responses=BookingSerializer)
+    @query_budget(15)
     def partial_update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         PATCH /api/bookings/{id}/ - Partial update of booking
         """
-        booking: Booking = get_object_or_404(Booking, pk=pk)
-        if not request.user.is_staff and booking.user != request.user:
+        booking: Booking = get_object_or_404(Booking.objects.select_related('room__hotel'), pk=pk)
+        if not request.user.is_staff and booking.user_id != request.user.pk:
             return DRFResponse({"detail": "No permission"}, status=status.HTTP_403_FORBIDDEN)
 
         if booking.status in ['completed', 'cancelled']:
@@ -106,6 +123,7 @@ class BookingViewSet(ViewSet):
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(responses=None)
+    @query_budget(5)
     def destroy(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         DELETE /api/bookings/{id}/ - Delete booking (admin only)
@@ -118,12 +136,13 @@ class BookingViewSet(ViewSet):
 
     @action(detail=True, methods=['post'], url_path='cancel')
     @extend_schema(responses=BookingSerializer)
+    @query_budget(10)
     def cancel_booking(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         POST /api/bookings/{id}/cancel/ - Cancel a booking
         """
-        booking: Booking = get_object_or_404(Booking, pk=pk)
-        if not request.user.is_staff and booking.user != request.user:
+        booking: Booking = get_object_or_404(Booking.objects.select_related('room__hotel'), pk=pk)
+        if not request.user.is_staff and booking.user_id != request.user.pk:
             return DRFResponse({"detail": "No permission"}, status=status.HTTP_403_FORBIDDEN)
 
         if booking.status == 'cancelled':
@@ -132,28 +151,37 @@ class BookingViewSet(ViewSet):
             return DRFResponse({"error": "Cannot cancel completed booking"}, status=status.HTTP_400_BAD_REQUEST)
 
         booking.status = 'cancelled'
-        booking.save()
+        with transaction.atomic():
+            booking.save()
+            publish_booking(BOOKING_CANCELLED, booking)
         serializer: BookingSerializer = BookingSerializer(booking)
         return DRFResponse(serializer.data, status=status.HTTP_200_OK)
 
+    @extend_schema(responses=paginated(BookingSerializer))
     @action(detail=False, methods=['get'], url_path='my-bookings')
-    @extend_schema(responses=BookingSerializer(many=True))
+    @query_budget(2)
     def my_bookings(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/bookings/my-bookings/ - Get current user's bookings
         """
-        bookings: QuerySet[Booking] = Booking.objects.select_related(
-            'user', 'room', 'room__hotel', 'room__room_type'
-        ).filter(user=request.user)
-
-        status_filter: str | None = request.query_params.get('status')
-        if status_filter:
-            bookings = bookings.filter(status=status_filter)
-
-        serializer: BookingSerializer = BookingSerializer(bookings, many=True)
-        return DRFResponse(serializer.data, status=status.HTTP_200_OK)
+        bookings: QuerySet[Booking] = own_bookings(request.user.pk, request.query_params.get('status'))
+        fieldset: FieldSet = FieldSet.from_request(request, BookingSerializer)
+        paginator: NewestFirstPagination = NewestFirstPagination()
+        rows: QuerySet = BookingValuesSerializer.values(bookings, 'id', fieldset=fieldset)
+        page: list[dict[str, Any]] = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(BookingValuesSerializer.serialize(page, fieldset))
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> StreamingHttpResponse | DRFResponse:
+        """
+        GET /api/bookings/export/?output=ndjson|csv - Stream all bookings (admin only)
+        """
+        if not request.user.is_staff:
+            return DRFResponse({"detail": "Admin only"}, status=status.HTTP_403_FORBIDDEN)
+        return export_response(request, booking_export_rows, BOOKING_EXPORT_FIELDS, 'bookings')
 
     @action(detail=False, methods=['get'], url_path='available-rooms')
+    @query_budget(3)
     def available_rooms(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/bookings/available-rooms/ - List available rooms for given dates and optional filters
@@ -169,27 +197,74 @@ class BookingViewSet(ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        rooms_query: QuerySet[Room] = Room.objects.select_related('hotel', 'room_type').filter(is_available=True)
-
-        if hotel_id:
-            rooms_query = rooms_query.filter(hotel_id=hotel_id)
-
-        if capacity:
-            rooms_query = rooms_query.filter(room_type__capacity__gte=capacity)
+        try:
+            check_in_date: date | None = parse_date(check_in)
+            check_out_date: date | None = parse_date(check_out)
+        except ValueError:
+            check_in_date = check_out_date = None
+        if check_in_date is None or check_out_date is None:
+            return DRFResponse({"error": "Dates must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        if (hotel_id and not hotel_id.isdigit()) or (capacity and not capacity.isdigit()):
+            return DRFResponse({"error": "hotel_id and capacity must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        def search() -> dict[str, Any]:
+            rooms: QuerySet[Room] = available_rooms(check_in_date, check_out_date, hotel_id, capacity)
+            data: list[dict[str, Any]] = RoomValuesSerializer.serialize(RoomValuesSerializer.values(rooms))
+            stays: list[Stay] = [Stay(room['id'], check_in_date, check_out_date) for room in data]
+            totals: dict[Stay, int] = quote_stays(stays, {room['id']: room['price_per_night'] for room in data})
+            for room, stay in zip(data, stays):
+                room['total_price'] = totals[stay]
+            return {'available_rooms': data, 'count': len(data)}
+
+        result: dict[str, Any] = cached_search(
+            check_in_date,
+            check_out_date,
+            int(hotel_id) if hotel_id else None,
+            int(capacity) if capacity else None,
+            search,
+        )
 
-        booked_room_ids = Booking.objects.filter(
-            check_out__gt=check_in,
-            check_in__lt=check_out,
-            status__in=['confirmed', 'pending']
-        ).values_list('room_id', flat=True)
+        return DRFResponse({
+            'check_in': check_in,
+            'check_out': check_out,
+            **result,
+        }, status=status.HTTP_200_OK)
 
-        available_rooms: QuerySet[Room] = rooms_query.exclude(id__in=booked_room_ids)
+    @action(detail=False, methods=['post'], url_path='quote')
+    @extend_schema(request=QuoteRequestSerializer, responses=None)
+    @query_budget(2)
+    def quote(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
+        """
+        POST /api/bookings/quote/ - Price a stay in many rooms with per-night breakdowns
+        """
+        serializer: QuoteRequestSerializer = QuoteRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params: dict[str, Any] = serializer.validated_data
+
+        rooms: QuerySet[Room]
+        if params.get('room_ids'):
+            rooms = Room.objects.filter(id__in=params['room_ids'])
+            if 'capacity' in params:
+                rooms = rooms.filter(room_type__capacity__gte=params['capacity'])
+        else:
+            rooms = bookable_rooms(params['hotel_id'], params.get('capacity'))
 
-        serializer: RoomSerializer = RoomSerializer(available_rooms, many=True)
+        base_prices: dict[int, float] = dict(rooms.order_by('id').values_list('id', 'price_per_night'))
+        quotes: list[StayQuote] = quote_rooms(base_prices, params['check_in'], params['check_out'])
 
         return DRFResponse({
-            'check_in': check_in,
-            'check_out': check_out,
-            'available_rooms': serializer.data,
-            'count': available_rooms.count()
+            'check_in': params['check_in'],
+            'check_out': params['check_out'],
+            'nights': (params['check_out'] - params['check_in']).days,
+            'quotes': [
+                {
+                    'room_id': quote.room_id,
+                    'nightly': [{'date': night, 'price': price} for night, price in quote.nightly],
+                    'total': quote.total,
+                }
+                for quote in quotes
+            ],
+            'count': len(quotes),
         }, status=status.HTTP_200_OK)
+
@@ -0,0 +1,131 @@
+#Python modules
+import csv
+from typing import Any, Callable, Iterable, Iterator
+
+#DRF modules
+from rest_framework.request import Request as DRFRequest
+from rest_framework.response import Response as DRFResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework import status
+
+#Django modules
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+EXPORT_FORMATS: dict[str, str] = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class _Echo:
+    """
+    File-like object whose write() hands the line back to csv.writer's caller.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_ndjson(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def iter_csv(rows: Iterable[dict[str, Any]], fields: list[str]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[name] for name in fields])
+
+
+def iter_export(rows: Iterable[dict[str, Any]], fields: list[str], output: str) -> Iterator[str]:
+    """
+    Encode rows one at a time in the requested export format.
+    """
+    if output == 'csv':
+        return iter_csv(rows, fields)
+    return iter_ndjson(rows)
+
+
+def streaming_export(rows: Iterable[dict[str, Any]], fields: list[str], output: str, filename: str) -> StreamingHttpResponse:
+    """
+    Stream rows to the client as they are read; nothing is buffered in full.
+    """
+    response = StreamingHttpResponse(iter_export(rows, fields, output), content_type=EXPORT_FORMATS[output])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
+
+
+def export_filters(params: dict[str, Any]) -> dict[str, Any]:
+    """
+    Read status / from / to / hotel_id export filters.
+
+    Raises ValueError when a date cannot be parsed and ValidationError when
+    the hotel id is not an integer.
+    """
+    filters: dict[str, Any] = {'status': params.get('status') or None}
+    for key, name in (('from', 'date_from'), ('to', 'date_to')):
+        raw = params.get(key)
+        filters[name] = parse_date(raw) if raw else None
+        if raw and filters[name] is None:
+            raise ValueError(f"'{key}' must be a YYYY-MM-DD date")
+    hotel_id = params.get('hotel_id')
+    if hotel_id and not (str(hotel_id).isascii() and str(hotel_id).isdigit()):
+        raise ValidationError({'hotel_id': 'A valid integer is required.'})
+    filters['hotel_id'] = int(hotel_id) if hotel_id else None
+    return filters
+
+
+def export_response(
+    request: DRFRequest,
+    rows: Callable[..., Iterable[dict[str, Any]]],
+    fields: list[str],
+    filename: str,
+) -> StreamingHttpResponse | DRFResponse:
+    """
+    Validate ?output= and the export filters, then stream the matching rows.
+    """
+    output: str = request.query_params.get('output', 'ndjson')
+    if output not in EXPORT_FORMATS:
+        return DRFResponse({"error": f"output must be one of {sorted(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        filters: dict[str, Any] = export_filters(request.query_params)
+    except ValueError as exc:
+        return DRFResponse({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return streaming_export(rows(**filters), fields, output, filename)
+
+
+class BaseExportCommand(BaseCommand):
+    """
+    Management command writing an export straight to a file or stdout.
+    """
+    fields: list[str] = []
+    rows: Callable[..., Iterable[dict[str, Any]]]
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help="File to write to (default: stdout).")
+        parser.add_argument('--status')
+        parser.add_argument('--from', dest='from')
+        parser.add_argument('--to')
+        parser.add_argument('--hotel-id', dest='hotel_id')
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        try:
+            filters: dict[str, Any] = export_filters(kwargs)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        except ValidationError as exc:
+            raise CommandError('; '.join(f"{key}: {error}" for key, error in exc.detail.items()))
+
+        chunks: Iterator[str] = iter_export(type(self).rows(**filters), self.fields, kwargs['format'])
+        if kwargs['output']:
+            with open(kwargs['output'], 'w', newline='', encoding='utf-8') as target:
+                target.writelines(chunks)
+        else:
+            self.stdout.ending = ''
+            for chunk in chunks:
+                self.stdout.write(chunk)
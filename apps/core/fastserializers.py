@@ -0,0 +1,271 @@
+#Python modules
+import decimal
+from contextvars import ContextVar
+from datetime import date, datetime, tzinfo
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Callable, Iterable
+
+#DRF modules
+from rest_framework import fields as drf_fields
+from rest_framework.settings import api_settings
+from rest_framework import ISO_8601
+from rest_framework.relations import RelatedField
+from rest_framework.serializers import BaseSerializer, ModelSerializer
+
+#Django modules
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.db.models import Model, QuerySet
+from django.db.models import fields as model_fields
+
+#Project modules
+from apps.core.fieldsets import FieldSet, expandable_fields
+
+# DRF fields whose to_representation returns a value of this type unchanged,
+# paired with the model fields the database already hands back as that type.
+_PASSTHROUGH: tuple[tuple[type, tuple[type, ...]], ...] = (
+    (drf_fields.ChoiceField, (model_fields.CharField,)),
+    (drf_fields.CharField, (model_fields.CharField, model_fields.TextField)),
+    (drf_fields.IntegerField, (model_fields.IntegerField,)),
+    (drf_fields.FloatField, (model_fields.FloatField,)),
+    (drf_fields.BooleanField, (model_fields.BooleanField,)),
+)
+
+Computed = tuple[tuple[str, ...], Callable[..., Any]]
+
+_batch_zone: ContextVar[tzinfo | None] = ContextVar('values_serializer_zone')
+
+ALL_FIELDS: FieldSet = FieldSet()
+
+# ModelSerializer -> its ValuesSerializer, used to expand relations
+VALUES_SERIALIZERS: dict[type[ModelSerializer], type['ValuesSerializer']] = {}
+
+
+class Nested:
+    """
+    Computed entry embedding another ValuesSerializer's output for a related
+    row, or None when there is none. Resolved lazily, once models are loaded.
+    """
+
+    def __init__(self, serializer: type['ValuesSerializer'], relation: str, pk: str = 'id') -> None:
+        self.serializer = serializer
+        self.relation = relation
+        self.pk = pk
+
+    def resolve(self) -> Computed:
+        inner = self.serializer.lookups()
+        lookups = tuple(f'{self.relation}__{lookup}' for lookup in inner)
+        to_representation, pk = self.serializer.to_representation, self.pk
+
+        def build(*values: Any) -> dict[str, Any] | None:
+            row = dict(zip(inner, values))
+            return None if row[pk] is None else to_representation(row)
+
+        return lookups, build
+
+
+def _model_field(model: type[Model], lookup: str) -> model_fields.Field | None:
+    field = None
+    for part in lookup.split('__'):
+        field = model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    return field
+
+
+def _iso_date(field: drf_fields.DateField) -> Callable[[Any], Any] | None:
+    if getattr(field, 'format', api_settings.DATE_FORMAT) != ISO_8601:
+        return None
+
+    def convert(value: Any) -> Any:
+        return value.isoformat() if type(value) is date else field.to_representation(value)
+    return convert
+
+
+def _iso_datetime(field: drf_fields.DateTimeField) -> Callable[[Any], Any] | None:
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601:
+        return None
+
+    def convert(value: Any) -> Any:
+        zone = field.timezone if hasattr(field, 'timezone') else _batch_zone.get(None) or field.default_timezone()
+        if type(value) is not datetime or value.tzinfo is None or zone is None:
+            return field.to_representation(value)
+        output = value.astimezone(zone).isoformat()
+        return output[:-6] + 'Z' if output.endswith('+00:00') else output
+    return convert
+
+
+def _decimal_string(field: drf_fields.DecimalField) -> Callable[[Any], Any] | None:
+    coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce or field.localize or field.normalize_output or field.decimal_places is None:
+        return None
+    exponent = Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+
+    def convert(value: Any) -> Any:
+        if type(value) is not Decimal:
+            return field.to_representation(value)
+        return f'{value.quantize(exponent, rounding=field.rounding, context=context):f}'
+    return convert
+
+
+# Same output as to_representation for the default formats, minus the per-call settings lookups
+_SPECIALIZED: tuple[tuple[type, Callable[[Any], Callable[[Any], Any] | None]], ...] = (
+    (drf_fields.DateTimeField, _iso_datetime),
+    (drf_fields.DateField, _iso_date),
+    (drf_fields.DecimalField, _decimal_string),
+)
+
+
+def _converter(field: drf_fields.Field, model_field: model_fields.Field | None) -> Callable[[Any], Any] | None:
+    """
+    Return the function turning a database value into the field's output, or None when it is the identity.
+    """
+    if isinstance(field, RelatedField):
+        # Primary keys come straight from the foreign key column
+        return None
+    if model_field is not None and not model_field.is_relation:
+        for drf_type, db_types in _PASSTHROUGH:
+            if type(field) is drf_type and isinstance(model_field, db_types):
+                return None
+    for drf_type, specialize in _SPECIALIZED:
+        if type(field) is drf_type:
+            converter = specialize(field)
+            if converter is not None:
+                return converter
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only twin of a ModelSerializer for large lists.
+
+    Rows come from `.values()` and are turned into output dicts by mappers
+    compiled once from the declared serializer's own fields, so the output
+    (key order, formatting of dates, decimals and related ids) matches it
+    exactly. Fields the generic mapping cannot derive, such as method fields
+    and nested serializers, are declared in `computed` as the lookups they
+    need and a function of those values.
+
+    A FieldSet narrows both the output and the columns fetched; expanded
+    relations reuse the related serializer's ValuesSerializer.
+    """
+    serializer_class: type[ModelSerializer]
+    computed: dict[str, Computed | Nested] = {}
+
+    _plans: dict[FieldSet, list[tuple[str, tuple[str, ...], Callable[..., Any] | None]]]
+    _mappers: dict[FieldSet, Callable[[dict[str, Any]], dict[str, Any]]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._plans = {}
+        cls._mappers = {}
+        if hasattr(cls, 'serializer_class'):
+            VALUES_SERIALIZERS[cls.serializer_class] = cls
+
+    @classmethod
+    def plan(cls, fieldset: FieldSet = ALL_FIELDS) -> list[tuple[str, tuple[str, ...], Callable[..., Any] | None]]:
+        if fieldset not in cls._plans:
+            cls._plans[fieldset] = cls._build_plan(fieldset)
+        return cls._plans[fieldset]
+
+    @classmethod
+    def _build_plan(cls, fieldset: FieldSet) -> list[tuple[str, tuple[str, ...], Callable[..., Any] | None]]:
+        model: type[Model] = cls.serializer_class.Meta.model
+        expandable = expandable_fields(cls.serializer_class)
+        plan = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only or not fieldset.selects(name):
+                continue
+            if name in fieldset.expand:
+                nested = VALUES_SERIALIZERS[expandable[name]]
+                lookups, function = Nested(nested, field.source.replace('.', '__')).resolve()
+                plan.append((name, lookups, function))
+                continue
+            if name in cls.computed:
+                entry = cls.computed[name]
+                lookups, function = entry.resolve() if isinstance(entry, Nested) else entry
+                plan.append((name, tuple(lookups), function))
+                continue
+            if isinstance(field, (BaseSerializer, drf_fields.SerializerMethodField)) or field.source == '*':
+                raise ImproperlyConfigured(f'{cls.__name__} needs a computed entry for {name!r}')
+            lookup = field.source.replace('.', '__')
+            converter = _converter(field, _model_field(model, lookup))
+            if converter is not None:
+                converter = _skip_none(converter)
+            plan.append((name, (lookup,), converter))
+        return plan
+
+    @classmethod
+    def lookups(cls, fieldset: FieldSet = ALL_FIELDS) -> list[str]:
+        seen: dict[str, None] = {}
+        for _, lookups, _ in cls.plan(fieldset):
+            seen.update(dict.fromkeys(lookups))
+        return list(seen)
+
+    @classmethod
+    def values(cls, queryset: QuerySet, *extra: str, fieldset: FieldSet = ALL_FIELDS) -> QuerySet:
+        """
+        Narrow a queryset to the columns the output needs, plus any extra ones (e.g. the pagination key).
+
+        Relations are joined only when a selected field reads through them.
+        """
+        return queryset.values(*dict.fromkeys([*cls.lookups(fieldset), *extra]))
+
+    @classmethod
+    def _mapper(cls, fieldset: FieldSet) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        if fieldset not in cls._mappers:
+            cls._mappers[fieldset] = _compile(cls.plan(fieldset))
+        return cls._mappers[fieldset]
+
+    @classmethod
+    def to_representation(cls, row: dict[str, Any], fieldset: FieldSet = ALL_FIELDS) -> dict[str, Any]:
+        return cls._mapper(fieldset)(row)
+
+    @classmethod
+    def serialize(cls, rows: Iterable[dict[str, Any]], fieldset: FieldSet = ALL_FIELDS) -> list[dict[str, Any]]:
+        mapper = cls._mapper(fieldset)
+        # Looking up the active time zone costs more than formatting a
+        # datetime, so it is read once per batch
+        token = _batch_zone.set(timezone.get_current_timezone() if settings.USE_TZ else None)
+        try:
+            return [mapper(row) for row in rows]
+        finally:
+            _batch_zone.reset(token)
+
+
+def _compile(plan: list[tuple[str, tuple[str, ...], Callable[..., Any] | None]]) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """
+    Build one function turning a `.values()` row into the output dict.
+
+    Each field's getter is prepared up front (a bare itemgetter for values
+    passed through), so a row costs one loop over (name, getter) pairs plus
+    the converters it really needs, instead of a loop over field objects.
+    """
+    getters: tuple[tuple[str, Callable[[dict[str, Any]], Any]], ...] = tuple(
+        (name, _getter(lookups, function)) for name, lookups, function in plan
+    )
+
+    def mapper(row: dict[str, Any]) -> dict[str, Any]:
+        return {name: getter(row) for name, getter in getters}
+    return mapper
+
+
+def _getter(lookups: tuple[str, ...], function: Callable[..., Any] | None) -> Callable[[dict[str, Any]], Any]:
+    if function is None:
+        return itemgetter(lookups[0])
+    if len(lookups) == 1:
+        lookup = lookups[0]
+        return lambda row: function(row[lookup])
+    return lambda row: function(*[row[lookup] for lookup in lookups])
+
+
+def _skip_none(converter: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    # Serializers emit None for missing values without calling the field
+    def convert(value: Any) -> Any:
+        return None if value is None else converter(value)
+    return convert
@@ -0,0 +1,136 @@
+#Python modules
+from dataclasses import dataclass, field as dataclass_field
+from functools import lru_cache
+from typing import Any
+
+#DRF modules
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SerializerMethodField
+from rest_framework.request import Request as DRFRequest
+from rest_framework.serializers import BaseSerializer, ModelSerializer
+
+#Django modules
+from django.db.models import QuerySet
+from django.utils.module_loading import import_string
+
+FIELDS_PARAM: str = 'fields'
+EXPAND_PARAM: str = 'expand'
+
+
+def _split(raw: str | None) -> list[str]:
+    return [name.strip() for name in (raw or '').split(',') if name.strip()]
+
+
+@lru_cache(maxsize=None)
+def expandable_fields(serializer_class: type[ModelSerializer]) -> dict[str, type[ModelSerializer]]:
+    """
+    Relations a serializer can render as nested objects, from `Meta.expandable_fields`.
+
+    Values may be dotted import paths, so serializers of different apps can
+    refer to each other without circular imports.
+    """
+    declared = getattr(serializer_class.Meta, 'expandable_fields', {})
+    return {name: import_string(path) if isinstance(path, str) else path for name, path in declared.items()}
+
+
+@lru_cache(maxsize=None)
+def readable_fields(serializer_class: type[ModelSerializer]) -> tuple[str, ...]:
+    return tuple(name for name, field in serializer_class().fields.items() if not field.write_only)
+
+
+@dataclass(frozen=True)
+class FieldSet:
+    """
+    Top-level fields a client asked for (None meaning all of them) and the
+    relations to render as nested objects instead of primary keys.
+    """
+    fields: frozenset[str] | None = None
+    expand: frozenset[str] = dataclass_field(default_factory=frozenset)
+
+    def selects(self, name: str) -> bool:
+        return self.fields is None or name in self.fields or name in self.expand
+
+    @classmethod
+    def from_request(cls, request: DRFRequest, serializer_class: type[ModelSerializer]) -> 'FieldSet':
+        """
+        Read `?fields=a,b` and `?expand=c` for the given serializer.
+
+        Raises ValidationError (a 400 response) for names the serializer does not have.
+        """
+        fields = _split(request.query_params.get(FIELDS_PARAM))
+        expand = _split(request.query_params.get(EXPAND_PARAM))
+        errors: dict[str, str] = {}
+        unknown = [name for name in fields if name not in readable_fields(serializer_class)]
+        if unknown:
+            errors[FIELDS_PARAM] = f"Unknown fields: {', '.join(unknown)}"
+        unexpandable = [name for name in expand if name not in expandable_fields(serializer_class)]
+        if unexpandable:
+            errors[EXPAND_PARAM] = f"Cannot expand: {', '.join(unexpandable)}"
+        if errors:
+            raise ValidationError(errors)
+        return cls(frozenset(fields) if fields else None, frozenset(expand))
+
+
+class SparseFieldsMixin:
+    """
+    ModelSerializer mixin rendering only the fields of a FieldSet passed as `fieldset=`.
+    """
+
+    def __init__(self, *args: Any, fieldset: FieldSet | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if fieldset is None:
+            return
+        expandable = expandable_fields(type(self))
+        for name in fieldset.expand:
+            source = self.fields[name].source
+            self.fields[name] = expandable[name](read_only=True, **({'source': source} if source != name else {}))
+        if fieldset.fields is not None:
+            for name in [name for name, field in self.fields.items() if not field.write_only]:
+                if not fieldset.selects(name):
+                    self.fields.pop(name)
+
+
+def _field_paths(serializer: BaseSerializer, prefix: str, only: set[str], related: set[str]) -> bool:
+    """
+    Collect the model paths the serializer's fields read; False when some cannot be known.
+    """
+    sources: dict[str, tuple[str, ...]] = getattr(getattr(serializer, 'Meta', None), 'field_sources', {})
+    complete: bool = True
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, SerializerMethodField) or field.source == '*':
+            if name not in sources:
+                complete = False
+                continue
+            paths = [prefix + source.replace('.', '__') for source in sources[name]]
+        else:
+            paths = [prefix + field.source.replace('.', '__')]
+
+        for path in paths:
+            parts = path.split('__')
+            # Every relation on the way is joined and must itself be loaded
+            for depth in range(1, len(parts)):
+                related.add('__'.join(parts[:depth]))
+            only.update('__'.join(parts[:depth]) for depth in range(1, len(parts) + 1))
+
+        if isinstance(field, BaseSerializer):
+            related.add(paths[0])
+            complete = _field_paths(field, f'{paths[0]}__', only, related) and complete
+    return complete
+
+
+def prune_queryset(queryset: QuerySet, serializer: BaseSerializer, *always: str) -> QuerySet:
+    """
+    Join exactly the relations the serializer renders and load only the columns it reads.
+
+    `always` names extra fields the view itself needs, e.g. the owner for a
+    permission check. Serializers with method fields lacking a
+    `Meta.field_sources` entry are only joined, not pruned.
+    """
+    only: set[str] = set(always)
+    related: set[str] = set()
+    if not _field_paths(serializer, '', only, related):
+        return queryset.select_related(*sorted(related)) if related else queryset
+    return queryset.select_related(*sorted(related)).only(*sorted(only))
+
@@ -0,0 +1,128 @@
+#Python modules
+import hashlib
+from datetime import timedelta
+from functools import wraps
+from typing import Any, Callable
+
+#DRF modules
+from rest_framework import status
+from rest_framework.request import Request as DRFRequest
+from rest_framework.response import Response as DRFResponse
+
+#Django modules
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+#Project modules
+from apps.core.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER: str = 'Idempotency-Key'
+REPLAYED_HEADER: str = 'Idempotent-Replayed'
+MAX_KEY_LENGTH: int = IdempotencyKey._meta.get_field('key').max_length
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def _abandoned(record: IdempotencyKey) -> bool:
+    # Still without a response after the lease: its request died before committing anything
+    return record.response_status is None and record.created_at < timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LEASE)
+
+
+def _fingerprint(request: DRFRequest) -> str:
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), request.body):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _replay(record: IdempotencyKey, fingerprint: str) -> DRFResponse:
+    if record.fingerprint != fingerprint:
+        return DRFResponse(
+            {"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record.response_status is None:
+        return DRFResponse(
+            {"detail": f"A request with this {IDEMPOTENCY_HEADER} is still being processed."},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return DRFResponse(record.response_body, status=record.response_status, headers={REPLAYED_HEADER: 'true'})
+
+
+def idempotent(view: Callable) -> Callable:
+    """
+    Make a ViewSet action safe to retry with an Idempotency-Key header.
+
+    The first request with a key runs the view and stores its response;
+    repeats by the same user within IDEMPOTENCY_KEY_TTL get that response
+    back from a single query, without validation or writes. Reusing a key
+    for a different request is a 422, and a repeat arriving while the first
+    is still running a 409. Server errors are not stored, so those can be
+    retried. Requests without the header run as usual.
+
+    The view's writes and the stored response commit in one transaction, so
+    a key left without a response (its worker died) committed nothing and is
+    run again once IDEMPOTENCY_LEASE has passed.
+    """
+    @wraps(view)
+    def wrapper(self, request: DRFRequest, *args: Any, **kwargs: Any) -> Any:
+        key: str | None = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None or not request.user.is_authenticated:
+            return view(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return DRFResponse(
+                {"detail": f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint: str = _fingerprint(request)
+        record: IdempotencyKey | None = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+        if record is not None:
+            if record.created_at >= timezone.now() - _ttl() and not _abandoned(record):
+                return _replay(record, fingerprint)
+            record.delete()
+
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(user=request.user, key=key, fingerprint=fingerprint)
+        except IntegrityError:
+            # A concurrent request with the same key got there first
+            return _replay(IdempotencyKey.objects.get(user=request.user, key=key), fingerprint)
+
+        stored: bool = False
+        try:
+            with transaction.atomic():
+                response = view(self, request, *args, **kwargs)
+                if isinstance(response, DRFResponse) and response.status_code < 500:
+                    record.response_status = response.status_code
+                    record.response_body = response.data
+                    record.save(update_fields=['response_status', 'response_body'])
+                    stored = True
+        except BaseException:
+            record.delete()
+            raise
+        if not stored:
+            record.delete()
+        return response
+
+    return wrapper
+
+
+def prune_idempotency_keys(batch_size: int = 5000) -> int:
+    """
+    Delete keys older than IDEMPOTENCY_KEY_TTL, a batch of rows per statement.
+
+    Returns the number of keys deleted.
+    """
+    cutoff = timezone.now() - _ttl()
+    expired = IdempotencyKey.objects.filter(created_at__lt=cutoff)
+    deleted: int = 0
+    while True:
+        batch = list(expired.values_list('id', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=batch).delete()[0]
@@ -0,0 +1,305 @@
+#Python modules
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable
+
+#Django modules
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+#Project modules
+from apps.core.models import Job
+from apps.core.slowqueries import log_slow_queries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE: str = 'default'
+
+
+@dataclass(frozen=True)
+class Task:
+    """
+    Function registered to run in background workers, called with keyword arguments only.
+    """
+    name: str
+    function: Callable[..., Any]
+    queue: str = DEFAULT_QUEUE
+    priority: int = 0
+    max_attempts: int | None = None
+
+    def __call__(self, **kwargs: Any) -> Any:
+        return self.function(**kwargs)
+
+    def enqueue(self, *, priority: int | None = None, delay: timedelta | None = None, **kwargs: Any) -> Job:
+        return enqueue(self.name, kwargs, priority=priority, delay=delay)
+
+
+_tasks: dict[str, Task] = {}
+_discovered: bool = False
+
+
+def task(name: str, *, queue: str = DEFAULT_QUEUE, priority: int = 0, max_attempts: int | None = None) -> Callable[[Callable], Task]:
+    """
+    Register a function as a task. Workers find tasks in the `tasks` module of each app.
+    """
+    def register(function: Callable[..., Any]) -> Task:
+        registered = _tasks[name] = Task(name, function, queue, priority, max_attempts)
+        return registered
+    return register
+
+
+def discover_tasks() -> None:
+    global _discovered
+    if not _discovered:
+        autodiscover_modules('tasks')
+        _discovered = True
+
+
+def get_task(name: str) -> Task:
+    if name not in _tasks:
+        discover_tasks()
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f"Unknown task {name!r}") from None
+
+
+def enqueue(task_name: str, kwargs: dict[str, Any] | None = None, *, priority: int | None = None, delay: timedelta | None = None) -> Job:
+    """
+    Queue a task run. Inside a transaction the job only becomes visible to
+    workers when it commits, together with the change that asked for it.
+    """
+    registered = get_task(task_name)
+    return Job.objects.create(
+        task=task_name,
+        kwargs=kwargs or {},
+        queue=registered.queue,
+        priority=registered.priority if priority is None else priority,
+        max_attempts=registered.max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    # Exponential backoff, capped at an hour
+    return timedelta(seconds=min(settings.JOB_RETRY_DELAY * 2 ** (attempts - 1), 3600))
+
+
+def claim_jobs(worker: str, queues: list[str], batch_size: int, visibility_timeout: timedelta) -> tuple[str, list[Job]]:
+    """
+    Lock up to batch_size due jobs for one worker, highest priority first.
+
+    Due means queued with run_at passed, or running with an expired lock
+    (its worker stopped renewing it). Rows are chosen with SKIP LOCKED where
+    supported, and the UPDATE re-checks that they are still due, so
+    concurrent workers never share a job. Returns the claim token and the jobs.
+    """
+    now = timezone.now()
+    due = Q(status=Job.QUEUED, run_at__lte=now) | Q(status=Job.RUNNING, locked_until__lt=now)
+    claimable = Job.objects.filter(due, queue__in=queues, attempts__lt=F('max_attempts'))
+    token = f'{worker}:{uuid.uuid4().hex[:12]}'
+    with transaction.atomic():
+        # Jobs that timed out on their last attempt are not picked up again
+        Job.objects.filter(status=Job.RUNNING, locked_until__lt=now, attempts__gte=F('max_attempts')).update(
+            status=Job.FAILED, finished_at=now, locked_by='', locked_until=None,
+            last_error='Timed out: the worker did not finish before its lock expired.',
+        )
+        ids = list(
+            claimable.order_by('-priority', 'run_at', 'id').select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return token, []
+        claimable.filter(id__in=ids).update(
+            status=Job.RUNNING, locked_by=token, locked_until=now + visibility_timeout, attempts=F('attempts') + 1,
+        )
+        # Read back in the same transaction: a claim whose jobs we failed to load would strand them
+        return token, list(Job.objects.filter(id__in=ids, locked_by=token).order_by('-priority', 'run_at', 'id'))
+
+
+def release_jobs(token: str, job_ids: list[int]) -> int:
+    """
+    Give claimed jobs that were not started back to the queue.
+    """
+    return Job.objects.filter(id__in=job_ids, locked_by=token, status=Job.RUNNING).update(
+        status=Job.QUEUED, locked_by='', locked_until=None, attempts=F('attempts') - 1,
+    )
+
+
+class Heartbeat(threading.Thread):
+    """
+    Keep extending a running job's lock, every third of the visibility
+    timeout, until stopped or until the job is no longer ours.
+    """
+
+    def __init__(self, job_id: int, token: str, visibility_timeout: timedelta) -> None:
+        super().__init__(name=f'job-{job_id}-heartbeat', daemon=True)
+        self.job_id = job_id
+        self.token = token
+        self.visibility_timeout = visibility_timeout
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        mine = Job.objects.filter(id=self.job_id, locked_by=self.token, status=Job.RUNNING)
+        try:
+            while not self.stopped.wait(self.visibility_timeout.total_seconds() / 3):
+                try:
+                    if not mine.update(locked_until=timezone.now() + self.visibility_timeout):
+                        return
+                except OperationalError as exc:
+                    # e.g. the task holding SQLite's write lock; the next beat tries again
+                    logger.warning("Could not renew the lock of job %s: %s", self.job_id, exc)
+        finally:
+            connection.close()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+def _record(mine: Any, attempts: int = 5, **fields: Any) -> int:
+    """
+    Update a job's row, retrying while other writers hold the database (SQLite) locked.
+    """
+    for attempt in range(attempts):
+        try:
+            return mine.update(**fields)
+        except OperationalError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+    return 0
+
+
+def run_job(job: Job, token: str, visibility_timeout: timedelta) -> bool:
+    """
+    Run one claimed job and record the outcome. Returns whether it succeeded.
+
+    The lock is renewed first, and by a heartbeat thread for as long as the
+    task runs; a job another worker has reclaimed meanwhile is skipped.
+    """
+    mine = Job.objects.filter(id=job.pk, locked_by=token, status=Job.RUNNING)
+    if not mine.update(locked_until=timezone.now() + visibility_timeout):
+        return False
+    heartbeat = Heartbeat(job.pk, token, visibility_timeout)
+    heartbeat.start()
+    try:
+        try:
+            with log_slow_queries(lambda: f'job:{job.task}'):
+                get_task(job.task)(**job.kwargs)
+        finally:
+            heartbeat.stop()
+    except Exception as exc:
+        now = timezone.now()
+        error = f"{type(exc).__name__}: {exc}"
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.task, job.attempts)
+        if job.attempts >= job.max_attempts:
+            _record(mine, status=Job.FAILED, finished_at=now, last_error=error, locked_by='', locked_until=None)
+        else:
+            _record(
+                mine, status=Job.QUEUED, run_at=now + _retry_delay(job.attempts), last_error=error,
+                locked_by='', locked_until=None,
+            )
+        return False
+    _record(mine, status=Job.DONE, finished_at=timezone.now(), last_error='', locked_until=None)
+    return True
+
+
+@dataclass
+class Worker:
+    """
+    Loop claiming batches of jobs and running them until stopped, or until
+    the queues are empty in burst mode.
+    """
+    name: str
+    queues: list[str]
+    # threading.Event or multiprocessing Event
+    stop: Any
+    batch_size: int = 10
+    visibility_timeout: timedelta = timedelta(minutes=5)
+    poll_interval: float = 1.0
+    burst: bool = False
+    processed: int = 0
+
+    def run(self) -> int:
+        while not self.stop.is_set():
+            try:
+                token, jobs = claim_jobs(self.name, self.queues, self.batch_size, self.visibility_timeout)
+            except OperationalError as exc:
+                # e.g. SQLite refusing a concurrent writer; the jobs stay claimable
+                logger.warning("Worker %s could not claim jobs: %s", self.name, exc)
+                self.stop.wait(self.poll_interval)
+                continue
+            if not jobs:
+                if self.burst:
+                    break
+                self.stop.wait(self.poll_interval)
+                continue
+            for index, job in enumerate(jobs):
+                if self.stop.is_set():
+                    release_jobs(token, [left.pk for left in jobs[index:]])
+                    break
+                try:
+                    run_job(job, token, self.visibility_timeout)
+                except OperationalError as exc:
+                    # The outcome was not recorded; the job runs again once its lock expires
+                    logger.warning("Worker %s could not record job %s: %s", self.name, job.pk, exc)
+                self.processed += 1
+        return self.processed
+
+
+def _run_thread(worker: Worker) -> None:
+    try:
+        worker.run()
+    finally:
+        # Each thread opened its own database connection
+        connection.close()
+
+
+def _run_process(options: dict[str, Any], stop: Any) -> None:
+    # Processes started with 'spawn' begin without a configured Django
+    if not apps.ready:
+        django.setup()
+    # The parent process decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    discover_tasks()
+    _run_thread(Worker(stop=stop, **options))
+
+
+def run_pool(workers: int, mode: str, stop: Any, **options: Any) -> None:
+    """
+    Run `workers` Workers as threads of this process or as child processes
+    until `stop` is set (or, in burst mode, until the queues are empty).
+
+    Pass a threading.Event for threads and a multiprocessing Event for processes.
+    """
+    discover_tasks()
+    names = [f'{socket.gethostname()}:{os.getpid()}:{index}' for index in range(workers)]
+    if mode == 'thread':
+        runners = [
+            threading.Thread(target=_run_thread, args=(Worker(name=name, stop=stop, **options),), name=name)
+            for name in names
+        ]
+    else:
+        # Children must not inherit the parent's open connections
+        connections.close_all()
+        runners = [
+            multiprocessing.Process(target=_run_process, args=({'name': name, **options}, stop), name=name)
+            for name in names
+        ]
+    for runner in runners:
+        runner.start()
+    for runner in runners:
+        runner.join()
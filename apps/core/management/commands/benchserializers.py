@@ -0,0 +1,100 @@
+#Python modules
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable
+
+#DRF modules
+from rest_framework.renderers import JSONRenderer
+
+#Django modules
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+#Project modules
+from apps.booking.models import Booking
+from apps.booking.serializers import BookingSerializer, BookingValuesSerializer
+from apps.hotels.models import Hotel, Room, RoomType
+from apps.hotels.serializers import HotelSerializer, HotelValuesSerializer
+from apps.payment.models import Payment
+from apps.payment.serializers import PaymentSerializer, PaymentValuesSerializer
+from apps.users.models import User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ModelSerializer lists against the .values() fast path on "
+        "generated rows. Data is written inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def __populate(self, rows: int) -> None:
+        users = User.objects.bulk_create(
+            User(phone=f'9{index:011d}', email=f'bench{index}@example.com', first_name='Bench', last_name=str(index))
+            for index in range(100)
+        )
+        room_type = RoomType.objects.create(name='Bench', capacity=2)
+        hotels = Hotel.objects.bulk_create(
+            Hotel(name=f'Bench {index}', address='Almaty', owner=users[index % len(users)] if index % 3 else None)
+            for index in range(rows)
+        )
+        rooms = Room.objects.bulk_create(
+            Room(number=index, price_per_night=1000 + index, hotel=hotels[0], room_type=room_type)
+            for index in range(200)
+        )
+        payments = Payment.objects.bulk_create(
+            Payment(user=users[index % len(users)], amount=Decimal(index) / 4, payment_method='cash', status='completed')
+            for index in range(rows)
+        )
+        start = date(2030, 1, 1)
+        Booking.objects.bulk_create(
+            Booking(
+                user=users[index % len(users)],
+                room=rooms[index % len(rooms)],
+                check_in=start + timedelta(days=index % 365),
+                check_out=start + timedelta(days=index % 365 + 2),
+                total_price=2000,
+                payment=payments[index] if index % 2 else None,
+            )
+            for index in range(rows)
+        )
+
+    def __time(self, build: Callable[[], Any], repeat: int) -> tuple[float, bytes]:
+        best = float('inf')
+        output = b''
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = JSONRenderer().render(build())
+            best = min(best, time.perf_counter() - started)
+        return best * 1000, output
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        rows, repeat = kwargs['rows'], kwargs['repeat']
+        cases = (
+            ('bookings', Booking.objects.select_related('room__hotel').order_by('-id'), BookingSerializer, BookingValuesSerializer),
+            ('hotels', Hotel.objects.select_related('owner').order_by('id'), HotelSerializer, HotelValuesSerializer),
+            ('payments', Payment.objects.order_by('-created_at'), PaymentSerializer, PaymentValuesSerializer),
+        )
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                self.__populate(rows)
+                self.stdout.write(f"Generated {rows} rows per table in {time.perf_counter() - started:.1f}s.")
+
+                self.stdout.write(f"{'list':<12}{'serializer (ms)':>18}{'values (ms)':>14}{'speedup':>10}")
+                for label, queryset, serializer, fast in cases:
+                    slow_ms, expected = self.__time(lambda: serializer(queryset[:rows], many=True).data, repeat)
+                    fast_ms, actual = self.__time(lambda: fast.serialize(fast.values(queryset[:rows])), repeat)
+                    if actual != expected:
+                        raise CommandError(f"{fast.__name__} output differs from {serializer.__name__}")
+                    self.stdout.write(f"{label:<12}{slow_ms:>18.1f}{fast_ms:>14.1f}{slow_ms / fast_ms:>9.1f}x")
+                raise _Rollback
+        except _Rollback:
+            pass
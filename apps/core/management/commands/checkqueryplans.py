@@ -0,0 +1,32 @@
+#Python modules
+from typing import Any
+
+#Django modules
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+#Project modules
+from apps.core.queryplans import discover_hot_queries, full_table_scans, query_plan
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN QUERY PLAN on every registered hot queryset and fail on full table scans."
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        if connection.vendor != 'sqlite':
+            raise CommandError("Query plan checks are written against SQLite's EXPLAIN QUERY PLAN.")
+
+        failures: list[str] = []
+        for name, factory in sorted(discover_hot_queries().items()):
+            plan: list[str] = query_plan(factory())
+            scans: list[str] = full_table_scans(plan)
+            style = self.style.ERROR if scans else self.style.SUCCESS
+            self.stdout.write(style(f"{'SCAN' if scans else 'ok':<6}{name}"))
+            if kwargs['verbosity'] > 1 or scans:
+                for step in plan:
+                    self.stdout.write(f"        {step}")
+            if scans:
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f"Full table scan in: {', '.join(failures)}")
@@ -0,0 +1,46 @@
+#Python modules
+import time
+from typing import Any
+
+#Django modules
+from django.core.management.base import BaseCommand
+
+#Project modules
+from apps.core.models import Job
+from apps.core.outbox import DrainResult, drain_outbox
+from apps.core.tasks import drain_outbox_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Carry out pending outbox events in batches, in order per aggregate. "
+        "Exits when nothing is due unless --follow is given."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--enqueue', action='store_true', help="Queue a job for the workers (runworkers) instead of running now.")
+        parser.add_argument('--follow', action='store_true', help="Keep polling for new events.")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds between polls with --follow.")
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        if kwargs['enqueue']:
+            job: Job = drain_outbox_task.enqueue(batch_size=kwargs['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk} ({job.task})."))
+            return
+        totals = DrainResult()
+        try:
+            while True:
+                result: DrainResult = drain_outbox(batch_size=kwargs['batch_size'])
+                totals.done += result.done
+                totals.retried += result.retried
+                totals.dead += result.dead
+                if not result.handled:
+                    if not kwargs['follow']:
+                        break
+                    time.sleep(kwargs['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Handled {totals.done} events, {totals.retried} to retry, {totals.dead} given up."
+        ))
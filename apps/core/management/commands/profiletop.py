@@ -0,0 +1,53 @@
+#Python modules
+import os
+from typing import Any
+
+#Django modules
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+#Project modules
+from apps.core.profiler import FILE_SUFFIX, endpoint_file, hot_frames, load_stacks
+
+
+class Command(BaseCommand):
+    help = (
+        "List the hottest frames of each profiled ViewSet action from the "
+        "collapsed stacks ProfilerMiddleware saved in PROFILER_DIR."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            'endpoints', nargs='*', metavar='endpoint',
+            help="e.g. BookingViewSet.available_rooms; every profiled endpoint by default.",
+        )
+        parser.add_argument('--limit', type=int, default=15, help="Frames per endpoint.")
+        parser.add_argument(
+            '--sort', choices=('self', 'total'), default='self',
+            help="Rank by samples spent in the frame itself or anywhere below it.",
+        )
+        parser.add_argument('--dir', default=None, help="Defaults to PROFILER_DIR.")
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        directory: str = kwargs['dir'] or settings.PROFILER_DIR
+        endpoints: list[str] = kwargs['endpoints'] or sorted(
+            name[:-len(FILE_SUFFIX)] for name in (os.listdir(directory) if os.path.isdir(directory) else [])
+            if name.endswith(FILE_SUFFIX)
+        )
+        if not endpoints:
+            self.stdout.write(f"No profiles in {directory}.")
+            return
+
+        for endpoint in endpoints:
+            path = endpoint_file(directory, endpoint)
+            if not os.path.exists(path):
+                raise CommandError(f"No profile for {endpoint} in {directory}.")
+            own, total, samples = hot_frames(load_stacks(path))
+            ranked = own if kwargs['sort'] == 'self' else total
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{endpoint}: {samples} samples"))
+            self.stdout.write(f"{'self %':>8} {'total %':>8}  frame")
+            for frame, _ in ranked.most_common(kwargs['limit']):
+                self.stdout.write(
+                    f"{100 * own[frame] / samples:>8.1f} {100 * total[frame] / samples:>8.1f}  {frame}"
+                )
+            self.stdout.write('')
@@ -0,0 +1,26 @@
+#Python modules
+from typing import Any
+
+#Django modules
+from django.core.management.base import BaseCommand
+
+#Project modules
+from apps.core.models import Job
+from apps.core.idempotency import prune_idempotency_keys
+from apps.core.tasks import prune_idempotency_keys_task
+
+
+class Command(BaseCommand):
+    help = "Delete Idempotency-Key records older than IDEMPOTENCY_KEY_TTL."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--enqueue', action='store_true', help="Queue a job for the workers (runworkers) instead of running now.")
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        if kwargs['enqueue']:
+            job: Job = prune_idempotency_keys_task.enqueue(batch_size=kwargs['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk} ({job.task})."))
+            return
+        deleted: int = prune_idempotency_keys(batch_size=kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
@@ -0,0 +1,57 @@
+#Python modules
+import multiprocessing
+import signal
+import threading
+from datetime import timedelta
+from typing import Any
+
+#Django modules
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+#Project modules
+from apps.core.jobs import DEFAULT_QUEUE, run_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the database queue with a pool of worker "
+        "threads or processes. Stops on SIGINT/SIGTERM after the running jobs finish."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--queues', default=DEFAULT_QUEUE, help="Comma separated queue names.")
+        parser.add_argument('--batch-size', type=int, default=10, help="Jobs claimed per query.")
+        parser.add_argument('--visibility-timeout', type=int, default=settings.JOB_VISIBILITY_TIMEOUT)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--burst', action='store_true', help="Exit once the queues are empty.")
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        mode: str = kwargs['mode']
+        stop = threading.Event() if mode == 'thread' else multiprocessing.Event()
+
+        def request_stop(signum: int, frame: Any) -> None:
+            self.stdout.write("Stopping after the running jobs...")
+            stop.set()
+
+        previous = {signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+
+        queues: list[str] = [queue.strip() for queue in kwargs['queues'].split(',') if queue.strip()]
+        self.stdout.write(f"Starting {kwargs['workers']} {mode} workers on {', '.join(queues)}.")
+        try:
+            run_pool(
+                kwargs['workers'],
+                mode,
+                stop,
+                queues=queues,
+                batch_size=kwargs['batch_size'],
+                visibility_timeout=timedelta(seconds=kwargs['visibility_timeout']),
+                poll_interval=kwargs['poll_interval'],
+                burst=kwargs['burst'],
+            )
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
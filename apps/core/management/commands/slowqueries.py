@@ -0,0 +1,77 @@
+#Python modules
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+#Django modules
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+@dataclass
+class Shape:
+    """
+    Slow runs of one normalized statement.
+    """
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    endpoints: Counter = field(default_factory=Counter)
+    sources: Counter = field(default_factory=Counter)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Group the slow queries logged to SLOW_QUERY_LOG_FILE by statement shape, "
+        "heaviest total time first, with the endpoints and serializer fields running them."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--limit', type=int, default=10, help="Shapes to list.")
+        parser.add_argument('--hours', type=float, default=None, help="Only entries from the last N hours.")
+        parser.add_argument('--file', default=None, help="Defaults to SLOW_QUERY_LOG_FILE.")
+
+    def handle(self, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> None:
+        path: str | None = kwargs['file'] or getattr(settings, 'SLOW_QUERY_LOG_FILE', None)
+        if not path:
+            raise CommandError("SLOW_QUERY_LOG_FILE is not set.")
+        if not os.path.exists(path):
+            self.stdout.write(f"No slow queries logged in {path}.")
+            return
+        since: float = time.time() - kwargs['hours'] * 3600 if kwargs['hours'] is not None else 0.0
+
+        shapes: dict[str, Shape] = {}
+        with open(path) as file:
+            for line in file:
+                try:
+                    entry: dict[str, Any] = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('at', 0) < since:
+                    continue
+                shape = shapes.setdefault(entry['sql'], Shape())
+                shape.count += 1
+                shape.total_ms += entry['duration_ms']
+                shape.max_ms = max(shape.max_ms, entry['duration_ms'])
+                shape.endpoints[entry.get('endpoint') or '-'] += 1
+                shape.sources[entry.get('source') or '-'] += 1
+
+        ranked = sorted(shapes.items(), key=lambda item: item[1].total_ms, reverse=True)[:kwargs['limit']]
+        for sql, shape in ranked:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{shape.total_ms:.1f} ms total, {shape.count} run{'' if shape.count == 1 else 's'}, "
+                f"mean {shape.mean_ms:.1f} ms, max {shape.max_ms:.1f} ms"
+            ))
+            self.stdout.write(f"  {sql}")
+            self.stdout.write("  endpoints: " + ', '.join(f"{name} ({count})" for name, count in shape.endpoints.most_common(3)))
+            self.stdout.write("  sources: " + ', '.join(f"{name} ({count})" for name, count in shape.sources.most_common(3)))
+            self.stdout.write('')
+        if not ranked:
+            self.stdout.write("No slow queries in that period.")
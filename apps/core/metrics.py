@@ -0,0 +1,317 @@
+#Python modules
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+
+#Django modules
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+# Upper bounds, in seconds, of the request latency buckets
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE: str = 'text/plain; version=0.0.4; charset=utf-8'
+
+# (metric name, label values) -> counter: [value]; histogram: per-bucket counts, +Inf count, sum
+Samples = dict[tuple[str, tuple[str, ...]], list[float]]
+
+
+class Metric:
+    kind: str = ''
+
+    def __init__(self, registry: 'Registry', name: str, help: str, labelnames: tuple[str, ...]) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def empty(self) -> list[float]:
+        return [0.0]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels: tuple[str, ...], amount: float = 1.0) -> None:
+        self.registry.shard().setdefault((self.name, labels), self.empty())[0] += amount
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args: Any, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+
+    def empty(self) -> list[float]:
+        return [0.0] * (len(self.buckets) + 2)
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        sample = self.registry.shard().setdefault((self.name, labels), self.empty())
+        # Buckets are stored non-cumulative; the last count slot is +Inf
+        sample[bisect_left(self.buckets, value)] += 1
+        sample[-1] += value
+
+
+class Registry:
+    """
+    Counters and histograms updated without locks.
+
+    Each thread writes to its own shard and reads sum the shards, so the
+    request path never waits. Shards of finished threads are folded together
+    when new threads arrive. With METRICS_DIR set, each process also saves
+    its totals there (at most every METRICS_FLUSH_INTERVAL seconds) and
+    collect() adds up the files of all processes, which is how the workers
+    of a multi-process server report as one. A process removes its file on
+    exit, and files left by processes that were killed are removed by the
+    next collect().
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[tuple[threading.Thread, Samples]] = []
+        self._retired: Samples = {}
+        self._flushed: float = 0.0
+        self._file_name: str = ''
+        # A forked worker starts from zero rather than repeating its parent's counts
+        os.register_at_fork(after_in_child=self._forked)
+        atexit.register(self._remove_file)
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help, tuple(labelnames)))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help, tuple(labelnames), buckets=buckets))
+
+    def _register(self, metric: Metric) -> Any:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def shard(self) -> Samples:
+        shard: Samples | None = getattr(self._local, 'samples', None)
+        if shard is None:
+            shard = self._local.samples = {}
+            with self._lock:
+                alive = []
+                for thread, samples in self._shards:
+                    if thread.is_alive():
+                        alive.append((thread, samples))
+                    else:
+                        _merge(self._retired, samples)
+                alive.append((threading.current_thread(), shard))
+                self._shards = alive
+        return shard
+
+    def snapshot(self) -> Samples:
+        """
+        Totals of this process.
+        """
+        with self._lock:
+            parts = [self._retired] + [samples for _, samples in self._shards]
+            totals: Samples = {}
+            for samples in parts:
+                # dict.copy() is atomic under the GIL; owners may be writing meanwhile
+                _merge(totals, samples.copy())
+        return totals
+
+    def reset(self) -> None:
+        with self._lock:
+            self._retired = {}
+            for _, samples in self._shards:
+                samples.clear()
+
+    def _forked(self) -> None:
+        # The lock may have been held by a thread that does not exist in the child
+        self._lock = threading.Lock()
+        self._retired = {}
+        for _, samples in self._shards:
+            samples.clear()
+        self._file_name = ''
+
+    def _remove_file(self) -> None:
+        directory = self.directory
+        if directory and self._file_name.startswith(f'{os.getpid()}-'):
+            try:
+                os.remove(os.path.join(directory, self._file_name))
+            except OSError:
+                pass
+
+    @property
+    def directory(self) -> str | None:
+        return getattr(settings, 'METRICS_DIR', None)
+
+    def file_name(self) -> str:
+        # Unique per process, so a recycled pid never overwrites a finished process's totals
+        if not self._file_name or not self._file_name.startswith(f'{os.getpid()}-'):
+            self._file_name = f'{os.getpid()}-{time.time_ns()}.json'
+        return self._file_name
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Save this process's totals to METRICS_DIR, if set and due.
+        """
+        directory = self.directory
+        now = time.monotonic()
+        if not directory or (not force and now - self._flushed < getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)):
+            return
+        self._flushed = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.file_name())
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump([[name, list(labels), values] for (name, labels), values in self.snapshot().items()], file)
+        os.replace(temporary, path)
+
+    def collect(self) -> Samples:
+        """
+        Totals of every process that saved to METRICS_DIR, with this process's read live.
+        """
+        totals = self.snapshot()
+        directory = self.directory
+        if not directory or not os.path.isdir(directory):
+            return totals
+        own = self.file_name()
+        for entry in os.scandir(directory):
+            if not entry.name.endswith('.json') or entry.name == own:
+                continue
+            if not _running(entry.name.partition('-')[0]):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(entry.path) as file:
+                    rows = json.load(file)
+            except (OSError, ValueError):
+                continue
+            _merge(totals, {(name, tuple(labels)): values for name, labels, values in rows})
+        return totals
+
+    def exposition(self) -> str:
+        """
+        All metrics in the Prometheus text format.
+        """
+        samples = self.collect()
+        lines: list[str] = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for (name, labels), values in sorted(samples.items()):
+                if name != metric.name:
+                    continue
+                pairs = list(zip(metric.labelnames, labels))
+                if isinstance(metric, Histogram):
+                    cumulative = 0.0
+                    for bound, count in zip((*metric.buckets, math.inf), values):
+                        cumulative += count
+                        # Bounds keep their decimal point, as Prometheus clients print them
+                        le = '+Inf' if bound == math.inf else repr(float(bound))
+                        lines.append(f'{name}_bucket{_labels(pairs + [("le", le)])} {_number(cumulative)}')
+                    lines.append(f'{name}_sum{_labels(pairs)} {_number(values[-1])}')
+                    lines.append(f'{name}_count{_labels(pairs)} {_number(cumulative)}')
+                else:
+                    lines.append(f'{name}{_labels(pairs)} {_number(values[0])}')
+        return '\n'.join(lines) + '\n'
+
+
+def _merge(totals: Samples, samples: Samples) -> None:
+    for key, values in samples.items():
+        total = totals.get(key)
+        if total is None:
+            totals[key] = list(values)
+        else:
+            for index, value in enumerate(values):
+                total[index] += value
+
+
+def _running(pid: str) -> bool:
+    """
+    Whether the process that wrote a METRICS_DIR file still runs on this host.
+    """
+    try:
+        os.kill(int(pid), 0)
+    except ValueError:
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, just owned by another user
+        return True
+    return True
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') + '"'
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+registry = Registry()
+
+REQUESTS: Counter = registry.counter(
+    'http_requests_total', 'Requests handled, by view, action and response status.',
+    ('viewset', 'action', 'status'),
+)
+LATENCY: Histogram = registry.histogram(
+    'http_request_duration_seconds', 'Time from this middleware to the rendered response.',
+    ('viewset', 'action', 'status'),
+)
+
+
+def view_labels(request: HttpRequest) -> tuple[str, str] | None:
+    """
+    (ViewSet or view name, action) of a resolved request, None for unresolved URLs.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    method = request.method.lower()
+    view = match.func
+    cls = getattr(view, 'cls', None)
+    if cls is None:
+        return getattr(view, '__name__', type(view).__name__), method
+    # ViewSet routes map methods to actions; other DRF views are labelled by method
+    return cls.__name__, (getattr(view, 'actions', None) or {}).get(method, method)
+
+
+class MetricsMiddleware:
+    """
+    Count requests and record their latency by ViewSet, action and status code.
+
+    Requests for unknown URLs are not recorded, keeping label values to
+    the routes that exist. Put it first in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        started = time.perf_counter()
+        response = self.get_response(request)
+        labels = view_labels(request)
+        if labels is not None:
+            labels = (*labels, str(response.status_code))
+            REQUESTS.inc(labels)
+            LATENCY.observe(labels, time.perf_counter() - started)
+            registry.flush()
+        return response
@@ -1,3 +1,122 @@
+#Django modules
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a user's request sent with an Idempotency-Key header.
+
+    Repeats of the request within IDEMPOTENCY_KEY_TTL get this response back
+    instead of running the view again (see apps.core.idempotency).
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    # Hash of method, path and body, so a key cannot be reused for another request
+    fingerprint = models.CharField(max_length=64)
+    # Empty while the first request is still running
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='core_unique_user_idempotency_key'),
+        ]
+        indexes = [
+            # Pruning expired keys
+            models.Index(fields=['created_at'], name='core_idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.key}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Side effect of a state change, written in the same transaction as the
+    change and carried out later by `manage.py drainoutbox`.
+
+    Events of one aggregate (e.g. one booking) are handled in the order
+    they were written (see apps.core.outbox).
+    """
+    PENDING = 'pending'
+    DONE = 'done'
+    DEAD = 'dead'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead'),
+    ]
+
+    event_type = models.CharField(max_length=100)
+    aggregate_type = models.CharField(max_length=50)
+    aggregate_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Not handled before this time; pushed back after each failure
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # The drain query: pending events that are due, oldest first
+            models.Index(fields=['status', 'available_at'], name='core_outbox_status_due_idx'),
+            # Earlier pending events of the same aggregate
+            models.Index(fields=['aggregate_type', 'aggregate_id', 'status'], name='core_outbox_aggregate_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.aggregate_type}:{self.aggregate_id} ({self.status})"
+
+
+class Job(models.Model):
+    """
+    Function call queued for a background worker (`manage.py runworkers`).
+
+    Claimed jobs stay invisible to other workers until locked_until; a
+    worker that dies mid-job lets it run again after that (see apps.core.jobs).
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    queue = models.CharField(max_length=50, default='default')
+    # Higher runs first
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Claiming: due jobs of a queue by priority
+            models.Index(fields=['queue', 'status', '-priority', 'run_at'], name='core_job_claim_idx'),
+            # Reclaiming jobs whose worker stopped renewing the lock
+            models.Index(fields=['status', 'locked_until'], name='core_job_lock_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
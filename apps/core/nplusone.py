@@ -0,0 +1,144 @@
+#Python modules
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from types import CodeType
+from typing import Any, Callable, Iterator
+
+#Django modules
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+#Project modules
+from apps.core.metrics import view_labels
+from apps.core.slowqueries import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+RAISE: str = 'raise'
+WARN: str = 'warn'
+
+_TRANSACTION_CONTROL: tuple[str, ...] = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+
+_PROJECT_ROOT: str = os.path.join(str(settings.BASE_DIR), '')
+# Wrappers and middleware running every query are never the call site
+_INSTRUMENTATION: frozenset[str] = frozenset(
+    os.path.join(os.path.dirname(__file__), f'{name}.py')
+    for name in ('nplusone', 'querybudget', 'slowqueries', 'timing', 'metrics', 'profiler')
+)
+_project_code: dict[CodeType, bool] = {}
+_allowed = threading.local()
+
+
+class NPlusOneError(Exception):
+    """
+    Raised, when NPLUSONE_DETECTION is 'raise', by a request repeating a query shape from one place.
+    """
+
+
+def _is_project_code(code: CodeType) -> bool:
+    project = _project_code.get(code)
+    if project is None:
+        path = code.co_filename
+        project = _project_code[code] = (
+            path.startswith(_PROJECT_ROOT) and path not in _INSTRUMENTATION
+            and 'site-packages' not in path and f'{os.sep}.venv{os.sep}' not in path
+        )
+    return project
+
+
+def call_site() -> str | None:
+    """
+    "path:line in function" of the innermost project code on the stack.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        if _is_project_code(frame.f_code):
+            return f'{frame.f_code.co_filename[len(_PROJECT_ROOT):]}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+@contextmanager
+def allow_repeats() -> Iterator[None]:
+    """
+    Leave queries run inside the block out of detection, for loops that are meant to repeat.
+    """
+    depth = getattr(_allowed, 'depth', 0)
+    _allowed.depth = depth + 1
+    try:
+        yield
+    finally:
+        _allowed.depth = depth
+
+
+class QueryPatterns:
+    """
+    Database execute wrapper counting statements by normalized SQL and call site.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        if not getattr(_allowed, 'depth', 0) and not sql.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+            self.counts[normalize_sql(sql), call_site()] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold: int) -> list[tuple[str, str | None, int]]:
+        """
+        (sql, call site, count) of the patterns run at least `threshold` times, most repeated first.
+        """
+        return [(sql, site, count) for (sql, site), count in self.counts.most_common() if count >= threshold]
+
+
+@contextmanager
+def detect_nplusone(label: Callable[[], str], threshold: int | None = None, mode: str | None = None) -> Iterator[QueryPatterns]:
+    """
+    Flag query patterns run `threshold` (default NPLUSONE_THRESHOLD) times or more inside the block.
+
+    `label` names the block in the report and is only called when there is one.
+    """
+    mode = mode or getattr(settings, 'NPLUSONE_DETECTION', None) or RAISE
+    patterns = QueryPatterns()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(patterns))
+        yield patterns
+    repeated = patterns.repeated(threshold or settings.NPLUSONE_THRESHOLD)
+    if repeated:
+        message = f'{label()} repeated queries (N+1?): ' + '; '.join(
+            f'{count}x from {site or "unknown"}: {sql}' for sql, site, count in repeated
+        )
+        if mode == RAISE:
+            raise NPlusOneError(message)
+        logger.warning(message, extra={'repeated': repeated})
+
+
+def request_label(request: HttpRequest) -> str:
+    labels = view_labels(request)
+    return f"{request.method} {request.path} ({'.'.join(labels) if labels else 'unresolved'})"
+
+
+class NPlusOneMiddleware:
+    """
+    Flag requests running the same query shape from the same line
+    NPLUSONE_THRESHOLD times or more, typically a lazy relation read in a loop.
+
+    NPLUSONE_DETECTION 'warn' logs them, 'raise' raises NPlusOneError once
+    the response is ready (the test suite does this), None turns detection off.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        mode: str | None = getattr(settings, 'NPLUSONE_DETECTION', None)
+        if not mode:
+            return self.get_response(request)
+        with detect_nplusone(lambda: request_label(request), mode=mode):
+            return self.get_response(request)
@@ -0,0 +1,160 @@
+#Python modules
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Iterable
+
+#Django modules
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, QuerySet
+from django.db.transaction import TransactionManagementError
+from django.utils import timezone
+
+#Project modules
+from apps.core.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[OutboxEvent], None]
+
+_handlers: dict[str, list[Handler]] = {}
+
+
+def outbox_handler(event_type: str) -> Callable[[Handler], Handler]:
+    """
+    Register a function carrying out events of a type. Handlers may run
+    more than once for an event, so they must tolerate repeats.
+    """
+    def register(handler: Handler) -> Handler:
+        _handlers.setdefault(event_type, []).append(handler)
+        return handler
+    return register
+
+
+def _require_transaction() -> None:
+    if not transaction.get_connection().in_atomic_block:
+        raise TransactionManagementError(
+            "Outbox events must be written in the transaction of the change they describe."
+        )
+
+
+def outbox_event(event_type: str, aggregate_type: str, aggregate_id: int, payload: dict[str, Any] | None = None) -> OutboxEvent:
+    return OutboxEvent(
+        event_type=event_type, aggregate_type=aggregate_type, aggregate_id=aggregate_id, payload=payload or {},
+    )
+
+
+def publish(event_type: str, aggregate_type: str, aggregate_id: int, payload: dict[str, Any] | None = None) -> OutboxEvent:
+    """
+    Write one event; must be called inside the transaction making the change.
+    """
+    _require_transaction()
+    event = outbox_event(event_type, aggregate_type, aggregate_id, payload)
+    event.save()
+    return event
+
+
+def publish_many(events: Iterable[OutboxEvent]) -> list[OutboxEvent]:
+    """
+    Write many events with one INSERT; must be called inside the transaction making the change.
+    """
+    _require_transaction()
+    events = list(events)
+    return OutboxEvent.objects.bulk_create(events) if events else []
+
+
+@dataclass
+class DrainResult:
+    done: int = 0
+    retried: int = 0
+    dead: int = 0
+
+    @property
+    def handled(self) -> int:
+        return self.done + self.retried + self.dead
+
+
+def due_events(now) -> QuerySet[OutboxEvent]:
+    """
+    Pending events that are due and first in line for their aggregate.
+
+    An event waits while an earlier event of the same aggregate is pending,
+    including one waiting for a retry, so each aggregate's events are
+    handled in order. Dead events no longer hold the line.
+    """
+    earlier = OutboxEvent.objects.filter(
+        aggregate_type=OuterRef('aggregate_type'),
+        aggregate_id=OuterRef('aggregate_id'),
+        status=OutboxEvent.PENDING,
+        id__lt=OuterRef('id'),
+    )
+    return OutboxEvent.objects.filter(status=OutboxEvent.PENDING, available_at__lte=now).exclude(
+        Exists(earlier)
+    ).order_by('id')
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    # Exponential backoff, capped at an hour
+    return timedelta(seconds=min(settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), 3600))
+
+
+def claim_events(batch_size: int) -> list[OutboxEvent]:
+    """
+    Lease up to `batch_size` due events to this worker and count the attempt.
+
+    Claimed events stay pending but are not due again for OUTBOX_LEASE
+    seconds, which also holds back later events of their aggregates; the
+    row locks (skipping rows another worker holds, on databases that support
+    it) last only for this short transaction.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        events: list[OutboxEvent] = list(due_events(now).select_for_update(skip_locked=True)[:batch_size])
+        if events:
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                attempts=F('attempts') + 1, available_at=now + timedelta(seconds=settings.OUTBOX_LEASE),
+            )
+    for event in events:
+        event.attempts += 1
+    return events
+
+
+def _finish(event: OutboxEvent, **fields: Any) -> bool:
+    # Skipped when the lease ran out and another worker claimed the event meanwhile
+    with transaction.atomic():
+        return bool(OutboxEvent.objects.filter(
+            pk=event.pk, status=OutboxEvent.PENDING, attempts=event.attempts,
+        ).update(**fields))
+
+
+def drain_outbox(batch_size: int = 100) -> DrainResult:
+    """
+    Handle one batch of due events.
+
+    Events are claimed in one short transaction, then handled one by one
+    without holding any lock, and each outcome is committed on its own, so a
+    crash loses at most the event being handled (it runs again once its
+    lease expires). Failed events are retried with backoff until
+    OUTBOX_MAX_ATTEMPTS, then marked dead.
+    """
+    result = DrainResult()
+    for event in claim_events(batch_size):
+        try:
+            for handler in _handlers.get(event.event_type, ()):
+                with transaction.atomic():
+                    handler(event)
+        except Exception as exc:
+            now = timezone.now()
+            last_error = f"{type(exc).__name__}: {exc}"
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                _finish(event, status=OutboxEvent.DEAD, processed_at=now, last_error=last_error)
+                result.dead += 1
+                logger.error("Outbox event %s gave up after %s attempts: %s", event.pk, event.attempts, last_error)
+            else:
+                _finish(event, available_at=now + _retry_delay(event.attempts), last_error=last_error)
+                result.retried += 1
+            continue
+        _finish(event, status=OutboxEvent.DONE, processed_at=timezone.now(), last_error='')
+        result.done += 1
+    return result
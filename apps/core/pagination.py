@@ -0,0 +1,52 @@
+#DRF modules
+from drf_spectacular.utils import extend_schema_serializer
+from rest_framework import serializers
+from rest_framework.pagination import CursorPagination
+
+#Django modules
+from django.db.models import QuerySet
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over an indexed column.
+
+    Pages are fetched with `WHERE <key> > cursor LIMIT n`, so the cost of a
+    page does not grow with the table and no COUNT(*) is ever issued. The
+    cursor is opaque to clients and stays valid while rows are inserted.
+    """
+    page_size: int = 50
+    page_size_query_param: str = 'page_size'
+    max_page_size: int = 200
+    ordering: str = 'id'
+
+    @classmethod
+    def first_page(cls, queryset: QuerySet) -> QuerySet:
+        """
+        The query paginate_queryset runs for a first page of the default size.
+        """
+        ordering = (cls.ordering,) if isinstance(cls.ordering, str) else tuple(cls.ordering)
+        return queryset.order_by(*ordering)[:cls.page_size + 1]
+
+
+class NewestFirstPagination(KeysetPagination):
+    ordering: str = '-id'
+
+
+class CreatedAtPagination(KeysetPagination):
+    # created_at is not unique; id breaks ties so rows sharing a timestamp keep one order across pages
+    ordering: tuple[str, ...] = ('-created_at', '-id')
+
+
+def paginated(serializer_class: type[serializers.Serializer]) -> serializers.Serializer:
+    """
+    Schema of a page of `serializer_class` items, as get_paginated_response returns it.
+    """
+    name: str = serializer_class.__name__.removesuffix('Serializer')
+    page_class: type[serializers.Serializer] = type(f'Paginated{name}List', (serializers.Serializer,), {
+        'next': serializers.URLField(allow_null=True),
+        'previous': serializers.URLField(allow_null=True),
+        'results': serializer_class(many=True),
+    })
+    # The page itself is one object, even on list actions
+    return extend_schema_serializer(many=False)(page_class)()
@@ -1,5 +1,9 @@
+import hmac
+
 from rest_framework import permissions
 
+from django.conf import settings
+
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -12,14 +16,15 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         
-        # Write permissions are only allowed to the owner
-        # Check if object has 'user' attribute (Booking, Review, etc.)
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        # Write permissions are only allowed to the owner, compared by id
+        # so the related user is never loaded
+        # Check if object has a 'user' foreign key (Booking, Review, etc.)
+        if hasattr(obj, 'user_id'):
+            return obj.user_id == request.user.pk
         
-        # Check if object has 'owner' attribute (Hotel, etc.)
-        if hasattr(obj, 'owner'):
-            return obj.owner == request.user
+        # Check if object has an 'owner' foreign key (Hotel, etc.)
+        if hasattr(obj, 'owner_id'):
+            return obj.owner_id == request.user.pk
         
         # For other objects, allow only if user is staff
         return request.user.is_staff
@@ -51,7 +56,7 @@ class IsHotelOwnerOrReadOnly(permissions.BasePermission):
             return True
         
         # Write permissions only to hotel owner
-        return obj.owner == request.user
+        return obj.owner_id == request.user.pk
 
 
 class IsBookingOwner(permissions.BasePermission):
@@ -66,7 +71,7 @@ class IsBookingOwner(permissions.BasePermission):
             return True
         
         # User can only access their own bookings
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
 
 
 class IsReviewOwnerOrReadOnly(permissions.BasePermission):
@@ -80,4 +85,20 @@ class IsReviewOwnerOrReadOnly(permissions.BasePermission):
             return True
         
         # Write permissions only to review author
-        return obj.user == request.user
\ No newline at end of file
+        return obj.user_id == request.user.pk
+
+
+class CanScrapeMetrics(permissions.BasePermission):
+    """
+    Metrics are readable by staff and by scrapers sending METRICS_SCRAPE_TOKEN
+    in an X-Metrics-Token header, from METRICS_ALLOWED_IPS when that is set.
+    """
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        token = getattr(settings, 'METRICS_SCRAPE_TOKEN', None)
+        if not token or not hmac.compare_digest(request.META.get('HTTP_X_METRICS_TOKEN', '').encode(), token.encode()):
+            return False
+        # Behind a proxy REMOTE_ADDR is the proxy, so the address alone never grants access
+        allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+        return not allowed or request.META.get('REMOTE_ADDR') in allowed
@@ -0,0 +1,212 @@
+#Python modules
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Callable, Iterable
+
+#Django modules
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+#Project modules
+from apps.core.metrics import view_labels
+
+# Collapsed stacks are stored one file per endpoint: "<ViewSet>.<action>.folded"
+FILE_SUFFIX: str = '.folded'
+
+_ROOTS: tuple[str, ...] = tuple(sorted(
+    {os.path.join(path, '') for path in sys.path if path and os.path.isdir(path)} | {os.path.join(str(settings.BASE_DIR), '')},
+    key=len, reverse=True,
+))
+_frame_names: dict[CodeType, str] = {}
+
+
+def frame_name(code: CodeType) -> str:
+    """
+    "path/relative/to/sys.path/module.py:function" of a code object.
+    """
+    name = _frame_names.get(code)
+    if name is None:
+        path = code.co_filename
+        for root in _ROOTS:
+            if path.startswith(root):
+                path = path[len(root):]
+                break
+        # ';' separates frames and the last space the count in collapsed stacks
+        name = _frame_names[code] = f'{path}:{code.co_name}'.replace(';', ':').replace(' ', '_')
+    return name
+
+
+def collapse(frame: FrameType | None, stop: CodeType | None = None) -> str:
+    """
+    A thread's stack as "root;...;leaf", starting below the frame running `stop`.
+    """
+    names: list[str] = []
+    while frame is not None and frame.f_code is not stop:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Sampler:
+    """
+    Background thread recording the stacks of registered threads every `interval` seconds.
+
+    It sleeps while no thread is registered, so an idle process pays nothing.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active: dict[int, tuple[Counter, CodeType | None]] = {}
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        os.register_at_fork(after_in_child=self._forked)
+
+    def _forked(self) -> None:
+        # Only the forking thread survives in the child, the sampler included
+        self._lock = threading.Lock()
+        self._active = {}
+        self._thread = None
+
+    def start(self, stop: CodeType | None = None) -> None:
+        """
+        Start sampling the calling thread, cutting stacks at the frame running `stop`.
+        """
+        with self._lock:
+            self._active[threading.get_ident()] = (Counter(), stop)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self) -> Counter:
+        """
+        Stop sampling the calling thread and return its stacks with their sample counts.
+        """
+        with self._lock:
+            counts, _ = self._active.pop(threading.get_ident(), (Counter(), None))
+        return counts
+
+    def _run(self) -> None:
+        while True:
+            if not self._active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                active = list(self._active.items())
+            for thread_id, (counts, stop) in active:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counts[collapse(frame, stop)] += 1
+            del frames
+
+
+_sampler: Sampler | None = None
+
+
+def sampler() -> Sampler:
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(getattr(settings, 'PROFILER_INTERVAL', 0.005))
+    return _sampler
+
+
+def endpoint_file(directory: str, endpoint: str) -> str:
+    return os.path.join(directory, endpoint + FILE_SUFFIX)
+
+
+def save_stacks(directory: str, endpoint: str, counts: Counter) -> None:
+    """
+    Append a request's stacks to its endpoint's collapsed-stack file.
+
+    Everything goes out in one write to a file opened for appending, so
+    processes profiling the same endpoint do not interleave lines.
+    """
+    if not counts:
+        return
+    os.makedirs(directory, exist_ok=True)
+    data = ''.join(f'{stack} {count}\n' for stack, count in counts.items()).encode()
+    descriptor = os.open(endpoint_file(directory, endpoint), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(descriptor, data)
+    finally:
+        os.close(descriptor)
+
+
+def load_stacks(path: str) -> Counter:
+    """
+    Read a collapsed-stack file, adding up repeated stacks.
+    """
+    counts: Counter = Counter()
+    with open(path) as file:
+        for line in file:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                counts[stack] += int(count)
+    return counts
+
+
+def hot_frames(counts: Counter) -> tuple[Counter, Counter, int]:
+    """
+    Samples per frame running its own code (self), per frame on the stack
+    (total, counted once per sample) and the number of samples.
+    """
+    own: Counter = Counter()
+    total: Counter = Counter()
+    samples: int = 0
+    for stack, count in counts.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+        samples += count
+    return own, total, samples
+
+
+def endpoint_rate(endpoint: str) -> float:
+    rates: dict[str, float] = getattr(settings, 'PROFILER_ENDPOINT_RATES', {})
+    return rates.get(endpoint, getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0))
+
+
+class ProfilerMiddleware:
+    """
+    Sample the stacks of a fraction of requests and save them per endpoint for flame graphs.
+
+    Off unless PROFILER_SAMPLE_RATE, or an entry of PROFILER_ENDPOINT_RATES
+    such as {'BookingViewSet.available_rooms': 0.2}, is above zero. Profiled
+    requests are sampled every PROFILER_INTERVAL seconds from the view
+    through rendering, and their stacks appended to
+    PROFILER_DIR/<ViewSet>.<action>.folded, which flamegraph.pl and
+    speedscope read as is. `manage.py profiletop` lists the hottest frames.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        try:
+            return self.get_response(request)
+        finally:
+            endpoint: str | None = getattr(request, '_profiled_endpoint', None)
+            if endpoint is not None:
+                save_stacks(settings.PROFILER_DIR, endpoint, sampler().stop())
+
+    def process_view(self, request: HttpRequest, view_func: Callable, view_args: Iterable, view_kwargs: dict) -> None:
+        labels = view_labels(request)
+        if labels is None:
+            return None
+        endpoint = '.'.join(labels)
+        rate = endpoint_rate(endpoint)
+        if rate > 0 and (rate >= 1 or random.random() < rate):
+            request._profiled_endpoint = endpoint
+            # Stacks start below this middleware, leaving out the server and outer middleware
+            sampler().start(stop=type(self).__call__.__code__)
+        return None
@@ -0,0 +1,64 @@
+#Python modules
+import logging
+from functools import wraps
+from typing import Any, Callable
+
+#Django modules
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+BUDGET_HEADER: str = 'X-Query-Budget'
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised, when QUERY_BUDGET_STRICT is on, by a view that ran more queries than it declared.
+    """
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the statements run through it.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def query_budget(max_queries: int) -> Callable[[Callable], Callable]:
+    """
+    Declare the most queries a ViewSet action may run, whatever the size of its result.
+
+    Over budget, the view raises QueryBudgetExceeded when QUERY_BUDGET_STRICT
+    is set (the test suite does this) and logs a warning under DEBUG. DEBUG
+    responses also carry the count in an X-Query-Budget header. Queries run
+    by authentication before the action, or while streaming a response, are
+    not counted.
+    """
+    def decorate(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(self, request, *args: Any, **kwargs: Any) -> Any:
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                response = view(self, request, *args, **kwargs)
+
+            name = f'{type(self).__name__}.{view.__name__}'
+            if counter.count > max_queries:
+                message = f'{name} ran {counter.count} queries, budget is {max_queries}'
+                if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                    raise QueryBudgetExceeded(message)
+                if settings.DEBUG:
+                    logger.warning(message)
+            if settings.DEBUG:
+                response[BUDGET_HEADER] = f'{counter.count}/{max_queries}'
+            return response
+
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorate
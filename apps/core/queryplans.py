@@ -0,0 +1,42 @@
+#Python modules
+import re
+from typing import Callable
+
+#Django modules
+from django.db.models import QuerySet
+from django.utils.module_loading import autodiscover_modules
+
+# name -> factory building the queryset through the same functions as the view
+HOT_QUERIES: dict[str, Callable[[], QuerySet]] = {}
+
+# "SCAN <table>" with no index behind it; "SCAN t USING INDEX i" is an index walk
+FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW$)\S+$')
+
+
+def hot_query(name: str) -> Callable[[Callable[[], QuerySet]], Callable[[], QuerySet]]:
+    """
+    Register a queryset factory whose plan must stay index-backed.
+    """
+    def register(factory: Callable[[], QuerySet]) -> Callable[[], QuerySet]:
+        HOT_QUERIES[name] = factory
+        return factory
+    return register
+
+
+def discover_hot_queries() -> dict[str, Callable[[], QuerySet]]:
+    """
+    Import every installed app's `hot_queries` module and return the registry.
+    """
+    autodiscover_modules('hot_queries')
+    return HOT_QUERIES
+
+
+def query_plan(queryset: QuerySet) -> list[str]:
+    """
+    Return the detail column of the database's query plan, one step per item.
+    """
+    return [line.split(' ', 3)[-1] for line in queryset.explain().splitlines()]
+
+
+def full_table_scans(plan: list[str]) -> list[str]:
+    return [step for step in plan if FULL_SCAN.search(step)]
@@ -0,0 +1,150 @@
+#Python modules
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+
+#DRF modules
+from rest_framework.fields import Field
+
+#Django modules
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+#Project modules
+from apps.core.metrics import view_labels
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+# A parenthesised row, allowing two levels of nested parentheses such as (SELECT COUNT(*) ...)
+_ROW = r'\((?:[^()]|\((?:[^()]|\([^()]*\))*\))*\)'
+_VALUES_ROWS = re.compile(rf'({_ROW})(?:, \1)+')
+_SPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """
+    Shape of a statement: literals and parameters become ?, IN lists and
+    repeated VALUES rows collapse, so queries differing only in their
+    values group together.
+    """
+    shape = _STRING.sub('?', sql).replace('%s', '?')
+    shape = _NUMBER.sub('?', _SPACE.sub(' ', shape).strip())
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _VALUES_ROWS.sub(r'\1, ...', shape)
+
+
+def serializer_source() -> str | None:
+    """
+    "Serializer.field" being read when the current query was sent, if any.
+
+    The innermost serializer field on the stack is the one whose attribute
+    access (e.g. a lazy foreign key behind source='hotel.name') ran the query.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_name in ('get_attribute', 'to_representation'):
+            field = frame.f_locals.get('self')
+            if isinstance(field, Field) and field.field_name and field.parent is not None:
+                return f'{type(field.parent).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return None
+
+
+def append_entry(path: str, entry: dict[str, Any]) -> None:
+    # One write to a file opened for appending keeps lines from processes apart
+    descriptor = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(descriptor, (json.dumps(entry) + '\n').encode())
+    finally:
+        os.close(descriptor)
+
+
+class SlowQueryLog:
+    """
+    Database execute wrapper reporting statements that take at least `threshold` seconds.
+
+    `endpoint` is called for the entry's endpoint only when a query is slow,
+    so it may be resolved after the wrapper was installed.
+    """
+
+    def __init__(self, threshold: float, endpoint: Callable[[], str | None]) -> None:
+        self.threshold = threshold
+        self.endpoint = endpoint
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self.report(sql, duration, context)
+
+    def report(self, sql: str, duration: float, context: dict[str, Any]) -> None:
+        rowcount: int = getattr(context.get('cursor'), 'rowcount', -1)
+        entry: dict[str, Any] = {
+            'sql': normalize_sql(sql),
+            'duration_ms': round(duration * 1000, 1),
+            # Databases do not count rows a SELECT returns before they are fetched
+            'rows': rowcount if rowcount >= 0 else None,
+            'endpoint': self.endpoint(),
+            'source': serializer_source(),
+        }
+        logger.warning(
+            'slow query %sms rows=%s endpoint=%s source=%s: %s',
+            entry['duration_ms'], entry['rows'], entry['endpoint'], entry['source'], entry['sql'],
+            extra=entry,
+        )
+        path: str | None = getattr(settings, 'SLOW_QUERY_LOG_FILE', None)
+        if path:
+            # Runs inside the query's execute wrapper: failing to record must not fail the query
+            try:
+                append_entry(path, {'at': time.time(), **entry})
+            except OSError:
+                logger.exception('could not append to SLOW_QUERY_LOG_FILE %s', path)
+
+
+@contextmanager
+def log_slow_queries(endpoint: Callable[[], str | None]) -> Iterator[None]:
+    """
+    Report slow queries run inside the block on any connection, if SLOW_QUERY_THRESHOLD_MS is set.
+    """
+    threshold_ms: float | None = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+    if threshold_ms is None:
+        yield
+        return
+    wrapper = SlowQueryLog(threshold_ms / 1000, endpoint)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def request_endpoint(request: HttpRequest) -> str | None:
+    labels = view_labels(request)
+    return '.'.join(labels) if labels else request.path
+
+
+class SlowQueryMiddleware:
+    """
+    Log queries slower than SLOW_QUERY_THRESHOLD_MS with the ViewSet action
+    and serializer field that ran them; see log_slow_queries.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with log_slow_queries(lambda: request_endpoint(request)):
+            return self.get_response(request)
@@ -0,0 +1,15 @@
+#Project modules
+from apps.core.idempotency import prune_idempotency_keys
+from apps.core.jobs import task
+from apps.core.outbox import drain_outbox
+
+
+@task('core.drain_outbox')
+def drain_outbox_task(batch_size: int = 100) -> None:
+    while drain_outbox(batch_size=batch_size).handled:
+        pass
+
+
+@task('core.prune_idempotency_keys', priority=-10)
+def prune_idempotency_keys_task(batch_size: int = 5000) -> None:
+    prune_idempotency_keys(batch_size=batch_size)
@@ -0,0 +1,82 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer, SerializerMethodField
+
+from apps.booking.models import Booking
+from apps.booking.serializers import BookingSerializer, BookingValuesSerializer
+from apps.core.fastserializers import ValuesSerializer
+from apps.hotels.models import Hotel, Room
+from apps.hotels.serializers import HotelSerializer, HotelValuesSerializer, RoomSerializer, RoomValuesSerializer
+from apps.payment.models import Payment
+from apps.payment.serializers import PaymentSerializer, PaymentValuesSerializer
+from apps.users.serializers import UserSerializer, UserValuesSerializer
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.fixture
+def rows(user_customer, user_manager, hotel, room):
+    Hotel.objects.create(name="Owned", address="Astana", rating=4, owner=user_manager, description=None)
+    other = Room.objects.create(number=7, price_per_night=99.5, hotel=hotel, room_type=room.room_type, is_available=False)
+    payment = Payment.objects.create(user=user_customer, amount=Decimal('1234.5'), payment_method='cash', status='completed')
+    Payment.objects.create(user=None, amount=Decimal('3'), payment_method='paypal', status='pending')
+    Booking.objects.create(user=user_customer, room=room, check_in=date(2030, 1, 1), check_out=date(2030, 1, 4), total_price=30000)
+    Booking.objects.create(
+        user=user_manager, room=other, check_in=date(2030, 2, 1), check_out=date(2030, 2, 2),
+        status='confirmed', payment=payment,
+    )
+
+
+@pytest.mark.django_db
+class TestValuesSerializersMatch:
+
+    @pytest.mark.parametrize('serializer, fast', [
+        (BookingSerializer, BookingValuesSerializer),
+        (HotelSerializer, HotelValuesSerializer),
+        (RoomSerializer, RoomValuesSerializer),
+        (PaymentSerializer, PaymentValuesSerializer),
+        (UserSerializer, UserValuesSerializer),
+    ])
+    def test_same_json(self, rows, serializer, fast):
+        queryset = serializer.Meta.model.objects.order_by('id')
+
+        expected = render(serializer(queryset, many=True).data)
+        actual = render(fast.serialize(fast.values(queryset)))
+
+        assert actual == expected
+
+    def test_same_json_in_active_time_zone(self, rows):
+        queryset = Payment.objects.order_by('id')
+
+        with timezone.override('Asia/Almaty'):
+            expected = render(PaymentSerializer(queryset, many=True).data)
+            actual = render(PaymentValuesSerializer.serialize(PaymentValuesSerializer.values(queryset)))
+
+        assert actual == expected
+        assert b'+05:00' in actual
+
+    def test_extra_lookups_do_not_leak(self, rows):
+        output = BookingValuesSerializer.serialize(BookingValuesSerializer.values(Booking.objects.all(), 'status'))
+
+        assert list(output[0]) == BookingSerializer.Meta.fields
+
+    def test_method_field_needs_computed_entry(self):
+        class NamedHotelSerializer(ModelSerializer):
+            label = SerializerMethodField()
+
+            class Meta:
+                model = Hotel
+                fields = ['id', 'label']
+
+        class NamedHotelValuesSerializer(ValuesSerializer):
+            serializer_class = NamedHotelSerializer
+
+        with pytest.raises(ImproperlyConfigured, match="'label'"):
+            NamedHotelValuesSerializer.plan()
@@ -0,0 +1,120 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from apps.booking.models import Booking
+from apps.booking.serializers import BookingSerializer, BookingValuesSerializer
+from apps.core.fieldsets import FieldSet, prune_queryset
+from apps.hotels.serializers import HotelSerializer, RoomSerializer, RoomValuesSerializer
+from apps.payment.models import Payment
+
+
+@pytest.fixture
+def booking(user_customer, room):
+    payment = Payment.objects.create(user=user_customer, amount=Decimal('20.5'), payment_method='cash', status='completed')
+    return Booking.objects.create(
+        user=user_customer, room=room, check_in=date(2030, 1, 1), check_out=date(2030, 1, 3),
+        total_price=20000, payment=payment,
+    )
+
+
+def get(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    return response, ' '.join(query['sql'] for query in queries)
+
+
+@pytest.mark.django_db
+class TestFieldSetsMatch:
+
+    @pytest.mark.parametrize('fieldset', [
+        FieldSet(frozenset({'id', 'status'})),
+        FieldSet(frozenset({'hotel_name'}), frozenset({'payment'})),
+        FieldSet(None, frozenset({'room', 'user', 'payment'})),
+    ])
+    def test_fast_and_model_serializers_agree(self, booking, fieldset):
+        queryset = Booking.objects.order_by('id')
+
+        expected = JSONRenderer().render(BookingSerializer(queryset, many=True, fieldset=fieldset).data)
+        rows = BookingValuesSerializer.values(queryset, fieldset=fieldset)
+        actual = JSONRenderer().render(BookingValuesSerializer.serialize(rows, fieldset))
+
+        assert actual == expected
+
+    def test_nested_expansion_of_hotel_owner(self, booking, user_manager):
+        booking.room.hotel.owner = user_manager
+        booking.room.hotel.save()
+        fieldset = FieldSet(frozenset({'id'}), frozenset({'hotel'}))
+        queryset = booking.room.__class__.objects.all()
+
+        expected = JSONRenderer().render(RoomSerializer(queryset, many=True, fieldset=fieldset).data)
+        actual = JSONRenderer().render(RoomValuesSerializer.serialize(RoomValuesSerializer.values(queryset, fieldset=fieldset), fieldset))
+
+        assert actual == expected
+        assert b'"owner_info":{"id"' in actual
+
+
+@pytest.mark.django_db
+class TestPruning:
+
+    def test_only_requested_columns_are_loaded(self, booking):
+        fieldset = FieldSet(frozenset({'id', 'hotel_name'}))
+        queryset = prune_queryset(Booking.objects.all(), BookingSerializer(fieldset=fieldset), 'user')
+
+        sql = str(queryset.query)
+
+        assert '"hotels_hotel"."name"' in sql
+        assert 'check_in' not in sql
+        assert 'room_type' not in sql
+
+    def test_method_field_sources_allow_pruning(self, hotel):
+        fieldset = FieldSet(frozenset({'owner'}))
+        sql = str(prune_queryset(HotelSerializer.Meta.model.objects.all(), HotelSerializer(fieldset=fieldset)).query)
+
+        assert '"users_user"."first_name"' in sql
+        assert 'address' not in sql
+
+
+@pytest.mark.django_db
+class TestSparseEndpoints:
+
+    def test_hotel_list_without_owner_skips_user_join(self, staff_client, hotel):
+        response, sql = get(staff_client, '/api/hotels/', fields='id,name')
+
+        assert response.data['results'] == [{'id': hotel.pk, 'name': hotel.name}]
+        assert 'users_user' not in sql.split('FROM "hotels_hotel"')[-1]
+
+    def test_booking_list_expands_room(self, staff_client, booking):
+        response, _ = get(staff_client, '/api/bookings/', fields='id', expand='room')
+
+        assert response.data['results'][0]['room']['number'] == booking.room.number
+        assert set(response.data['results'][0]) == {'id', 'room'}
+
+    def test_booking_detail_is_pruned(self, staff_client, booking):
+        response, sql = get(staff_client, f'/api/bookings/{booking.pk}/', fields='status')
+
+        assert response.data == {'status': 'pending'}
+        assert 'check_in' not in sql.split('FROM "booking_booking"')[0].split('SELECT')[-1]
+
+    def test_payment_detail_expands_user(self, staff_client, booking):
+        response, _ = get(staff_client, f'/api/payments/{booking.payment_id}/', expand='user')
+
+        assert response.data['user']['email'] == booking.user.email
+        assert response.data['amount'] == '20.50'
+
+    def test_me_honours_fields(self, staff_client, user_admin):
+        response, _ = get(staff_client, '/api/users/me/', fields='id,role')
+
+        assert response.data == {'id': user_admin.pk, 'role': 'admin'}
+
+    def test_unknown_names_rejected(self, staff_client, booking):
+        bad_field, _ = get(staff_client, '/api/bookings/', fields='id,secret')
+        bad_expand, _ = get(staff_client, '/api/hotels/', expand='owner')
+
+        assert bad_field.status_code == 400
+        assert 'secret' in bad_field.data['fields']
+        assert bad_expand.status_code == 400
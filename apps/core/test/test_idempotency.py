@@ -0,0 +1,125 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.booking.models import Booking
+from apps.core.models import IdempotencyKey
+from apps.payment.models import Payment
+
+PAYMENT = {'amount': '10.00', 'payment_method': 'cash', 'status': 'pending'}
+
+
+def post(client, url, data, key):
+    return client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+
+@pytest.mark.django_db
+class TestIdempotentCreate:
+
+    def test_retry_replays_first_response(self, customer_client):
+        first = post(customer_client, '/api/payments/', PAYMENT, 'retry-1')
+        with CaptureQueriesContext(connection) as queries:
+            second = post(customer_client, '/api/payments/', PAYMENT, 'retry-1')
+
+        assert first.status_code == second.status_code == 201
+        assert second.json() == first.json()
+        assert second['Idempotent-Replayed'] == 'true'
+        assert Payment.objects.count() == 1
+        assert len(queries) == 1
+
+    def test_booking_retry_skips_validation(self, customer_client, room):
+        stay = {'room': room.pk, 'check_in': '2030-01-01', 'check_out': '2030-01-03'}
+
+        first = post(customer_client, '/api/bookings/', stay, 'stay-1')
+        # Without the key the same stay is now taken
+        assert customer_client.post('/api/bookings/', stay, format='json').status_code == 400
+        second = post(customer_client, '/api/bookings/', stay, 'stay-1')
+
+        assert first.status_code == second.status_code == 201
+        assert second.json()['id'] == first.json()['id']
+        assert Booking.objects.count() == 1
+
+    def test_key_reused_for_other_request(self, customer_client):
+        post(customer_client, '/api/payments/', PAYMENT, 'reused')
+        response = post(customer_client, '/api/payments/', {**PAYMENT, 'amount': '11.00'}, 'reused')
+
+        assert response.status_code == 422
+        assert Payment.objects.count() == 1
+
+    def test_keys_are_per_user(self, api_client, customer_client, user_manager):
+        post(customer_client, '/api/payments/', PAYMENT, 'shared')
+        api_client.force_authenticate(user=user_manager)
+
+        assert post(api_client, '/api/payments/', PAYMENT, 'shared').status_code == 201
+        assert Payment.objects.count() == 2
+
+    def test_in_flight_key_conflicts(self, customer_client, user_customer):
+        response = post(customer_client, '/api/payments/', PAYMENT, 'running')
+        IdempotencyKey.objects.filter(key='running').update(response_status=None, response_body=None)
+
+        assert post(customer_client, '/api/payments/', PAYMENT, 'running').status_code == 409
+        assert response.status_code == 201
+
+    def test_abandoned_key_runs_again_after_lease(self, settings, customer_client):
+        post(customer_client, '/api/payments/', PAYMENT, 'died')
+        # The worker died mid-request: the view's writes rolled back with the response
+        Payment.objects.all().delete()
+        IdempotencyKey.objects.update(
+            response_status=None, response_body=None,
+            created_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LEASE + 1),
+        )
+
+        response = post(customer_client, '/api/payments/', PAYMENT, 'died')
+
+        assert response.status_code == 201
+        assert Payment.objects.count() == 1
+        assert IdempotencyKey.objects.get().response_status == 201
+
+    def test_failed_store_rolls_back_the_view(self, customer_client, monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError('disk full')
+
+        monkeypatch.setattr(IdempotencyKey, 'save', fail)
+
+        with pytest.raises(RuntimeError):
+            post(customer_client, '/api/payments/', PAYMENT, 'lost')
+        assert not Payment.objects.exists()
+        assert not IdempotencyKey.objects.exists()
+
+    def test_expired_key_runs_again(self, customer_client):
+        post(customer_client, '/api/payments/', PAYMENT, 'old')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        response = post(customer_client, '/api/payments/', PAYMENT, 'old')
+
+        assert response.status_code == 201
+        assert not response.has_header('Idempotent-Replayed')
+        assert Payment.objects.count() == 2
+
+    def test_without_key_nothing_is_stored(self, customer_client):
+        customer_client.post('/api/payments/', PAYMENT, format='json')
+        customer_client.post('/api/payments/', PAYMENT, format='json')
+
+        assert Payment.objects.count() == 2
+        assert not IdempotencyKey.objects.exists()
+
+    def test_overlong_key_rejected(self, customer_client):
+        assert post(customer_client, '/api/payments/', PAYMENT, 'k' * 256).status_code == 400
+
+
+@pytest.mark.django_db
+def test_prune_deletes_only_expired(customer_client):
+    post(customer_client, '/api/payments/', PAYMENT, 'fresh')
+    post(customer_client, '/api/payments/', PAYMENT, 'stale')
+    IdempotencyKey.objects.filter(key='stale').update(created_at=timezone.now() - timedelta(days=2))
+    out = StringIO()
+
+    call_command('pruneidempotencykeys', '--batch-size', '1', stdout=out)
+
+    assert list(IdempotencyKey.objects.values_list('key', flat=True)) == ['fresh']
+    assert 'Deleted 1' in out.getvalue()
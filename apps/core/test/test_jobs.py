@@ -0,0 +1,172 @@
+import pytest
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.core import jobs
+from apps.core.jobs import Worker, claim_jobs, enqueue, release_jobs, run_job, task
+from apps.core.models import Job
+
+TIMEOUT = timedelta(minutes=5)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setattr(jobs, '_tasks', {})
+    monkeypatch.setattr(jobs, '_discovered', True)
+    made: list[int] = []
+
+    @task('test.record')
+    def record(value: int) -> None:
+        if value < 0:
+            raise ValueError('negative')
+        made.append(value)
+
+    @task('test.urgent', priority=5)
+    def urgent(value: int) -> None:
+        made.append(value)
+
+    return made
+
+
+@pytest.mark.django_db
+class TestClaiming:
+
+    def test_priority_then_age_in_batches(self, calls):
+        low = enqueue('test.record', {'value': 1})
+        high = enqueue('test.urgent', {'value': 2})
+        later = enqueue('test.record', {'value': 3})
+
+        _, first = claim_jobs('a', ['default'], 2, TIMEOUT)
+        _, second = claim_jobs('b', ['default'], 2, TIMEOUT)
+
+        assert [job.pk for job in first] == [high.pk, low.pk]
+        assert [job.pk for job in second] == [later.pk]
+        assert all(job.status == Job.RUNNING and job.attempts == 1 for job in first + second)
+        assert claim_jobs('c', ['default'], 2, TIMEOUT)[1] == []
+
+    def test_delayed_and_other_queues_wait(self, calls):
+        enqueue('test.record', {'value': 1}, delay=timedelta(minutes=1))
+        Job.objects.create(task='test.record', kwargs={'value': 2}, queue='reports')
+
+        assert claim_jobs('a', ['default'], 10, TIMEOUT)[1] == []
+        assert len(claim_jobs('a', ['reports'], 10, TIMEOUT)[1]) == 1
+
+    def test_abandoned_jobs_are_reclaimed_then_failed(self, calls):
+        job = enqueue('test.record', {'value': 1})
+        Job.objects.filter(pk=job.pk).update(max_attempts=2)
+
+        claim_jobs('dead-worker', ['default'], 1, timedelta(seconds=-1))
+        token, reclaimed = claim_jobs('b', ['default'], 1, timedelta(seconds=-1))
+        assert [(found.pk, found.attempts) for found in reclaimed] == [(job.pk, 2)]
+
+        assert claim_jobs('c', ['default'], 1, TIMEOUT)[1] == []
+        job.refresh_from_db()
+        assert job.status == Job.FAILED
+        assert 'Timed out' in job.last_error
+
+    def test_release_returns_unstarted_jobs(self, calls):
+        enqueue('test.record', {'value': 1})
+        token, claimed = claim_jobs('a', ['default'], 1, TIMEOUT)
+
+        assert release_jobs(token, [job.pk for job in claimed]) == 1
+        job = Job.objects.get()
+        assert (job.status, job.attempts, job.locked_by) == (Job.QUEUED, 0, '')
+
+
+@pytest.mark.django_db
+class TestRunning:
+
+    def test_success(self, calls):
+        enqueue('test.record', {'value': 7})
+        token, (job,) = claim_jobs('a', ['default'], 1, TIMEOUT)
+
+        assert run_job(job, token, TIMEOUT)
+        job.refresh_from_db()
+        assert job.status == Job.DONE
+        assert calls == [7]
+
+    def test_failure_is_retried_with_backoff_then_failed(self, calls, settings):
+        enqueue('test.record', {'value': -1})
+        token, (job,) = claim_jobs('a', ['default'], 1, TIMEOUT)
+
+        assert not run_job(job, token, TIMEOUT)
+        job.refresh_from_db()
+        assert job.status == Job.QUEUED
+        assert job.run_at > timezone.now() + timedelta(seconds=settings.JOB_RETRY_DELAY - 5)
+        assert 'negative' in job.last_error
+
+        Job.objects.update(run_at=timezone.now(), attempts=settings.JOB_MAX_ATTEMPTS - 1)
+        token, (job,) = claim_jobs('a', ['default'], 1, TIMEOUT)
+        run_job(job, token, TIMEOUT)
+        job.refresh_from_db()
+        assert job.status == Job.FAILED
+
+    def test_reclaimed_job_is_skipped(self, calls):
+        enqueue('test.record', {'value': 1})
+        token, (job,) = claim_jobs('a', ['default'], 1, TIMEOUT)
+        Job.objects.update(locked_by='someone-else')
+
+        assert not run_job(job, token, TIMEOUT)
+        assert calls == []
+
+    def test_burst_worker_drains_queue(self, calls):
+        for value in range(5):
+            enqueue('test.record', {'value': value})
+
+        processed = Worker('w', ['default'], threading.Event(), batch_size=2, burst=True).run()
+
+        assert processed == 5
+        assert sorted(calls) == list(range(5))
+
+    def test_unknown_task_rejected(self, calls):
+        with pytest.raises(LookupError):
+            enqueue('test.missing')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_heartbeat_keeps_long_task_claimed(calls):
+    timeout = timedelta(seconds=0.3)
+    stolen = []
+
+    @task('test.slow', max_attempts=1)
+    def slow() -> None:
+        time.sleep(0.5)
+        # Past the visibility timeout: only the heartbeat keeps the job hidden
+        stolen.extend(claim_jobs('thief', ['default'], 1, timeout)[1])
+
+    enqueue('test.slow')
+    token, (job,) = claim_jobs('a', ['default'], 1, timeout)
+
+    assert run_job(job, token, timeout)
+    assert stolen == []
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.DONE, 1)
+
+
+@pytest.mark.django_db
+def test_commands_can_queue_their_work():
+    call_command('pruneidempotencykeys', '--enqueue', stdout=StringIO())
+    call_command('rebuildstats', '--enqueue', '--batch-size', '500', stdout=StringIO())
+
+    assert list(Job.objects.order_by('id').values_list('task', 'kwargs', 'status')) == [
+        ('core.prune_idempotency_keys', {'batch_size': 5000}, Job.QUEUED),
+        ('booking.rebuild_stats', {'batch_size': 500}, Job.QUEUED),
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_runworkers_command_with_threads(calls):
+    for value in range(6):
+        enqueue('test.record', {'value': value})
+    out = StringIO()
+
+    call_command('runworkers', '--workers', '3', '--burst', '--batch-size', '2', stdout=out)
+
+    assert sorted(calls) == list(range(6))
+    assert Job.objects.filter(status=Job.DONE).count() == 6
+    assert 'Workers stopped.' in out.getvalue()
@@ -0,0 +1,123 @@
+import json
+import threading
+
+import pytest
+
+from apps.core.metrics import Registry, registry
+
+
+@pytest.fixture
+def metrics():
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+def exposition_lines(text):
+    return [line for line in text.splitlines() if not line.startswith('#')]
+
+
+class TestRegistry:
+
+    def test_histogram_buckets_are_cumulative(self):
+        local = Registry()
+        latency = local.histogram('latency_seconds', 'Latency.', ('view',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3):
+            latency.observe(('hotels',), value)
+
+        assert exposition_lines(local.exposition()) == [
+            'latency_seconds_bucket{view="hotels",le="0.1"} 1',
+            'latency_seconds_bucket{view="hotels",le="1.0"} 3',
+            'latency_seconds_bucket{view="hotels",le="+Inf"} 4',
+            'latency_seconds_sum{view="hotels"} 4.05',
+            'latency_seconds_count{view="hotels"} 4',
+        ]
+
+    def test_threads_add_up(self):
+        local = Registry()
+        hits = local.counter('hits_total', 'Hits.')
+
+        def work():
+            for _ in range(1000):
+                hits.inc(())
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        work()
+
+        assert exposition_lines(local.exposition()) == ['hits_total 5000']
+
+    def test_other_processes_are_added_from_their_files(self, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        local = Registry()
+        hits = local.counter('hits_total', 'Hits.', ('view',))
+        hits.inc(('hotels',), 2)
+        local.flush(force=True)
+        (tmp_path / '1-1.json').write_text(json.dumps([['hits_total', ['hotels'], [3]], ['hits_total', ['users'], [1]]]))
+
+        hits.inc(('hotels',))
+
+        assert exposition_lines(local.exposition()) == ['hits_total{view="hotels"} 6', 'hits_total{view="users"} 1']
+
+    def test_files_of_exited_processes_are_removed(self, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        local = Registry()
+        hits = local.counter('hits_total', 'Hits.')
+        hits.inc(())
+        local.flush(force=True)
+        # No process runs with a pid this large
+        (tmp_path / f'{2 ** 30}-1.json').write_text(json.dumps([['hits_total', [], [5]]]))
+
+        assert exposition_lines(local.exposition()) == ['hits_total 1']
+        assert [path.name for path in tmp_path.iterdir()] == [local.file_name()]
+
+        local._remove_file()
+
+        assert not list(tmp_path.iterdir())
+
+    def test_label_values_are_escaped(self):
+        local = Registry()
+        local.counter('hits_total', 'Hits.', ('path',)).inc(('a"b\\c',))
+
+        assert exposition_lines(local.exposition()) == ['hits_total{path="a\\"b\\\\c"} 1']
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+
+    def test_requests_recorded_by_viewset_action_and_status(self, settings, metrics, api_client, user_admin, hotel):
+        settings.METRICS_SCRAPE_TOKEN = 'scrape-secret'
+        api_client.force_authenticate(user=user_admin)
+        api_client.get('/api/hotels/')
+        api_client.get(f'/api/hotels/{hotel.pk}/')
+        api_client.get('/api/hotels/999999/')
+
+        response = api_client.get('/api/metrics/', HTTP_X_METRICS_TOKEN='scrape-secret')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        body = response.content.decode()
+        assert 'http_requests_total{viewset="HotelViewSet",action="list",status="200"} 1' in body
+        assert 'http_requests_total{viewset="HotelViewSet",action="retrieve",status="200"} 1' in body
+        assert 'http_requests_total{viewset="HotelViewSet",action="retrieve",status="404"} 1' in body
+        assert 'http_request_duration_seconds_count{viewset="HotelViewSet",action="list",status="200"} 1' in body
+
+    def test_scrapers_must_be_staff_or_send_the_token(self, settings, api_client, user_customer):
+        assert api_client.get('/api/metrics/').status_code == 401
+
+        api_client.force_authenticate(user=user_customer)
+        assert api_client.get('/api/metrics/').status_code == 403
+
+        settings.METRICS_SCRAPE_TOKEN = 'scrape-secret'
+        assert api_client.get('/api/metrics/', HTTP_X_METRICS_TOKEN='wrong').status_code == 403
+        assert api_client.get('/api/metrics/', HTTP_X_METRICS_TOKEN='scrape-secret').status_code == 200
+
+    def test_allowed_ips_limit_token_scrapers(self, settings, api_client):
+        settings.METRICS_SCRAPE_TOKEN = 'scrape-secret'
+        settings.METRICS_ALLOWED_IPS = ['10.0.0.5']
+
+        assert api_client.get('/api/metrics/', HTTP_X_METRICS_TOKEN='scrape-secret').status_code == 401
+        assert api_client.get('/api/metrics/', HTTP_X_METRICS_TOKEN='scrape-secret', REMOTE_ADDR='10.0.0.5').status_code == 200
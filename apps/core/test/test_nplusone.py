@@ -0,0 +1,113 @@
+import datetime
+import logging
+from decimal import Decimal
+
+import pytest
+
+from django.contrib.auth import get_user_model
+
+from apps.booking.models import Booking
+from apps.core.nplusone import NPlusOneError, allow_repeats, detect_nplusone
+from apps.hotels.models import Hotel, Room, RoomRateOverride
+from apps.payment.models import Payment
+
+
+def room_labels():
+    return [str(room) for room in Room.objects.order_by('id')]
+
+
+@pytest.fixture
+def rooms(hotel, room_type, user_customer):
+    hotels = [hotel] + [
+        Hotel.objects.create(name=f'Hotel {i}', address='Almaty', rating=4, description='', owner=user_customer)
+        for i in range(5)
+    ]
+    rooms = [Room.objects.create(number=i, price_per_night=10000, hotel=each, room_type=room_type) for i, each in enumerate(hotels)]
+    for i, each in enumerate(rooms):
+        RoomRateOverride.objects.create(room=each, date=datetime.date(2030, 1, i + 1), price=Decimal('9000'))
+        Booking.objects.create(
+            user=user_customer, room=each, check_in=datetime.date(2030, 2, 1), check_out=datetime.date(2030, 2, 2),
+            total_price=Decimal('10000'),
+        )
+        Payment.objects.create(user=user_customer, amount=Decimal('10000'), payment_method='cash', status='pending')
+    return rooms
+
+
+@pytest.mark.django_db
+class TestDetectNPlusOne:
+
+    def test_lazy_relation_in_loop_raises_with_call_site(self, rooms):
+        with pytest.raises(NPlusOneError) as error:
+            with detect_nplusone(lambda: 'labels'):
+                room_labels()
+
+        message = str(error.value)
+        assert message.startswith('labels repeated queries (N+1?): 6x from apps/hotels/models.py:')
+        assert 'in __str__' in message and 'FROM "hotels_hotel"' in message
+
+    def test_warn_mode_logs(self, rooms, caplog):
+        with caplog.at_level(logging.WARNING, logger='apps.core.nplusone'):
+            with detect_nplusone(lambda: 'labels', mode='warn') as patterns:
+                room_labels()
+
+        [record] = caplog.records
+        assert record.repeated == patterns.repeated(5)
+        assert record.repeated[0][2] == 6
+
+    def test_below_threshold_and_allowed_loops_pass(self, rooms):
+        with detect_nplusone(lambda: 'labels', threshold=7):
+            room_labels()
+        with detect_nplusone(lambda: 'labels'):
+            with allow_repeats():
+                room_labels()
+
+    def test_different_call_sites_are_counted_apart(self, rooms):
+        with detect_nplusone(lambda: 'ids') as patterns:
+            for room in rooms[:4]:
+                Room.objects.get(pk=room.pk)
+            for room in rooms[:4]:
+                Room.objects.get(pk=room.pk)
+
+        assert sorted(patterns.counts.values()) == [4, 4]
+
+
+@pytest.mark.django_db
+class TestNPlusOneMiddleware:
+
+    @pytest.mark.parametrize('url', [
+        '/admin/hotels/hotel/',
+        '/admin/hotels/room/',
+        '/admin/hotels/roomrateoverride/',
+        '/admin/hotels/roomrateoverride/add/',
+        '/admin/booking/booking/',
+        '/admin/booking/booking/add/',
+        '/admin/payment/payment/',
+    ])
+    def test_admin_pages_do_not_repeat_queries(self, client, rooms, url):
+        client.force_login(get_user_model().objects.create_superuser(phone=87001110200, email='root@example.com', password='Root1234'))
+
+        assert client.get(url).status_code == 200
+
+    def test_hotel_rooms(self, api_client, user_customer, hotel, rooms, room_type):
+        for number in range(10, 20):
+            Room.objects.create(number=number, price_per_night=10000, hotel=hotel, room_type=room_type)
+        api_client.force_authenticate(user=user_customer)
+
+        response = api_client.get(f'/api/hotels/{hotel.pk}/rooms/')
+
+        assert response.status_code == 200 and len(response.json()) == 11
+
+    @pytest.fixture
+    def lazy_room_list(self, client, rooms, monkeypatch):
+        # An empty tuple stops the changelist from joining the hotel shown for each room
+        monkeypatch.setattr('apps.hotels.admin.RoomAdmin.list_select_related', ())
+        client.force_login(get_user_model().objects.create_superuser(phone=87001110200, email='root@example.com', password='Root1234'))
+
+    def test_repeating_request_raises(self, client, lazy_room_list):
+        with pytest.raises(NPlusOneError, match=r'^GET /admin/hotels/room/ \(changelist_view\.get\) repeated queries'):
+            client.get('/admin/hotels/room/')
+
+    def test_off_when_unset(self, settings, client, lazy_room_list):
+        settings.NPLUSONE_DETECTION = None
+
+        assert client.get('/admin/hotels/room/').status_code == 200
@@ -0,0 +1,149 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.transaction import TransactionManagementError
+from django.utils import timezone
+
+from apps.booking.models import Booking
+from apps.core import outbox
+from apps.core.models import OutboxEvent
+from apps.core.outbox import drain_outbox, outbox_handler, publish
+from apps.payment.models import Payment
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    monkeypatch.setattr(outbox, '_handlers', {})
+    calls: list[tuple[str, int, int]] = []
+
+    @outbox_handler('test.event')
+    def record(event):
+        if event.payload.get('fail'):
+            raise RuntimeError('downstream is down')
+        calls.append((event.aggregate_type, event.aggregate_id, event.payload.get('step')))
+
+    return calls
+
+
+def events():
+    return list(OutboxEvent.objects.order_by('id').values_list('event_type', 'aggregate_type', 'aggregate_id'))
+
+
+@pytest.mark.django_db
+class TestPublishedEvents:
+
+    def test_booking_lifecycle(self, customer_client, user_customer, room):
+        response = customer_client.post('/api/bookings/', {
+            'room': room.pk, 'check_in': '2030-01-01', 'check_out': '2030-01-03',
+        }, format='json')
+        booking_id = response.data['id']
+        payment = Payment.objects.create(user=user_customer, amount=Decimal('1'), payment_method='cash', status='pending')
+        Booking.objects.filter(pk=booking_id).update(payment=payment)
+
+        customer_client.post(f'/api/payments/{payment.pk}/process/')
+        customer_client.post(f'/api/bookings/{booking_id}/cancel/')
+
+        assert events() == [
+            ('booking.created', 'booking', booking_id),
+            ('payment.completed', 'payment', payment.pk),
+            ('booking.confirmed', 'booking', booking_id),
+            ('booking.cancelled', 'booking', booking_id),
+        ]
+        assert OutboxEvent.objects.get(event_type='booking.created').payload == {
+            'booking_id': booking_id, 'room_id': room.pk, 'check_in': '2030-01-01', 'check_out': '2030-01-03',
+            'total_price': 20000,
+        }
+
+    def test_rejected_booking_writes_nothing(self, customer_client, room):
+        stay = {'room': room.pk, 'check_in': '2030-01-01', 'check_out': '2030-01-03'}
+        customer_client.post('/api/bookings/', stay, format='json')
+
+        assert customer_client.post('/api/bookings/', stay, format='json').status_code == 400
+        assert len(events()) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_publish_requires_transaction():
+    with pytest.raises(TransactionManagementError):
+        publish('test.event', 'booking', 1)
+
+
+@pytest.mark.django_db
+class TestDrain:
+
+    def test_events_are_handled_in_order(self, handled):
+        for step in range(3):
+            publish('test.event', 'booking', 1, {'step': step})
+        publish('test.event', 'booking', 2, {'step': 0})
+
+        # One event per aggregate is in flight at a time
+        first = drain_outbox()
+        call_command('drainoutbox', stdout=StringIO())
+
+        assert first.done == 2
+        assert handled == [('booking', 1, 0), ('booking', 2, 0), ('booking', 1, 1), ('booking', 1, 2)]
+        assert not OutboxEvent.objects.exclude(status=OutboxEvent.DONE).exists()
+
+    def test_failure_holds_its_aggregate_only(self, handled, settings):
+        failing = publish('test.event', 'booking', 1, {'fail': True})
+        publish('test.event', 'booking', 1, {'step': 1})
+        publish('test.event', 'booking', 2, {'step': 0})
+
+        result = drain_outbox()
+        result_again = drain_outbox()
+
+        failing.refresh_from_db()
+        assert (result.retried, result.done, result_again.handled) == (1, 1, 0)
+        assert handled == [('booking', 2, 0)]
+        assert failing.attempts == 1
+        assert failing.available_at > timezone.now() + timedelta(seconds=settings.OUTBOX_RETRY_DELAY - 5)
+        assert 'downstream is down' in failing.last_error
+
+    def test_gives_up_after_max_attempts(self, handled, settings):
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        failing = publish('test.event', 'booking', 1, {'fail': True})
+        publish('test.event', 'booking', 1, {'step': 1})
+
+        drain_outbox()
+        OutboxEvent.objects.filter(pk=failing.pk).update(available_at=timezone.now())
+        assert drain_outbox().dead == 1
+        drain_outbox()
+
+        failing.refresh_from_db()
+        assert failing.status == OutboxEvent.DEAD
+        assert handled == [('booking', 1, 1)]
+
+    def test_handlers_run_outside_the_claim(self, handled, monkeypatch):
+        publish('test.event', 'booking', 1, {'step': 0})
+        publish('test.event', 'booking', 2, {'step': 0})
+        seen = []
+
+        @outbox_handler('test.event')
+        def check(event):
+            # Both events were claimed up front, and the first outcome was recorded before the second ran
+            seen.append(list(OutboxEvent.objects.order_by('id').values_list('status', 'attempts')))
+
+        assert drain_outbox().done == 2
+        assert seen == [
+            [(OutboxEvent.PENDING, 1), (OutboxEvent.PENDING, 1)],
+            [(OutboxEvent.DONE, 1), (OutboxEvent.PENDING, 1)],
+        ]
+
+    def test_event_of_a_dead_worker_runs_after_its_lease(self, handled, settings):
+        publish('test.event', 'booking', 1, {'step': 0})
+        [claimed] = outbox.claim_events(10)
+
+        assert drain_outbox().handled == 0
+
+        OutboxEvent.objects.filter(pk=claimed.pk).update(available_at=timezone.now())
+        assert drain_outbox().done == 1
+        claimed.refresh_from_db()
+        assert (claimed.status, claimed.attempts, handled) == (OutboxEvent.DONE, 2, [('booking', 1, 0)])
+
+    def test_events_without_handlers_are_done(self, handled):
+        publish('nobody.listens', 'booking', 1)
+
+        assert drain_outbox().done == 1
@@ -0,0 +1,79 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from drf_spectacular.generators import SchemaGenerator
+
+from apps.booking.models import Booking
+from apps.payment.models import Payment
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_bookings_walk_all_pages_without_count(self, api_client, user_customer, room):
+        ids = [
+            Booking.objects.create(
+                user=user_customer, room=room,
+                check_in=date(2030, 1, 1) + timedelta(days=2 * day),
+                check_out=date(2030, 1, 2) + timedelta(days=2 * day),
+            ).id
+            for day in range(5)
+        ]
+        api_client.force_authenticate(user=user_customer)
+
+        seen = []
+        url = "/api/bookings/?page_size=2"
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = api_client.get(url)
+                assert response.status_code == 200
+                assert set(response.data) == {'next', 'previous', 'results'}
+                seen.extend(row['id'] for row in response.data['results'])
+                url = response.data['next']
+
+        assert seen == sorted(ids, reverse=True)
+        assert not any('COUNT(' in query['sql'].upper() for query in queries.captured_queries)
+
+    def test_users_list_is_paginated(self, api_client, user_admin):
+        api_client.force_authenticate(user=user_admin)
+        response = api_client.get("/api/users/?page_size=100000")
+
+        assert response.status_code == 200
+        assert len(response.data['results']) == 1
+
+    def test_payments_sharing_a_timestamp_page_in_id_order(self, api_client, user_customer):
+        ids = [
+            Payment.objects.create(user=user_customer, amount=Decimal('100'), payment_method='cash', status='pending').id
+            for _ in range(5)
+        ]
+        Payment.objects.update(created_at=timezone.now())
+        api_client.force_authenticate(user=user_customer)
+
+        seen = []
+        url = "/api/payments/?page_size=2"
+        while url:
+            response = api_client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        assert seen == sorted(ids, reverse=True)
+
+
+class TestPaginatedSchema:
+
+    def test_list_actions_document_the_page_shape(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        page = schema['components']['schemas']['PaginatedBookingList']
+        assert set(page['properties']) == {'next', 'previous', 'results'}
+        assert page['properties']['results']['items'] == {'$ref': '#/components/schemas/Booking'}
+        for path in (
+            '/api/bookings/', '/api/bookings/my-bookings/', '/api/payments/', '/api/payments/my-payments/',
+            '/api/hotels/', '/api/users/',
+        ):
+            response = schema['paths'][path]['get']['responses']['200']['content']['application/json']['schema']
+            assert response['$ref'].startswith('#/components/schemas/Paginated')
@@ -0,0 +1,95 @@
+import sys
+import time
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.core.profiler import Sampler, collapse, endpoint_file, load_stacks
+from apps.hotels.views import HotelValuesSerializer
+
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestSampler:
+
+    def test_collapse_starts_below_stop_frame(self):
+        def outer():
+            return inner()
+
+        def inner():
+            return collapse(sys._getframe(), stop=outer.__code__)
+
+        assert outer().endswith(':inner')
+        assert ':outer' not in outer()
+
+    def test_samples_running_thread(self):
+        sampler = Sampler(interval=0.001)
+
+        sampler.start()
+        spin(0.05)
+        counts = sampler.stop()
+
+        assert sum(counts.values()) > 0
+        assert any(stack.endswith(':spin') for stack in counts)
+        assert sampler.stop() == {}
+
+
+@pytest.mark.django_db
+class TestProfilerMiddleware:
+
+    @pytest.fixture
+    def slow_hotel_list(self, monkeypatch):
+        serialize = HotelValuesSerializer.serialize
+
+        def slow(*args, **kwargs):
+            spin(0.03)
+            return serialize(*args, **kwargs)
+
+        monkeypatch.setattr(HotelValuesSerializer, 'serialize', slow)
+
+    def test_profiled_endpoint_saves_collapsed_stacks(self, settings, tmp_path, api_client, user_customer, slow_hotel_list):
+        settings.PROFILER_DIR = str(tmp_path)
+        settings.PROFILER_INTERVAL = 0.001
+        settings.PROFILER_ENDPOINT_RATES = {'HotelViewSet.list': 1.0}
+        api_client.force_authenticate(user=user_customer)
+
+        api_client.get('/api/hotels/')
+        api_client.get('/api/users/')
+
+        assert [path.name for path in tmp_path.iterdir()] == ['HotelViewSet.list.folded']
+        stacks = load_stacks(endpoint_file(str(tmp_path), 'HotelViewSet.list'))
+        assert any('apps/hotels/views.py:list' in stack and stack.endswith(':spin') for stack in stacks)
+        assert not any('ProfilerMiddleware' in stack or 'profiler.py:__call__' in stack for stack in stacks)
+
+    def test_off_by_default(self, settings, tmp_path, api_client, user_customer, slow_hotel_list):
+        settings.PROFILER_DIR = str(tmp_path)
+        api_client.force_authenticate(user=user_customer)
+
+        api_client.get('/api/hotels/')
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestProfileTop:
+
+    def test_ranks_frames_per_endpoint(self, settings, tmp_path):
+        settings.PROFILER_DIR = str(tmp_path)
+        (tmp_path / 'BookingViewSet.list.folded').write_text(
+            'views.py:list;search.py:find;db.py:execute 6\n'
+            'views.py:list;render.py:render 3\n'
+            'views.py:list;search.py:find 1\n'
+        )
+        out = StringIO()
+
+        call_command('profiletop', '--limit', '2', stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert lines[0] == 'BookingViewSet.list: 10 samples'
+        assert lines[2].split() == ['60.0', '60.0', 'db.py:execute']
+        assert lines[3].split() == ['30.0', '30.0', 'render.py:render']
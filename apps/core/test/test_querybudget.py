@@ -0,0 +1,150 @@
+import pytest
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+
+from apps.booking.models import Booking
+from apps.core.querybudget import BUDGET_HEADER, QueryBudgetExceeded, query_budget
+from apps.hotels.models import Hotel, Room
+from apps.payment.models import Payment
+
+
+class Probe:
+
+    @query_budget(1)
+    def action(self, request, queries=1):
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute('SELECT 1')
+        return Response({})
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    def test_within_budget_reports_count_in_debug(self, settings):
+        settings.DEBUG = True
+
+        response = Probe().action(None)
+
+        assert response[BUDGET_HEADER] == '1/1'
+
+    def test_over_budget_raises_when_strict(self, settings):
+        settings.QUERY_BUDGET_STRICT = True
+
+        with pytest.raises(QueryBudgetExceeded, match='Probe.action ran 2 queries, budget is 1'):
+            Probe().action(None, queries=2)
+
+    def test_over_budget_only_logged_otherwise(self, settings, caplog):
+        settings.QUERY_BUDGET_STRICT = False
+        settings.DEBUG = True
+
+        response = Probe().action(None, queries=2)
+
+        assert response[BUDGET_HEADER] == '2/1'
+        assert 'budget is 1' in caplog.text
+
+    def test_budget_exposed_on_view(self):
+        assert Probe.action.query_budget == 1
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, response.data
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestEndpointsIndependentOfSize:
+    """
+    Each list endpoint runs as many queries for one row as for many.
+    """
+
+    def grow(self, user, hotel, room_type, start, count):
+        for number in range(start, start + count):
+            room = Room.objects.create(number=number, price_per_night=1000, hotel=hotel, room_type=room_type)
+            payment = Payment.objects.create(user=user, amount=10, payment_method='cash', status='completed')
+            Booking.objects.create(
+                user=user, room=room, check_in=date(2030, 1, 1), check_out=date(2030, 1, 3),
+                status='confirmed', payment=payment,
+            )
+            Hotel.objects.create(name=f'Hotel {number}', address='Almaty', owner=user)
+
+    @pytest.mark.parametrize('url', [
+        '/api/hotels/',
+        '/api/hotels/{hotel}/rooms/',
+        '/api/hotels/my-hotels/',
+        '/api/room-type/',
+        '/api/bookings/',
+        '/api/bookings/my-bookings/',
+        '/api/bookings/available-rooms/?check_in=2030-02-01&check_out=2030-02-03',
+        '/api/payments/',
+        '/api/payments/my-payments/',
+        '/api/users/',
+    ])
+    def test_list_query_count_is_flat(self, staff_client, user_admin, hotel, room_type, settings, url):
+        settings.AVAILABILITY_CACHE_TIMEOUT = 0
+        url = url.format(hotel=hotel.pk)
+
+        self.grow(user_admin, hotel, room_type, 1, 1)
+        small = count_queries(staff_client, url)
+        self.grow(user_admin, hotel, room_type, 2, 8)
+        large = count_queries(staff_client, url)
+
+        assert large == small
+
+
+@pytest.mark.django_db
+class TestActionsWithinBudget:
+    """
+    Exercise the remaining budgeted actions; strict budgets fail the test on overrun.
+    """
+
+    def test_booking_actions(self, staff_client, user_admin, room):
+        booking = Booking.objects.create(
+            user=user_admin, room=room, check_in=date(2030, 1, 1), check_out=date(2030, 1, 3), status='pending',
+        )
+        url = f'/api/bookings/{booking.pk}/'
+        stay = {'room': room.pk, 'check_in': '2030-01-02', 'check_out': '2030-01-05'}
+
+        assert staff_client.get(url).status_code == 200
+        assert staff_client.put(url, stay, format='json').status_code == 200
+        assert staff_client.patch(url, {'check_out': '2030-01-06'}, format='json').status_code == 200
+        assert staff_client.post(f'{url}cancel/').status_code == 200
+        assert staff_client.post('/api/bookings/', stay, format='json').status_code == 201
+        assert staff_client.delete(url).status_code == 204
+
+    def test_hotel_actions(self, staff_client, hotel, room_type):
+        url = f'/api/hotels/{hotel.pk}/'
+        hotel_data = {'name': 'Renamed', 'address': 'Astana', 'rating': 4}
+
+        assert staff_client.post('/api/hotels/', hotel_data, format='json').status_code == 201
+        assert staff_client.put(url, hotel_data, format='json').status_code == 200
+        assert staff_client.patch(url, {'rating': 5}, format='json').status_code == 200
+        assert staff_client.post(f'{url}add-room/', {
+            'number': 7, 'price_per_night': 1000, 'room_type': room_type.pk,
+        }, format='json').status_code == 201
+
+    def test_room_type_actions(self, staff_client, room_type):
+        url = f'/api/room-type/{room_type.pk}/'
+
+        assert staff_client.post('/api/room-type/', {'name': 'Suite', 'capacity': 4}, format='json').status_code == 201
+        assert staff_client.patch(url, {'capacity': 3}, format='json').status_code == 200
+        assert staff_client.delete(url).status_code == 204
+
+    def test_payment_actions(self, staff_client, user_admin):
+        response = staff_client.post('/api/payments/', {'amount': '10.00', 'payment_method': 'cash', 'status': 'pending'}, format='json')
+        url = f"/api/payments/{response.data['id']}/"
+
+        assert response.status_code == 201
+        assert staff_client.get(url).status_code == 200
+        assert staff_client.put(url, {'amount': '12.00', 'payment_method': 'cash', 'status': 'completed'}, format='json').status_code == 200
+        assert staff_client.post(f'{url}process/').status_code == 200
+        assert staff_client.post('/api/payments/process/', {'payment_ids': [response.data['id']]}, format='json').status_code == 200
+        assert staff_client.delete(url).status_code == 204
+
+    def test_user_actions(self, staff_client):
+        assert staff_client.get('/api/users/me/').status_code == 200
@@ -0,0 +1,30 @@
+import pytest
+from io import StringIO
+
+from django.core.management import call_command
+
+from apps.core.queryplans import full_table_scans
+
+
+class TestFullTableScans:
+
+    def test_plain_scan_is_flagged(self):
+        assert full_table_scans(["SCAN booking_booking"]) == ["SCAN booking_booking"]
+
+    def test_index_backed_steps_pass(self):
+        plan = [
+            "SEARCH booking_booking USING INDEX booking_user_status_idx (user_id=?)",
+            "SCAN hotels_room USING INDEX room_hotel_available_idx",
+            "SCAN CONSTANT ROW",
+            "USE TEMP B-TREE FOR ORDER BY",
+        ]
+        assert full_table_scans(plan) == []
+
+
+@pytest.mark.django_db
+class TestCheckQueryPlans:
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('checkqueryplans', stdout=out)
+        assert "booking.overlap" in out.getvalue()
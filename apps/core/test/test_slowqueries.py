@@ -0,0 +1,99 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.core.slowqueries import log_slow_queries, normalize_sql
+from apps.hotels.models import Room
+from apps.hotels.serializers import RoomSerializer
+
+
+def logged(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def log_everything(settings, tmp_path):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_LOG_FILE = str(tmp_path / 'slow.jsonl')
+    return tmp_path / 'slow.jsonl'
+
+
+class TestNormalizeSql:
+
+    def test_values_become_placeholders(self):
+        sql = "SELECT \"id\" FROM hotels_room WHERE  hotel_id IN (%s, %s, %s)\n AND number > 12 AND name = 'O''Hara' LIMIT 21"
+
+        assert normalize_sql(sql) == 'SELECT "id" FROM hotels_room WHERE hotel_id IN (...) AND number > ? AND name = ? LIMIT ?'
+
+    def test_repeated_rows_collapse(self):
+        rows = ', '.join(['(%s, %s, (SELECT COUNT(*) FROM t WHERE id = %s))'] * 3)
+
+        assert normalize_sql(f'INSERT INTO s (a, b, c) VALUES {rows}') == (
+            'INSERT INTO s (a, b, c) VALUES (?, ?, (SELECT COUNT(*) FROM t WHERE id = ?)), ...'
+        )
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+
+    def test_lazy_serializer_field_is_attributed(self, log_everything, room, caplog):
+        room = Room.objects.get(pk=room.pk)
+
+        with caplog.at_level(logging.WARNING, logger='apps.core.slowqueries'):
+            with log_slow_queries(lambda: 'test'):
+                RoomSerializer(room).data
+
+        sources = {record.source for record in caplog.records}
+        assert 'RoomSerializer.hotel_name' in sources
+        [entry] = [entry for entry in logged(log_everything) if entry['source'] == 'RoomSerializer.hotel_name']
+        assert entry['endpoint'] == 'test'
+        assert entry['sql'].startswith('SELECT') and 'hotels_hotel' in entry['sql']
+        assert entry['duration_ms'] >= 0
+
+    def test_requests_are_attributed_to_their_action(self, log_everything, api_client, user_customer, hotel):
+        api_client.force_authenticate(user=user_customer)
+
+        api_client.get('/api/hotels/')
+
+        assert {entry['endpoint'] for entry in logged(log_everything)} == {'HotelViewSet.list'}
+
+    def test_unwritable_log_file_does_not_fail_the_query(self, settings, log_everything, room, caplog):
+        settings.SLOW_QUERY_LOG_FILE = str(log_everything.parent / 'missing' / 'slow.jsonl')
+
+        with caplog.at_level(logging.WARNING, logger='apps.core.slowqueries'):
+            with log_slow_queries(lambda: 'test'):
+                assert Room.objects.get(pk=room.pk).number == room.number
+
+        assert any('could not append' in record.getMessage() for record in caplog.records)
+
+    def test_fast_queries_are_not_logged(self, settings, log_everything, api_client, user_customer):
+        settings.SLOW_QUERY_THRESHOLD_MS = 10_000
+        api_client.force_authenticate(user=user_customer)
+
+        api_client.get('/api/hotels/')
+
+        assert not log_everything.exists()
+
+
+class TestSlowQueriesCommand:
+
+    def test_shapes_ranked_by_total_time(self, tmp_path):
+        path = tmp_path / 'slow.jsonl'
+        entries = [
+            {'sql': 'SELECT a', 'duration_ms': 300.0, 'endpoint': 'BookingViewSet.list', 'source': None},
+            {'sql': 'SELECT b', 'duration_ms': 250.0, 'endpoint': 'HotelViewSet.list', 'source': 'RoomSerializer.hotel_name'},
+            {'sql': 'SELECT b', 'duration_ms': 250.0, 'endpoint': 'HotelViewSet.list', 'source': 'RoomSerializer.hotel_name'},
+        ]
+        path.write_text(''.join(json.dumps(entry) + '\n' for entry in entries))
+        out = StringIO()
+
+        call_command('slowqueries', '--file', str(path), stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert lines[0] == '500.0 ms total, 2 runs, mean 250.0 ms, max 250.0 ms'
+        assert lines[1:4] == ['  SELECT b', '  endpoints: HotelViewSet.list (2)', '  sources: RoomSerializer.hotel_name (2)']
+        assert lines[5].startswith('300.0 ms total, 1 run,')
@@ -0,0 +1,47 @@
+import logging
+import re
+
+import pytest
+
+from apps.core.timing import TIMING_HEADER
+
+
+def timings(response):
+    return {
+        match['name']: (float(match['dur']), match['desc'])
+        for match in re.finditer(r'(?P<name>\w+);dur=(?P<dur>[\d.]+)(?:;desc="(?P<desc>[^"]*)")?', response[TIMING_HEADER])
+    }
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_sampled_request_reports_timings(self, settings, api_client, user_customer, hotel):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+        api_client.force_authenticate(user=user_customer)
+
+        response = api_client.get('/api/hotels/')
+
+        reported = timings(response)
+        assert set(reported) == {'db', 'view', 'serialize', 'total'}
+        assert reported['db'][1] == '1 query'
+        assert reported['total'][0] >= reported['view'][0]
+
+    def test_unsampled_request_is_untouched(self, settings, api_client, user_customer):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0.0
+        api_client.force_authenticate(user=user_customer)
+
+        response = api_client.get('/api/hotels/')
+
+        assert TIMING_HEADER not in response
+
+    def test_sampled_request_is_logged(self, settings, api_client, user_customer, caplog):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+        api_client.force_authenticate(user=user_customer)
+
+        with caplog.at_level(logging.INFO, logger='apps.core.timing'):
+            api_client.get('/api/hotels/')
+
+        record = caplog.records[-1]
+        assert (record.method, record.path, record.status, record.queries) == ('GET', '/api/hotels/', 200, 1)
+        assert 'total_ms=' in record.getMessage()
@@ -0,0 +1,115 @@
+#Python modules
+import logging
+import random
+import time
+from contextlib import ExitStack
+from typing import Any, Callable
+
+#Django modules
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+TIMING_HEADER: str = 'Server-Timing'
+
+
+class RequestTimer:
+    """
+    Timings of one request: SQL statements and time, view, response rendering and total, in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.started: float = time.perf_counter()
+        self.queries: int = 0
+        self.db: float = 0.0
+        self.view: float | None = None
+        self.render_started: float | None = None
+        self.serialize: float = 0.0
+        self.total: float = 0.0
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        # Database execute wrapper
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - started
+
+    def view_done(self) -> None:
+        if self.view is None:
+            self.view = time.perf_counter() - self.started
+
+    def rendered(self, response: HttpResponse) -> None:
+        if self.render_started is not None:
+            self.serialize = time.perf_counter() - self.render_started
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self.started
+        self.view_done()
+
+    def header(self) -> str:
+        return ', '.join([
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} quer{"y" if self.queries == 1 else "ies"}"',
+            f'view;dur={self.view * 1000:.1f}',
+            f'serialize;dur={self.serialize * 1000:.1f}',
+            f'total;dur={self.total * 1000:.1f}',
+        ])
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db * 1000, 1),
+            'view_ms': round(self.view * 1000, 1),
+            'serialize_ms': round(self.serialize * 1000, 1),
+            'total_ms': round(self.total * 1000, 1),
+        }
+
+
+class ServerTimingMiddleware:
+    """
+    Time a sample of requests and report it in a Server-Timing header and a log line.
+
+    SERVER_TIMING_SAMPLE_RATE is the share of requests timed (0 to 1); the
+    others pass through untouched. Queries on every database connection are
+    counted. View time runs until the view has returned its response (so it
+    includes authentication and the middleware below this one), serialize
+    time covers rendering a DRF or template response, and total covers both.
+    Put it first in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        rate: float = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0.0)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        timer = request._server_timer = RequestTimer()
+        with ExitStack() as stack:
+            # Wrappers are kept per connection object; no database connection is opened here
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        timer.finish()
+
+        response[TIMING_HEADER] = timer.header()
+        logger.info(
+            'request %s %s %s %s', request.method, request.path, response.status_code,
+            ' '.join(f'{key}={value}' for key, value in timer.fields().items()),
+            extra={'method': request.method, 'path': request.path, 'status': response.status_code, **timer.fields()},
+        )
+        return response
+
+    def process_template_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        timer: RequestTimer | None = getattr(request, '_server_timer', None)
+        if timer is not None:
+            # Called once the view returned and right before the response is rendered
+            timer.view_done()
+            timer.render_started = time.perf_counter()
+            response.add_post_render_callback(timer.rendered)
+        return response
+
@@ -6,4 +6,5 @@ urlpatterns = [
     path('register/', views.register_view, name='register_page'),
     path('login/', views.login_view, name='login_page'),
     path('profile/', views.profile_view, name='profile_page'),
+    path('api/metrics/', views.MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
@@ -1,7 +1,15 @@
+from drf_spectacular.utils import extend_schema
+from rest_framework.request import Request as DRFRequest
+from rest_framework.views import APIView
+
+from django.http import HttpResponse
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 
+from apps.core.metrics import CONTENT_TYPE, registry
+from apps.core.permissions import CanScrapeMetrics
+
 
 def home_view(request):
     """Home page view."""
@@ -20,4 +28,15 @@ def login_view(request):
 
 def profile_view(request):
     """Profile page view - handle auth in frontend."""
-    return render(request, 'auth/profile.html')
\ No newline at end of file
+    return render(request, 'auth/profile.html')
+
+
+class MetricsView(APIView):
+    """
+    GET /api/metrics/ - Request counts and latency histograms in the Prometheus text format.
+    """
+    permission_classes = [CanScrapeMetrics]
+
+    @extend_schema(exclude=True)
+    def get(self, request: DRFRequest) -> HttpResponse:
+        return HttpResponse(registry.exposition(), content_type=CONTENT_TYPE)
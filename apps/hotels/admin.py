@@ -7,7 +7,7 @@ from django.db import models
 from unfold.contrib.forms.widgets import WysiwygWidget
 
 #Project modules
-from apps.hotels.models import Hotel,Room,RoomType
+from apps.hotels.models import Hotel,Room,RoomRateOverride,RoomType
 
 @register(Room)
 class RoomAdmin(ModelAdmin):
@@ -17,11 +17,16 @@ class RoomAdmin(ModelAdmin):
     list_display = (
         'id',
         'number',
+        'hotel',
         'price_per_night',
         'is_available',
     )
     
     list_per_page = 50
+
+    list_select_related = (
+        'hotel',
+    )
     
     formfield_overrides = {
         models.TextField: {
@@ -35,6 +40,39 @@ class RoomAdmin(ModelAdmin):
     )
     
 
+
+@register(RoomRateOverride)
+class RoomRateOverrideAdmin(ModelAdmin):
+    """
+    RoomRateOverride admin configuration class.
+    """
+    list_display = (
+        'id',
+        'room',
+        'date',
+        'price',
+    )
+
+    list_per_page = 50
+
+    list_select_related = (
+        'room__hotel',
+    )
+
+    search_fields = (
+        "room__number",
+    )
+
+    ordering = (
+        "-date",
+    )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # Room choices are labelled with their hotel's name
+        if db_field.name == "room":
+            kwargs["queryset"] = Room.objects.select_related("hotel")
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
     
 @register(RoomType)
 class RoomTypeAdmin(ModelAdmin):
@@ -72,6 +110,10 @@ class HotelAdmin(ModelAdmin):
     )
     
     list_per_page = 20
+
+    list_select_related = (
+        'owner',
+    )
     
     search_fields = (
         "address",
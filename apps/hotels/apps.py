@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HotelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.hotels'
+
+    def ready(self):
+        from apps.hotels import signals  # noqa: F401
@@ -0,0 +1,24 @@
+#Django modules
+from django.db.models import QuerySet
+
+#Project modules
+from apps.core.queryplans import hot_query
+from apps.hotels.queries import bookable_rooms, hotel_rooms, owned_hotels
+from apps.hotels.serializers import HotelValuesSerializer, RoomValuesSerializer
+
+SAMPLE_ID: int = 1
+
+
+@hot_query('hotels.rooms')
+def rooms() -> QuerySet:
+    return RoomValuesSerializer.values(hotel_rooms(SAMPLE_ID))
+
+
+@hot_query('hotels.available_rooms')
+def available_rooms() -> QuerySet:
+    return RoomValuesSerializer.values(bookable_rooms(SAMPLE_ID))
+
+
+@hot_query('hotels.my_hotels')
+def my_hotels() -> QuerySet:
+    return HotelValuesSerializer.values(owned_hotels(SAMPLE_ID))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0004_alter_hotel_rating_alter_room_price_per_night_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['hotel', 'is_available'], name='room_hotel_available_idx'),
+        ),
+    ]
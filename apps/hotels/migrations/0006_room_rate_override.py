@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:08
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomRateOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('price', models.FloatField(validators=[django.core.validators.MinValueValidator(0)])),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rate_overrides', to='hotels.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('room', 'date'), name='unique_room_rate_date')],
+            },
+        ),
+    ]
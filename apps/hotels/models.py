@@ -7,6 +7,9 @@ from django.db.models import (
     BooleanField,
     ForeignKey,
     FloatField,
+    DateField,
+    Index,
+    UniqueConstraint,
     CASCADE,
 )
 from django.core.validators import MinValueValidator,MaxValueValidator
@@ -29,6 +32,14 @@ class Hotel(Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the owner so ownership signals only fire when it changes
+        if 'owner_id' in field_names:
+            instance._loaded_owner_id = instance.owner_id
+        return instance
+
 
 class RoomType(Model):
     """
@@ -55,6 +66,53 @@ class Room(Model):
     
     class Meta:
         unique_together = ('hotel','number')
+        indexes = [
+            # Hotel room lists and availability searches
+            Index(fields=['hotel', 'is_available'], name='room_hotel_available_idx'),
+        ]
         
     def __str__(self):
-        return f"Номер {self.number} - {self.hotel.name}"
\ No newline at end of file
+        return f"Номер {self.number} - {self.hotel.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the hotel, so moving the room also invalidates the one it left
+        if 'hotel_id' in field_names:
+            instance._loaded_hotel_id = instance.hotel_id
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None:
+            self.__dict__.pop('_loaded_hotel_id', None)
+
+
+class RoomRateOverride(Model):
+    """
+    Nightly price of a room on one date, replacing price_per_night.
+    """
+    room = ForeignKey(to=Room, on_delete=CASCADE, related_name='rate_overrides')
+    date = DateField()
+    price = FloatField(validators=[MinValueValidator(0)])
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['room', 'date'], name='unique_room_rate_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} {self.date}: {self.price}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the night the row priced, so moving it also invalidates that night
+        if 'room_id' in field_names and 'date' in field_names:
+            instance._loaded_night = (instance.room_id, instance.date)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None:
+            self.__dict__.pop('_loaded_night', None)
@@ -24,4 +24,21 @@ class IsAdminOrManagerOrReadOnly(BasePermission):
         if request.user.role =="admin":
             return True
         
-        return obj.owner == request.user
\ No newline at end of file
+        # Compare ids: loading obj.owner would cost a query
+        return obj.owner_id == request.user.pk
+
+
+def is_hotel_admin(user) -> bool:
+    """
+    Whether the user may manage every hotel.
+    """
+    return user.is_staff or user.role == 'admin'
+
+
+def owns_hotel(user, hotel_id: int) -> bool | None:
+    """
+    Whether the user owns a hotel according to the hotels claim of their
+    token, without a query; None when the user did not come with one.
+    """
+    owned: frozenset[int] | None = getattr(user, 'owned_hotel_ids', None)
+    return None if owned is None else hotel_id in owned
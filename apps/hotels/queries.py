@@ -0,0 +1,31 @@
+#Django modules
+from django.db.models import QuerySet
+
+#Project modules
+from apps.hotels.models import Hotel, Room
+
+
+def hotel_rooms(hotel_id: int) -> QuerySet[Room]:
+    """
+    All rooms of a hotel, by id.
+    """
+    return Room.objects.filter(hotel_id=hotel_id).order_by('id')
+
+
+def bookable_rooms(hotel_id: int | str | None = None, capacity: int | str | None = None) -> QuerySet[Room]:
+    """
+    Rooms open for booking, optionally in one hotel and for at least `capacity` guests.
+    """
+    rooms: QuerySet[Room] = Room.objects.filter(is_available=True)
+    if hotel_id:
+        rooms = rooms.filter(hotel_id=hotel_id)
+    if capacity:
+        rooms = rooms.filter(room_type__capacity__gte=capacity)
+    return rooms
+
+
+def owned_hotels(user_id: int) -> QuerySet[Hotel]:
+    """
+    Hotels owned by a user, by id.
+    """
+    return Hotel.objects.filter(owner_id=user_id).order_by('id')
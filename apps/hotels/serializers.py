@@ -10,11 +10,13 @@ from rest_framework.serializers import (
 
 #Project modules
 from apps.hotels.models import Hotel, RoomType, Room
-from apps.users.serializers import UserSerializer
+from apps.users.serializers import UserSerializer, UserValuesSerializer
+from apps.core.fastserializers import Nested, ValuesSerializer
+from apps.core.fieldsets import SparseFieldsMixin
 
 #Python modules
 
-class HotelSerializer(ModelSerializer):
+class HotelSerializer(SparseFieldsMixin, ModelSerializer):
     """Serializer for Hotel model."""
     owner = SerializerMethodField()
     owner_info = UserSerializer(source='owner', read_only=True)
@@ -23,6 +25,7 @@ class HotelSerializer(ModelSerializer):
         model = Hotel
         fields = ['id', 'name', 'address', 'rating', 'description', 'owner', 'owner_info']
         read_only_fields = ['id']
+        field_sources = {'owner': ('owner.first_name', 'owner.last_name')}
         
     def get_owner(self,obj):
         if obj.owner:
@@ -30,7 +33,7 @@ class HotelSerializer(ModelSerializer):
         return None
 
 
-class RoomTypeSerializer(ModelSerializer):
+class RoomTypeSerializer(SparseFieldsMixin, ModelSerializer):
     """Serializer for RoomType model."""
     class Meta:
         model = RoomType
@@ -38,7 +41,7 @@ class RoomTypeSerializer(ModelSerializer):
         read_only_fields = ['id']
 
 
-class RoomSerializer(ModelSerializer):
+class RoomSerializer(SparseFieldsMixin, ModelSerializer):
     """Serializer for Room model."""
     hotel_name = CharField(source='hotel.name', read_only=True)
     room_type_name = CharField(source='room_type.name', read_only=True)
@@ -50,6 +53,10 @@ class RoomSerializer(ModelSerializer):
             'is_available', 'hotel', 'hotel_name', 'room_type', 'room_type_name'
         ]
         read_only_fields = ['id']
+        expandable_fields = {
+            'hotel': 'apps.hotels.serializers.HotelSerializer',
+            'room_type': 'apps.hotels.serializers.RoomTypeSerializer',
+        }
         
 class RoomCreateSerializer(ModelSerializer):
     
@@ -63,4 +70,29 @@ class RoomCreateSerializer(ModelSerializer):
             'is_available', 'room_type'
         ]
         read_only_fields = ['id']
-        
\ No newline at end of file
+        
+
+
+def _owner_name(owner_id, first_name, last_name):
+    if owner_id is None:
+        return None
+    return f"{first_name} {last_name}"
+
+
+class HotelValuesSerializer(ValuesSerializer):
+    """Fast list output of HotelSerializer."""
+    serializer_class = HotelSerializer
+    computed = {
+        'owner': (('owner_id', 'owner__first_name', 'owner__last_name'), _owner_name),
+        'owner_info': Nested(UserValuesSerializer, 'owner'),
+    }
+
+
+class RoomTypeValuesSerializer(ValuesSerializer):
+    """Fast list output of RoomTypeSerializer."""
+    serializer_class = RoomTypeSerializer
+
+
+class RoomValuesSerializer(ValuesSerializer):
+    """Fast list output of RoomSerializer."""
+    serializer_class = RoomSerializer
@@ -0,0 +1,32 @@
+#Python modules
+from functools import partial
+
+#Django modules
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+#Project modules
+from apps.authentication.usercache import bump_user_version
+from apps.hotels.models import Hotel
+
+
+def _owners_changed(*owner_ids: int | None) -> None:
+    # Tokens list the hotels their user owns; retire the ones issued before the change
+    for owner_id in set(owner_ids) - {None}:
+        transaction.on_commit(partial(bump_user_version, owner_id))
+
+
+@receiver(post_save, sender=Hotel)
+def hotel_saved(sender, instance: Hotel, created: bool = False, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+    loaded_owner_id = instance.__dict__.get('_loaded_owner_id')
+    if created or loaded_owner_id != instance.owner_id:
+        _owners_changed(loaded_owner_id, instance.owner_id)
+    instance._loaded_owner_id = instance.owner_id
+
+
+@receiver(post_delete, sender=Hotel)
+def hotel_deleted(sender, instance: Hotel, **kwargs) -> None:
+    _owners_changed(instance.owner_id)
@@ -0,0 +1,50 @@
+import pytest
+from types import SimpleNamespace
+
+from rest_framework.test import APIClient
+
+from apps.authentication.usercache import users
+from apps.authentication.views import CustomTokenObtainPairSerializer
+from apps.core.permissions import IsOwnerOrReadOnly
+from apps.hotels.models import Hotel
+from apps.hotels.permissions import IsAdminOrManagerOrReadOnly
+
+
+def token_client(user):
+    client = APIClient()
+    token = CustomTokenObtainPairSerializer.get_token(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def owned_hotel(hotel, user_manager):
+    hotel.owner = user_manager
+    hotel.save()
+    return hotel
+
+
+@pytest.mark.django_db
+class TestOwnershipFromIds:
+
+    def test_object_checks_do_not_load_the_owner(self, owned_hotel, user_manager, user_customer, django_assert_num_queries):
+        hotel = Hotel.objects.get(pk=owned_hotel.pk)
+        write = SimpleNamespace(method='PUT', user=user_manager)
+        other = SimpleNamespace(method='PUT', user=user_customer)
+
+        with django_assert_num_queries(0):
+            assert IsAdminOrManagerOrReadOnly().has_object_permission(write, None, hotel)
+            assert not IsAdminOrManagerOrReadOnly().has_object_permission(other, None, hotel)
+            assert IsOwnerOrReadOnly().has_object_permission(write, None, hotel)
+
+    def test_stats_decided_from_trusted_token(self, settings, owned_hotel, user_manager, user_customer, django_assert_max_num_queries):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        users.clear()
+        url = f'/api/hotels/{owned_hotel.pk}/stats/'
+
+        customer, owner = token_client(user_customer), token_client(user_manager)
+
+        with django_assert_max_num_queries(0):
+            assert customer.get(url).status_code == 403
+        with django_assert_max_num_queries(2):
+            assert owner.get(url).status_code == 200
@@ -1,10 +1,13 @@
 #Python modules
+from datetime import date, timedelta
 from typing import Any
 from drf_spectacular.utils import extend_schema
 
 #Django modules
 from django.shortcuts import get_object_or_404
 from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 #DRF modules
 from rest_framework.permissions import BasePermission
@@ -16,6 +19,7 @@ from rest_framework.status import (
     HTTP_201_CREATED,
     HTTP_204_NO_CONTENT,
     HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
 )
 from rest_framework.decorators import action
@@ -24,39 +28,57 @@ from rest_framework.decorators import action
 from apps.hotels.models import Hotel, RoomType, Room
 from apps.hotels.serializers import (
     HotelSerializer,
+    HotelValuesSerializer,
     RoomTypeSerializer,
     RoomSerializer,
+    RoomValuesSerializer,
     RoomCreateSerializer,
 )
-from apps.hotels.permissions import IsAdminOrManagerOrReadOnly
+from apps.hotels.queries import hotel_rooms, owned_hotels
+from apps.hotels.permissions import IsAdminOrManagerOrReadOnly, is_hotel_admin, owns_hotel
+from apps.core.fieldsets import FieldSet, prune_queryset
+from apps.core.pagination import KeysetPagination, paginated
+from apps.core.querybudget import query_budget
+from apps.booking.stats import StatsTotals, hotel_stats
+
+# Longest period /stats/ reports in one response
+MAX_STATS_DAYS: int = 366
 
 
 class HotelViewSet(ViewSet):
     """
     Hotel management ViewSet with custom actions.
     """
-    lookup_value_regex: str = r'\d+'
+    # [0-9], not \d, which also matches non-ASCII digits int() would accept
+    lookup_value_regex: str = r'[0-9]+'
     permission_classes: list[BasePermission] = [IsAdminOrManagerOrReadOnly]
 
-    @extend_schema(responses=HotelSerializer(many=True))
+    @extend_schema(responses=paginated(HotelSerializer))
+    @query_budget(2)
     def list(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Get list of all hotels.
         """
-        hotels: QuerySet[Hotel] = Hotel.objects.select_related('owner').all()
-        serializer: HotelSerializer = HotelSerializer(hotels, many=True)
-        return DRFResponse(serializer.data, status=HTTP_200_OK)
+        fieldset: FieldSet = FieldSet.from_request(request, HotelSerializer)
+        hotels: QuerySet[Hotel] = Hotel.objects.all()
+        paginator: KeysetPagination = KeysetPagination()
+        rows: QuerySet = HotelValuesSerializer.values(hotels, 'id', fieldset=fieldset)
+        page: list[dict[str, Any]] = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(HotelValuesSerializer.serialize(page, fieldset))
 
     @extend_schema(responses=HotelSerializer)
+    @query_budget(2)
     def retrieve(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Get specific hotel by ID.
         """
-        hotel: Hotel = get_object_or_404(Hotel.objects.select_related('owner'), pk=pk)
-        serializer: HotelSerializer = HotelSerializer(hotel)
+        fieldset: FieldSet = FieldSet.from_request(request, HotelSerializer)
+        hotel: Hotel = get_object_or_404(prune_queryset(Hotel.objects.all(), HotelSerializer(fieldset=fieldset)), pk=pk)
+        serializer: HotelSerializer = HotelSerializer(hotel, fieldset=fieldset)
         return DRFResponse(serializer.data, status=HTTP_200_OK)
 
     @extend_schema(request=HotelSerializer, responses=HotelSerializer)
+    @query_budget(2)
     def create(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Create new hotel.
@@ -68,6 +90,7 @@ class HotelViewSet(ViewSet):
         return DRFResponse(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
     @extend_schema(request=HotelSerializer, responses=HotelSerializer)
+    @query_budget(3)
     def update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Update hotel (full update).
@@ -81,6 +104,7 @@ class HotelViewSet(ViewSet):
         return DRFResponse(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
     @extend_schema(request=HotelSerializer, responses=HotelSerializer)
+    @query_budget(3)
     def partial_update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Update hotel (partial update).
@@ -104,17 +128,20 @@ class HotelViewSet(ViewSet):
         return DRFResponse(status=HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=["get"])
+    @query_budget(2)
     def rooms(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Get all rooms for specific hotel.
         """
         hotel: Hotel = get_object_or_404(Hotel, pk=pk)
-        rooms: QuerySet[Room] = Room.objects.filter(hotel=hotel)
-        serializer: RoomSerializer = RoomSerializer(rooms, many=True)
-        return DRFResponse(serializer.data, status=HTTP_200_OK)
+        fieldset: FieldSet = FieldSet.from_request(request, RoomSerializer)
+        rooms: QuerySet[Room] = hotel_rooms(hotel.pk)
+        rows: QuerySet = RoomValuesSerializer.values(rooms, fieldset=fieldset)
+        return DRFResponse(RoomValuesSerializer.serialize(rows, fieldset), status=HTTP_200_OK)
 
     @extend_schema(request=RoomCreateSerializer, responses=RoomSerializer, description="Создает новую комнату и привязывает её к текущему отелю")
     @action(detail=True, methods=["post"], url_path='add-room')
+    @query_budget(4)
     def add_room(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Add new room to hotel.
@@ -127,15 +154,67 @@ class HotelViewSet(ViewSet):
             return DRFResponse(serializer.data, status=HTTP_201_CREATED)
         return DRFResponse(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=["get"])
+    @query_budget(3)
+    def stats(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
+        """
+        Get daily rooms sold, revenue, ADR and RevPAR of a hotel (owner or admin only).
+
+        Query params `from` and `to` are inclusive dates; the last 30 days by default.
+        """
+        hotel_id: int = int(pk)
+        admin: bool = is_hotel_admin(request.user)
+        # A token listing the user's hotels settles ownership without loading the hotel
+        allowed: bool | None = None if admin else owns_hotel(request.user, hotel_id)
+        if allowed is None:
+            hotel: Hotel = get_object_or_404(Hotel.objects.only('id', 'owner_id'), pk=hotel_id)
+            allowed = admin or hotel.owner_id == request.user.pk
+        if not allowed:
+            return DRFResponse({"detail": "No permission"}, status=HTTP_403_FORBIDDEN)
+
+        to_param: str | None = request.query_params.get('to')
+        from_param: str | None = request.query_params.get('from')
+        try:
+            last: date | None = parse_date(to_param) if to_param else timezone.localdate()
+            first: date | None = parse_date(from_param) if from_param else last and last - timedelta(days=29)
+        except ValueError:
+            first = last = None
+        if first is None or last is None:
+            return DRFResponse({"error": "Dates must be YYYY-MM-DD"}, status=HTTP_400_BAD_REQUEST)
+        if first > last or (last - first).days >= MAX_STATS_DAYS:
+            return DRFResponse(
+                {"error": f"'from' must not be after 'to' and the range is at most {MAX_STATS_DAYS} days"},
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        days: list[dict[str, Any]]
+        totals: StatsTotals
+        days, totals = hotel_stats(hotel_id, first, last)
+        return DRFResponse({
+            'hotel_id': hotel_id,
+            'from': first,
+            'to': last,
+            'days': days,
+            'totals': {
+                'rooms_sold': totals.rooms_sold,
+                'revenue': totals.revenue,
+                'adr': round(totals.adr, 2),
+                'revpar': round(totals.revpar, 2),
+                'occupancy': round(totals.occupancy, 4),
+            },
+        }, status=HTTP_200_OK)
+
     @extend_schema(responses=HotelSerializer)
     @action(detail=False, methods=["get"], url_path="my-hotels")
+    @query_budget(2)
     def my_hotels(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Get hotels owned by current user.
         """
-        queryset: QuerySet[Hotel] = Hotel.objects.filter(owner=request.user).all()
-        serializer: HotelSerializer = HotelSerializer(queryset, many=True)
-        return DRFResponse(serializer.data, status=HTTP_200_OK)
+        fieldset: FieldSet = FieldSet.from_request(request, HotelSerializer)
+        queryset: QuerySet[Hotel] = owned_hotels(request.user.pk)
+        rows: QuerySet = HotelValuesSerializer.values(queryset, fieldset=fieldset)
+        return DRFResponse(HotelValuesSerializer.serialize(rows, fieldset), status=HTTP_200_OK)
 
 
 class RoomTypeViewSet(ViewSet):
@@ -145,6 +224,7 @@ class RoomTypeViewSet(ViewSet):
     lookup_field = "pk"
 
     @extend_schema(responses=RoomTypeSerializer(many=True))
+    @query_budget(1)
     def list(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Get list of all room types.
@@ -154,6 +234,7 @@ class RoomTypeViewSet(ViewSet):
         return DRFResponse(serializer.data, status=HTTP_200_OK)
 
     @extend_schema(request=RoomTypeSerializer, responses=RoomTypeSerializer)
+    @query_budget(1)
     def create(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Create new room type.
@@ -165,6 +246,7 @@ class RoomTypeViewSet(ViewSet):
         return DRFResponse(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
     @extend_schema(request=RoomTypeSerializer, responses=RoomTypeSerializer)
+    @query_budget(2)
     def partial_update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         Update room type (partial update).
@@ -24,8 +24,11 @@ class PaymentAdmin(admin.ModelAdmin):
         "status", 
         "payment_method"
     )
+    list_select_related: tuple[str, ...] = (
+        "user",
+    )
     search_fields: tuple[str, ...] = (
-        "user__username",
+        "user__phone",
     )
     ordering: tuple[str, ...] = (
         "-created_at",
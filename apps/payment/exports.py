@@ -0,0 +1,40 @@
+#Python modules
+from datetime import date
+from typing import Any, Iterator
+
+#Django modules
+from django.db.models import Exists, OuterRef
+
+#Project modules
+from apps.payment.models import Payment
+from apps.booking.models import Booking
+
+PAYMENT_EXPORT_FIELDS: list[str] = ['id', 'user_id', 'amount', 'payment_method', 'status', 'created_at']
+
+
+def payment_export_rows(
+    status: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    hotel_id: int | None = None,
+    chunk_size: int = 2000,
+) -> Iterator[dict[str, Any]]:
+    """
+    Iterate payments as flat dicts, reading the table in chunks.
+
+    The date range applies to the creation date (inclusive); the hotel filter
+    keeps payments linked to at least one booking in that hotel.
+    """
+    payments = Payment.objects.order_by('id')
+    if status:
+        payments = payments.filter(status=status)
+    if date_from:
+        payments = payments.filter(created_at__date__gte=date_from)
+    if date_to:
+        payments = payments.filter(created_at__date__lte=date_to)
+    if hotel_id:
+        payments = payments.filter(
+            Exists(Booking.objects.filter(payment_id=OuterRef('pk'), room__hotel_id=hotel_id))
+        )
+
+    return payments.values(*PAYMENT_EXPORT_FIELDS).iterator(chunk_size=chunk_size)
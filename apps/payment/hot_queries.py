@@ -0,0 +1,21 @@
+#Django modules
+from django.db.models import QuerySet
+
+#Project modules
+from apps.core.pagination import CreatedAtPagination
+from apps.core.queryplans import hot_query
+from apps.payment.models import Payment
+from apps.payment.queries import own_payments
+from apps.payment.serializers import PaymentValuesSerializer
+
+SAMPLE_ID: int = 1
+
+
+@hot_query('payment.my_payments')
+def my_payments() -> QuerySet:
+    return CreatedAtPagination.first_page(PaymentValuesSerializer.values(own_payments(SAMPLE_ID), 'created_at'))
+
+
+@hot_query('payment.list_page')
+def list_page() -> QuerySet:
+    return CreatedAtPagination.first_page(PaymentValuesSerializer.values(Payment.objects.all(), 'created_at'))
@@ -0,0 +1,9 @@
+#Project modules
+from apps.payment.exports import PAYMENT_EXPORT_FIELDS, payment_export_rows
+from apps.core.export import BaseExportCommand
+
+
+class Command(BaseExportCommand):
+    help = "Stream payments as NDJSON or CSV."
+    fields = PAYMENT_EXPORT_FIELDS
+    rows = payment_export_rows
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['user', 'created_at'], name='payment_user_created_idx'),
+        ),
+    ]
@@ -9,6 +9,7 @@ from django.db.models import (
         DecimalField,
         CharField,
         DateTimeField,
+        Index,
         CASCADE,
     )
 
@@ -38,7 +39,16 @@ class Payment(Model):
     status = CharField(max_length=20, choices=STATUSES)
     created_at = DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # A user's payments, newest first
+            Index(fields=['user', 'created_at'], name='payment_user_created_idx'),
+            # Staff listing, newest first
+            Index(fields=['created_at'], name='payment_created_idx'),
+        ]
+
     def __str__(self) -> str:
         """Return a readable string representation of the payment."""
-        return f"{self.user.username} - {self.amount} ({self.status})"
+        # The user has no username, and reading it would load the user for every payment listed
+        return f"{self.user_id} - {self.amount} ({self.status})"
     
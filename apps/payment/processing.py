@@ -0,0 +1,102 @@
+#Python modules
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+#Django modules
+from django.db import transaction
+from django.db.models import Case, QuerySet, Value, When
+
+#Project modules
+from apps.payment.models import Payment
+from apps.booking.models import Booking
+from apps.booking.queries import paid_bookings
+from apps.booking.events import BOOKING_CONFIRMED, booking_event
+from apps.booking.stats import record_sales, sold_bookings
+from apps.core.outbox import outbox_event, publish_many
+from apps.users.models import User
+
+COMPLETED: str = 'completed'
+
+AGGREGATE: str = 'payment'
+PAYMENT_COMPLETED: str = 'payment.completed'
+
+
+@dataclass
+class ProcessResult:
+    """
+    Payments marked completed by one call and how many bookings that confirmed.
+    """
+    processed: list[int]
+    bookings_confirmed: int
+
+
+def _confirm(bookings: QuerySet[Booking], **changes: Any) -> int:
+    """
+    Confirm the pending bookings among `bookings` with a single UPDATE and count them as sold.
+
+    Only pending bookings move: confirmed ones stay as they are and cancelled
+    or completed ones are never brought back. Both pending and confirmed hold
+    the same room nights, so the inventory kept by the Booking save signals
+    is unaffected by skipping them; the daily stats they would have updated
+    are updated here, and a booking.confirmed outbox event is written for each.
+    """
+    with transaction.atomic(savepoint=False):
+        pending = bookings.filter(status=Booking.PENDING).select_for_update()
+        sales, hotels = sold_bookings(pending)
+        if not sales and not changes:
+            return 0
+        if changes:
+            bookings.update(**changes, status=Case(
+                When(status=Booking.PENDING, then=Value(Booking.CONFIRMED)), default='status'
+            ))
+        else:
+            pending.update(status=Booking.CONFIRMED)
+        record_sales([(sale, 1) for sale in sales.values()], hotels)
+        publish_many(
+            booking_event(BOOKING_CONFIRMED, booking_id, *sale) for booking_id, sale in sales.items()
+        )
+    return len(sales)
+
+
+def confirm_bookings(payment_ids: Iterable[int]) -> int:
+    """
+    Confirm the pending bookings paid by the given payments.
+    """
+    return _confirm(paid_bookings(payment_ids))
+
+
+def link_booking(payment: Payment, booking_id: int, user: User) -> None:
+    """
+    Attach one of the user's bookings to a payment, confirming it if the payment is completed.
+    """
+    bookings = Booking.objects.filter(id=booking_id, user=user)
+    if payment.status == COMPLETED:
+        _confirm(bookings, payment=payment)
+    else:
+        bookings.update(payment=payment)
+
+
+def complete_payments(payments: QuerySet[Payment], payment_ids: Iterable[int]) -> ProcessResult:
+    """
+    Mark the given payments completed and confirm their bookings, all or nothing.
+
+    `payments` scopes which rows may be touched (e.g. the caller's own); ids
+    outside it are left out of the result. Payments that change write a
+    payment.completed outbox event. Runs a fixed number of queries however
+    many payments and bookings are involved.
+    """
+    with transaction.atomic():
+        found: dict[int, str] = dict(
+            payments.select_for_update().filter(id__in=set(payment_ids)).values_list('id', 'status')
+        )
+        if not found:
+            return ProcessResult([], 0)
+        completed = sorted(payment_id for payment_id, status in found.items() if status != COMPLETED)
+        if completed:
+            Payment.objects.filter(id__in=completed).update(status=COMPLETED)
+            publish_many(
+                outbox_event(PAYMENT_COMPLETED, AGGREGATE, payment_id, {'payment_id': payment_id})
+                for payment_id in completed
+            )
+        processed = sorted(found)
+        return ProcessResult(processed, confirm_bookings(processed))
@@ -0,0 +1,20 @@
+#Django modules
+from django.db.models import QuerySet
+
+#Project modules
+from apps.payment.models import Payment
+from apps.users.models import User
+
+
+def own_payments(user_id: int) -> QuerySet[Payment]:
+    """
+    A user's payments.
+    """
+    return Payment.objects.filter(user_id=user_id)
+
+
+def visible_payments(user: User) -> QuerySet[Payment]:
+    """
+    Payments a user may list or process: all of them for staff, their own otherwise.
+    """
+    return Payment.objects.all() if user.is_staff else own_payments(user.pk)
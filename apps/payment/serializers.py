@@ -1,11 +1,16 @@
 #DRF modules
 from rest_framework import serializers
 
+#Django modules
+from django.db import transaction
+
 #Project modules
 from apps.payment.models import Payment
-from apps.booking.models import Booking
+from apps.payment.processing import link_booking
+from apps.core.fastserializers import ValuesSerializer
+from apps.core.fieldsets import SparseFieldsMixin
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Payment serializer with booking association logic.
     """
@@ -15,6 +20,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = ['id', 'user', 'amount', 'payment_method', 'status', 'created_at', 'booking_id']
         read_only_fields = ['id', 'user', 'created_at']
+        expandable_fields = {'user': 'apps.users.serializers.UserSerializer'}
     
     def validate_amount(self, value):
         """
@@ -30,18 +36,27 @@ class PaymentSerializer(serializers.ModelSerializer):
         """
         booking_id = validated_data.pop('booking_id', None)
         
-        payment = Payment.objects.create(**validated_data)
-        
-        if booking_id:
-            try:
-                booking = Booking.objects.get(id=booking_id, user=validated_data['user'])
-                booking.payment = payment
-                booking.save()
-                
-                if payment.status == 'completed':
-                    booking.status = 'confirmed'
-                    booking.save()
-            except Booking.DoesNotExist:
-                pass 
+        with transaction.atomic():
+            payment = Payment.objects.create(**validated_data)
+            if booking_id:
+                link_booking(payment, booking_id, validated_data['user'])
         
-        return payment
\ No newline at end of file
+        return payment
+
+
+class ProcessPaymentsSerializer(serializers.Serializer):
+    """
+    Ids of payments to mark completed in one batch.
+    """
+    MAX_PAYMENTS = 500
+
+    payment_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), min_length=1, max_length=MAX_PAYMENTS
+    )
+
+
+class PaymentValuesSerializer(ValuesSerializer):
+    """
+    Fast list output of PaymentSerializer.
+    """
+    serializer_class = PaymentSerializer
@@ -0,0 +1,125 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.booking.models import Booking, RoomNight
+from apps.payment.models import Payment
+from apps.payment.processing import complete_payments
+
+
+def make_payment(user, status='pending'):
+    return Payment.objects.create(user=user, amount=Decimal('100'), payment_method='cash', status=status)
+
+
+def make_booking(user, room, offset, payment=None, status='pending'):
+    check_in = date(2030, 1, 1) + timedelta(days=offset * 3)
+    return Booking.objects.create(
+        user=user, room=room, check_in=check_in, check_out=check_in + timedelta(days=2),
+        status=status, payment=payment,
+    )
+
+
+@pytest.mark.django_db
+class TestCompletePayments:
+
+    def test_confirms_only_pending_bookings(self, user_customer, room):
+        payment = make_payment(user_customer)
+        pending = make_booking(user_customer, room, 0, payment)
+        cancelled = make_booking(user_customer, room, 1, payment, status='cancelled')
+
+        result = complete_payments(Payment.objects.all(), [payment.pk])
+
+        assert result.processed == [payment.pk]
+        assert result.bookings_confirmed == 1
+        payment.refresh_from_db()
+        pending.refresh_from_db()
+        cancelled.refresh_from_db()
+        assert payment.status == 'completed'
+        assert pending.status == 'confirmed'
+        assert cancelled.status == 'cancelled'
+        assert RoomNight.objects.filter(booking=cancelled).count() == 0
+        assert RoomNight.objects.filter(booking=pending).count() == 2
+
+    def test_query_count_does_not_grow_with_batch(self, user_customer, room):
+        def run(count, offset):
+            payments = [make_payment(user_customer) for _ in range(count)]
+            for index, payment in enumerate(payments):
+                make_booking(user_customer, room, offset + index, payment)
+            with CaptureQueriesContext(connection) as queries:
+                complete_payments(Payment.objects.all(), [payment.pk for payment in payments])
+            return len(queries)
+
+        assert run(1, 0) == run(10, 10)
+
+    def test_scope_excludes_other_payments(self, user_customer, user_manager):
+        own, other = make_payment(user_customer), make_payment(user_manager)
+
+        result = complete_payments(Payment.objects.filter(user=user_customer), [own.pk, other.pk])
+
+        assert result.processed == [own.pk]
+        other.refresh_from_db()
+        assert other.status == 'pending'
+
+
+@pytest.mark.django_db
+class TestPaymentEndpoints:
+
+    def test_create_links_and_confirms_booking(self, customer_client, user_customer, room):
+        booking = make_booking(user_customer, room, 0)
+
+        response = customer_client.post('/api/payments/', {
+            'amount': '100.00', 'payment_method': 'cash', 'status': 'completed', 'booking_id': booking.pk,
+        }, format='json')
+
+        assert response.status_code == 201
+        booking.refresh_from_db()
+        assert booking.payment_id == response.data['id']
+        assert booking.status == 'confirmed'
+
+    def test_create_ignores_foreign_booking(self, customer_client, user_manager, room):
+        booking = make_booking(user_manager, room, 0)
+
+        response = customer_client.post('/api/payments/', {
+            'amount': '100.00', 'payment_method': 'cash', 'status': 'completed', 'booking_id': booking.pk,
+        }, format='json')
+
+        assert response.status_code == 201
+        booking.refresh_from_db()
+        assert booking.payment_id is None
+
+    def test_process_single(self, customer_client, user_customer, room):
+        payment = make_payment(user_customer)
+        booking = make_booking(user_customer, room, 0, payment)
+
+        response = customer_client.post(f'/api/payments/{payment.pk}/process/')
+
+        assert response.status_code == 200
+        assert response.data['status'] == 'completed'
+        booking.refresh_from_db()
+        assert booking.status == 'confirmed'
+
+    def test_process_batch(self, customer_client, user_customer, user_manager, room):
+        own = [make_payment(user_customer) for _ in range(3)]
+        other = make_payment(user_manager)
+        for index, payment in enumerate(own):
+            make_booking(user_customer, room, index, payment)
+
+        response = customer_client.post('/api/payments/process/', {
+            'payment_ids': [payment.pk for payment in own] + [other.pk, 999999],
+        }, format='json')
+
+        assert response.status_code == 200
+        assert response.data == {
+            'processed': [payment.pk for payment in own],
+            'not_found': sorted([other.pk, 999999]),
+            'bookings_confirmed': 3,
+        }
+        assert Booking.objects.filter(status='confirmed').count() == 3
+
+    def test_process_batch_validates(self, customer_client):
+        assert customer_client.post('/api/payments/process/', {'payment_ids': []}, format='json').status_code == 400
+        too_many = list(range(1, 502))
+        assert customer_client.post('/api/payments/process/', {'payment_ids': too_many}, format='json').status_code == 400
@@ -16,5 +16,7 @@ urlpatterns = [
     path('payments/', payment_list, name='payment-list'),
     path('payments/<int:pk>/', payment_detail, name='payment-detail'),
     path('payments/<int:pk>/process/', PaymentViewSet.as_view({'post': 'process_payment'}), name='payment-process'),
+    path('payments/process/', PaymentViewSet.as_view({'post': 'process_payments'}), name='payment-process-batch'),
+    path('payments/export/', PaymentViewSet.as_view({'get': 'export'}), name='payment-export'),
     path('payments/my-payments/', PaymentViewSet.as_view({'get': 'my_payments'}), name='my-payments'),
 ]
\ No newline at end of file
@@ -12,12 +12,21 @@ from drf_spectacular.utils import extend_schema
 
 # Django modules
 from django.shortcuts import get_object_or_404
-from django.db.models import QuerySet, Sum
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 
 # Project modules
 from .models import Payment
-from .serializers import PaymentSerializer
-from apps.booking.models import Booking
+from .serializers import PaymentSerializer, PaymentValuesSerializer, ProcessPaymentsSerializer
+from .queries import own_payments, visible_payments
+from .processing import COMPLETED, ProcessResult, complete_payments, confirm_bookings
+from .exports import PAYMENT_EXPORT_FIELDS, payment_export_rows
+from apps.core.fieldsets import FieldSet, prune_queryset
+from apps.core.pagination import CreatedAtPagination, paginated
+from apps.core.idempotency import idempotent
+from apps.core.querybudget import query_budget
+from apps.core.export import export_response
 
 
 class PaymentViewSet(ViewSet):
@@ -26,32 +35,38 @@ class PaymentViewSet(ViewSet):
     """
     permission_classes: list[IsAuthenticated] = [IsAuthenticated]
 
-    @extend_schema(responses=PaymentSerializer(many=True))
+    @extend_schema(responses=paginated(PaymentSerializer))
+    @query_budget(2)
     def list(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/payments/ - List all payments (admin) or user's payments
         """
-        if request.user.is_staff:
-            payments: QuerySet[Payment] = Payment.objects.select_related('user').all()
-        else:
-            payments: QuerySet[Payment] = Payment.objects.select_related('user').filter(user=request.user)
-
-        serializer: PaymentSerializer = PaymentSerializer(payments, many=True)
-        return DRFResponse(serializer.data, status=status.HTTP_200_OK)
+        payments: QuerySet[Payment] = visible_payments(request.user)
+        fieldset: FieldSet = FieldSet.from_request(request, PaymentSerializer)
+        paginator: CreatedAtPagination = CreatedAtPagination()
+        rows: QuerySet = PaymentValuesSerializer.values(payments, 'created_at', fieldset=fieldset)
+        page: list[dict[str, Any]] = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(PaymentValuesSerializer.serialize(page, fieldset))
 
     @extend_schema(responses=PaymentSerializer)
+    @query_budget(2)
     def retrieve(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/payments/{id}/ - Retrieve a specific payment
         """
-        payment: Payment = get_object_or_404(Payment.objects.select_related('user'), pk=pk)
-        if not request.user.is_staff and payment.user != request.user:
+        fieldset: FieldSet = FieldSet.from_request(request, PaymentSerializer)
+        payment: Payment = get_object_or_404(
+            prune_queryset(Payment.objects.all(), PaymentSerializer(fieldset=fieldset), 'user'), pk=pk
+        )
+        if not request.user.is_staff and payment.user_id != request.user.pk:
             return DRFResponse({"detail": "No permission"}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer: PaymentSerializer = PaymentSerializer(payment)
+        serializer: PaymentSerializer = PaymentSerializer(payment, fieldset=fieldset)
         return DRFResponse(serializer.data, status=status.HTTP_200_OK)
 
     @extend_schema(request=PaymentSerializer, responses=PaymentSerializer)
+    @idempotent
+    @query_budget(7)
     def create(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         POST /api/payments/ - Create a new payment and link to booking if provided
@@ -59,43 +74,31 @@ class PaymentViewSet(ViewSet):
         serializer: PaymentSerializer = PaymentSerializer(data=request.data)
         if serializer.is_valid():
             payment: Payment = serializer.save(user=request.user)
-
-            booking_id: int | None = request.data.get('booking_id')
-            if booking_id:
-                try:
-                    booking: Booking = Booking.objects.get(id=booking_id, user=request.user)
-                    booking.payment = payment
-                    if payment.status == 'completed':
-                        booking.status = 'confirmed'
-                    booking.save()
-                except Booking.DoesNotExist:
-                    pass
-
             return DRFResponse(PaymentSerializer(payment).data, status=status.HTTP_201_CREATED)
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(request=PaymentSerializer, responses=PaymentSerializer)
+    @query_budget(7)
     def update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         PUT /api/payments/{id}/ - Update a payment
         """
         payment: Payment = get_object_or_404(Payment, pk=pk)
-        if not request.user.is_staff and payment.user != request.user:
+        if not request.user.is_staff and payment.user_id != request.user.pk:
             return DRFResponse({"detail": "No permission"}, status=status.HTTP_403_FORBIDDEN)
 
         serializer: PaymentSerializer = PaymentSerializer(payment, data=request.data)
         if serializer.is_valid():
-            updated_payment: Payment = serializer.save()
-
-            if updated_payment.status == 'completed' and hasattr(updated_payment, 'bookings'):
-                for booking in updated_payment.bookings.all():
-                    booking.status = 'confirmed'
-                    booking.save()
+            with transaction.atomic():
+                updated_payment: Payment = serializer.save()
+                if updated_payment.status == COMPLETED:
+                    confirm_bookings([updated_payment.pk])
 
             return DRFResponse(serializer.data, status=status.HTTP_200_OK)
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(responses=None)
+    @query_budget(4)
     def destroy(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         DELETE /api/payments/{id}/ - Delete payment (admin only)
@@ -106,33 +109,62 @@ class PaymentViewSet(ViewSet):
         payment.delete()
         return DRFResponse(status=status.HTTP_204_NO_CONTENT)
 
+    @extend_schema(responses=paginated(PaymentSerializer))
     @action(detail=False, methods=['get'], url_path='my-payments')
-    @extend_schema(responses=PaymentSerializer(many=True))
+    @query_budget(2)
     def my_payments(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/payments/my-payments/ - Get current user's payments
         """
-        payments: QuerySet[Payment] = Payment.objects.select_related('user').filter(user=request.user)
-        serializer: PaymentSerializer = PaymentSerializer(payments, many=True)
-        return DRFResponse(serializer.data, status=status.HTTP_200_OK)
+        payments: QuerySet[Payment] = own_payments(request.user.pk)
+        fieldset: FieldSet = FieldSet.from_request(request, PaymentSerializer)
+        paginator: CreatedAtPagination = CreatedAtPagination()
+        rows: QuerySet = PaymentValuesSerializer.values(payments, 'created_at', fieldset=fieldset)
+        page: list[dict[str, Any]] = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(PaymentValuesSerializer.serialize(page, fieldset))
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> StreamingHttpResponse | DRFResponse:
+        """
+        GET /api/payments/export/?output=ndjson|csv - Stream all payments (admin only)
+        """
+        if not request.user.is_staff:
+            return DRFResponse({"detail": "Admin only"}, status=status.HTTP_403_FORBIDDEN)
+        return export_response(request, payment_export_rows, PAYMENT_EXPORT_FIELDS, 'payments')
 
     @action(detail=True, methods=['post'], url_path='process')
     @extend_schema(responses=PaymentSerializer)
+    @query_budget(10)
     def process_payment(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         POST /api/payments/{id}/process/ - Mark payment as completed and update bookings
         """
         payment: Payment = get_object_or_404(Payment, pk=pk)
-        if not request.user.is_staff and payment.user != request.user:
+        if not request.user.is_staff and payment.user_id != request.user.pk:
             return DRFResponse({"detail": "No permission"}, status=status.HTTP_403_FORBIDDEN)
 
-        payment.status = 'completed'
-        payment.save()
-
-        if hasattr(payment, 'bookings'):
-            for booking in payment.bookings.all():
-                booking.status = 'confirmed'
-                booking.save()
+        complete_payments(Payment.objects.all(), [payment.pk])
+        payment.status = COMPLETED
 
         serializer: PaymentSerializer = PaymentSerializer(payment)
         return DRFResponse(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='process')
+    @extend_schema(request=ProcessPaymentsSerializer, responses=None)
+    @query_budget(9)
+    def process_payments(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
+        """
+        POST /api/payments/process/ - Complete many payments and confirm their bookings atomically
+        """
+        serializer: ProcessPaymentsSerializer = ProcessPaymentsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        payment_ids: list[int] = serializer.validated_data['payment_ids']
+        result: ProcessResult = complete_payments(visible_payments(request.user), payment_ids)
+        processed: set[int] = set(result.processed)
+        return DRFResponse({
+            'processed': result.processed,
+            'not_found': sorted({payment_id for payment_id in payment_ids if payment_id not in processed}),
+            'bookings_confirmed': result.bookings_confirmed,
+        }, status=status.HTTP_200_OK)
@@ -81,6 +81,16 @@ class User(AbstractUser):
     REQUIRED_FIELDS = ['email', 'first_name', 'last_name']
     
     objects = CustomUserManager()
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Users built from token claims (apps.authentication) fill in the rest
+        # of their row at once on first use, instead of a query per field read
+        load_unclaimed = self.__dict__.pop('_load_unclaimed', None)
+        if load_unclaimed is not None:
+            load_unclaimed(self)
+            if fields is not None and not set(fields) & self.get_deferred_fields():
+                return
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.phone})"
\ No newline at end of file
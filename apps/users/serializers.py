@@ -2,6 +2,8 @@
 from rest_framework.serializers import ModelSerializer
 
 #Project Modules
+from apps.core.fastserializers import ValuesSerializer
+from apps.core.fieldsets import SparseFieldsMixin
 
 #Python Modules
 from django.contrib.auth import get_user_model
@@ -9,11 +11,18 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 
-class UserSerializer(ModelSerializer):
+class UserSerializer(SparseFieldsMixin, ModelSerializer):
     """
     User serializer for safe data exposure.
     """
     class Meta:
         model = User
         fields = ('id', 'phone', 'email', 'first_name', 'last_name', 'role', 'date_joined')
-        read_only_fields = ('id', 'date_joined')
\ No newline at end of file
+        read_only_fields = ('id', 'date_joined')
+
+
+class UserValuesSerializer(ValuesSerializer):
+    """
+    Fast list output of UserSerializer.
+    """
+    serializer_class = UserSerializer
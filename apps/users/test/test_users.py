@@ -36,8 +36,8 @@ class TestGetUsers:
         response = api_client.get(url)
         
         assert response.status_code == 200
-        assert len(response.data) == 1 
-        assert response.data[0]['id'] == user_customer.id
+        assert len(response.data['results']) == 1 
+        assert response.data['results'][0]['id'] == user_customer.id
 
 @pytest.mark.django_db
 class TestGetUserbyID:
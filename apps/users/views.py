@@ -18,8 +18,11 @@ from django.db.models import QuerySet
 from django.contrib.auth.models import User
 
 # Project modules
-from apps.users.serializers import UserSerializer
+from apps.users.serializers import UserSerializer, UserValuesSerializer
 from apps.users.permissions import IsSelfOrAdmin
+from apps.core.fieldsets import FieldSet, prune_queryset
+from apps.core.pagination import KeysetPagination, paginated
+from apps.core.querybudget import query_budget
 
 User = get_user_model()
 
@@ -31,7 +34,8 @@ class UserViewSet(ViewSet):
     """
     permission_classes: list[BasePermission] = [IsSelfOrAdmin]
 
-    @extend_schema(responses=UserSerializer(many=True))
+    @extend_schema(responses=paginated(UserSerializer))
+    @query_budget(2)
     def list(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/users/ - List users
@@ -44,21 +48,27 @@ class UserViewSet(ViewSet):
         else:
             queryset: QuerySet[User] = User.objects.filter(id=user.id)
 
-        serializer: UserSerializer = UserSerializer(queryset, many=True)
-        return DRFResponse(serializer.data, status=status.HTTP_200_OK)
+        fieldset: FieldSet = FieldSet.from_request(request, UserSerializer)
+        paginator: KeysetPagination = KeysetPagination()
+        rows: QuerySet = UserValuesSerializer.values(queryset, 'id', fieldset=fieldset)
+        page: list[dict[str, Any]] = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(UserValuesSerializer.serialize(page, fieldset))
 
     @extend_schema(responses=UserSerializer)
+    @query_budget(2)
     def retrieve(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/users/{id}/ - Get user details
         """
-        user: User = get_object_or_404(User, pk=pk)
+        fieldset: FieldSet = FieldSet.from_request(request, UserSerializer)
+        user: User = get_object_or_404(prune_queryset(User.objects.all(), UserSerializer(fieldset=fieldset)), pk=pk)
         self.check_object_permissions(request, user)
 
-        serializer: UserSerializer = UserSerializer(user)
+        serializer: UserSerializer = UserSerializer(user, fieldset=fieldset)
         return DRFResponse(serializer.data, status=status.HTTP_200_OK)
 
     @extend_schema(request=UserSerializer, responses=UserSerializer)
+    @query_budget(4)
     def update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         PUT /api/users/{id}/ - Update user (full update)
@@ -73,6 +83,7 @@ class UserViewSet(ViewSet):
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(request=UserSerializer, responses=UserSerializer)
+    @query_budget(4)
     def partial_update(self, request: DRFRequest, pk: int = None, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         PATCH /api/users/{id}/ - Partial update user
@@ -99,9 +110,10 @@ class UserViewSet(ViewSet):
 
     @extend_schema(responses=UserSerializer)
     @action(detail=False, methods=['get'])
+    @query_budget(1)
     def me(self, request: DRFRequest, *args: tuple[Any, ...], **kwargs: dict[str, Any]) -> DRFResponse:
         """
         GET /api/users/me/ - Get current user profile
         """
-        serializer: UserSerializer = UserSerializer(request.user)
+        serializer: UserSerializer = UserSerializer(request.user, fieldset=FieldSet.from_request(request, UserSerializer))
         return DRFResponse(serializer.data, status=status.HTTP_200_OK)
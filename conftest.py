@@ -2,12 +2,33 @@ import pytest
 
 from rest_framework.test import APIClient
 
-from apps.hotels.models import Hotel
+from apps.hotels.models import Hotel, RoomType, Room
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Database ids are reused between tests, cached results must not be
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    # Views running past their declared query budget fail the test
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def raise_on_nplusone(settings):
+    # Requests repeating a query from one line (N+1) fail the test
+    settings.NPLUSONE_DETECTION = 'raise'
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -24,6 +45,12 @@ def user_customer(db):
             role="customer",
     )
 
+
+@pytest.fixture
+def customer_client(api_client, user_customer):
+    api_client.force_authenticate(user=user_customer)
+    return api_client
+
 @pytest.fixture
 def user_admin(db):
     return User.objects.create_user(
@@ -34,6 +61,14 @@ def user_admin(db):
             last_name="Temirgali",
             role="admin",
     )
+
+
+@pytest.fixture
+def staff_client(api_client, user_admin):
+    user_admin.is_staff = True
+    user_admin.save()
+    api_client.force_authenticate(user=user_admin)
+    return api_client
     
 @pytest.fixture
 def user_manager(db):
@@ -54,4 +89,18 @@ def hotel(db):
         rating=5,
         description="Nice hotel"
     )
-    
+
+
+@pytest.fixture
+def room_type(db):
+    return RoomType.objects.create(name="Standard", capacity=2)
+
+
+@pytest.fixture
+def room(db, hotel, room_type):
+    return Room.objects.create(
+        number=101,
+        price_per_night=10000,
+        hotel=hotel,
+        room_type=room_type,
+    )
@@ -59,7 +59,7 @@ INSTALLED_APPS = DJANGO_AND_THIRD_PARTY_APPS + PROJECT_APPS
 # JWT Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -89,12 +89,24 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Users resolved from access tokens are kept per process, up to
+# AUTH_USER_CACHE_SIZE of them, until the user is saved or deleted.
+# AUTH_TRUST_TOKEN_CLAIMS lets a token issued since the user's last change
+# stand in for the user (id, role and staff flag only) without any lookup.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_TRUST_TOKEN_CLAIMS = False
+
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/profile/'
 LOGOUT_REDIRECT_URL = '/'
 
 
 MIDDLEWARE = [
+    'apps.core.metrics.MetricsMiddleware',
+    'apps.core.timing.ServerTimingMiddleware',
+    'apps.core.profiler.ProfilerMiddleware',
+    'apps.core.slowqueries.SlowQueryMiddleware',
+    'apps.core.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -164,31 +176,149 @@ UNFOLD = {
     ]
 }
 
+# ----------------------------------------------
+# Booking
+#
+# Answer overlap checks from a process-local interval index instead of the
+# database. Booking and room writes are logged to the AvailabilityChange
+# table, which every process replays before answering; writers prune the
+# log down to the last AVAILABILITY_CHANGE_LOG_SIZE entries.
+BOOKING_AVAILABILITY_ENGINE = False
+AVAILABILITY_CHANGE_LOG_SIZE = 10000
+
+# On SQLite, answer overlap checks from the booking_stay_rtree R*Tree index
+# (created by migrations and kept in sync by booking writes) instead of the
+# room-night inventory. The availability engine, when on, takes precedence.
+BOOKING_RTREE = False
+
+# Seconds to keep /api/bookings/available_rooms/ results in the default cache;
+# bookings and room changes invalidate the affected hotel and months early.
+# 0 turns the cache off.
+AVAILABILITY_CACHE_TIMEOUT = 60
+
+# ----------------------------------------------
+# Query budgets
+#
+# Raise instead of logging when a view runs more queries than its
+# @query_budget allows. The test suite turns this on.
+QUERY_BUDGET_STRICT = False
+
+# ----------------------------------------------
+# Idempotency keys
+#
+# Seconds a POST sent with an Idempotency-Key header is answered from its
+# stored response. `manage.py pruneidempotencykeys` deletes older keys.
+# A key still without a response after IDEMPOTENCY_LEASE seconds belongs to
+# a request that died before committing, and is run again; keep the lease
+# above the longest request the server lets run.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_LEASE = 120
+
+# ----------------------------------------------
+# Outbox
+#
+# `manage.py drainoutbox` retries a failed event after OUTBOX_RETRY_DELAY
+# seconds, doubling each time, and gives up after OUTBOX_MAX_ATTEMPTS.
+# A claimed event is left to its worker for OUTBOX_LEASE seconds; if the
+# worker dies without recording the outcome, the event runs again after that.
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_LEASE = 300
+
+# ----------------------------------------------
+# Background jobs
+#
+# Defaults for jobs queued through apps.core.jobs and run by
+# `manage.py runworkers`: attempts per job, seconds before the first retry
+# (doubling each time) and seconds a claimed job stays hidden from other
+# workers without its lock being renewed. Running jobs renew it every third
+# of that, so only jobs whose worker died are picked up again. Maintenance
+# commands (drainoutbox, pruneidempotencykeys, rebuildstats, rebuildinventory)
+# queue their work as a job with --enqueue.
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 10
+JOB_VISIBILITY_TIMEOUT = 300
+
 TESTING = "pytest" in sys.argv or 'test' in sys.argv
 
-if not TESTING:
-    INSTALLED_APPS += [
-        'debug_toolbar', 
-    ]
-    
-    MIDDLEWARE += [
-        'debug_toolbar.middleware.DebugToolbarMiddleware',
-    ]
-    
-    
+# ----------------------------------------------
+# Request timing
+#
+# Share of requests (0 to 1) that ServerTimingMiddleware times: those get a
+# Server-Timing header (db, view, serialize, total) and an INFO line on the
+# apps.core.timing logger.
+SERVER_TIMING_SAMPLE_RATE = 0.05
 
-# Debug Toolbar Settings
-INTERNAL_IPS = [
-    '127.0.0.1',
-    'localhost',
-]
+# ----------------------------------------------
+# Metrics
+#
+# /api/metrics/ serves request counts and latency histograms by ViewSet,
+# action and status to staff and to scrapers sending METRICS_SCRAPE_TOKEN in
+# an X-Metrics-Token header (None lets only staff in). A non-empty
+# METRICS_ALLOWED_IPS further limits token scrapers to those addresses.
+# Multi-process servers set METRICS_DIR: each process saves its totals
+# there every METRICS_FLUSH_INTERVAL seconds and the endpoint adds them up.
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 5
+METRICS_SCRAPE_TOKEN = None
+METRICS_ALLOWED_IPS = []
+
+# ----------------------------------------------
+# Profiler
+#
+# ProfilerMiddleware samples the stacks of PROFILER_SAMPLE_RATE of requests
+# (0 to 1), or of the rate given for an endpoint in PROFILER_ENDPOINT_RATES,
+# e.g. {'BookingViewSet.available_rooms': 0.1}, every PROFILER_INTERVAL
+# seconds. Stacks go to PROFILER_DIR as one collapsed-stack file per
+# endpoint; `manage.py profiletop` summarises them.
+PROFILER_SAMPLE_RATE = 0.0
+PROFILER_ENDPOINT_RATES = {}
+PROFILER_INTERVAL = 0.005
+PROFILER_DIR = os.path.join(BASE_DIR, '.profiles')
+
+# ----------------------------------------------
+# Slow queries
+#
+# Statements taking at least SLOW_QUERY_THRESHOLD_MS (None turns this off)
+# during a request or background job are logged as warnings on the
+# apps.core.slowqueries logger, with their normalized SQL, the endpoint and
+# the serializer field that ran them. Setting SLOW_QUERY_LOG_FILE also
+# appends them there as JSON lines, for `manage.py slowqueries` to rank;
+# the file is neither rotated nor capped, so truncate it after reading.
+SLOW_QUERY_THRESHOLD_MS = 200
+SLOW_QUERY_LOG_FILE = None
 
-def show_toolbar(request):
-    return True
+# ----------------------------------------------
+# N+1 detection
+#
+# A request running the same statement shape from the same line of project
+# code NPLUSONE_THRESHOLD times or more is reported: 'warn' logs it on the
+# apps.core.nplusone logger, 'raise' fails the request with NPlusOneError
+# (the test suite runs this way), None turns detection off. Loops meant to
+# repeat a query run inside apps.core.nplusone.allow_repeats().
+NPLUSONE_DETECTION = None
+NPLUSONE_THRESHOLD = 5
 
-DEBUG_TOOLBAR_CONFIG = {
-    'SHOW_TOOLBAR_CALLBACK': lambda request: True,
-    'RESULTS_CACHE_SIZE': 100,
-    'SHOW_COLLAPSED': True,
-    'SQL_WARNING_THRESHOLD': 100,
-}
\ No newline at end of file
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'apps.core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'apps.core.slowqueries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+        'apps.core.nplusone': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
@@ -10,4 +10,29 @@ DATABASES = {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'db.sqlite3',
     },
-}
\ No newline at end of file
+}
+
+SERVER_TIMING_SAMPLE_RATE = 1.0
+NPLUSONE_DETECTION = 'warn'
+SLOW_QUERY_LOG_FILE = os.path.join(BASE_DIR, '.slowqueries.jsonl')
+
+# The toolbar is for browsing the API during development only
+if DEBUG and not TESTING:
+    INSTALLED_APPS += [
+        'debug_toolbar',
+    ]
+
+    MIDDLEWARE += [
+        'debug_toolbar.middleware.DebugToolbarMiddleware',
+    ]
+
+    INTERNAL_IPS = [
+        '127.0.0.1',
+        'localhost',
+    ]
+
+    DEBUG_TOOLBAR_CONFIG = {
+        'RESULTS_CACHE_SIZE': 100,
+        'SHOW_COLLAPSED': True,
+        'SQL_WARNING_THRESHOLD': 100,
+    }
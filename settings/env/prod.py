@@ -10,4 +10,15 @@ DATABASES = {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'db.sqlite3',
     },
-}
\ No newline at end of file
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.cache'),
+    },
+}
+
+BOOKING_AVAILABILITY_ENGINE = True
+
+METRICS_DIR = os.path.join(BASE_DIR, '.metrics')
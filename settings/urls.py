@@ -1,4 +1,3 @@
-from settings.base import TESTING
 from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
@@ -49,7 +48,7 @@ urlpatterns = [
 ]
 
 
-if not TESTING:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     urlpatterns = [
         path('__debug__/', include(debug_toolbar.urls)),